@@ -0,0 +1 @@
+from .logs import LogTables, analyze, log_files
@@ -0,0 +1,15 @@
+import json
+import sys
+import time
+
+from .logs import analyze, log_files
+
+if len(sys.argv) < 2:
+    print("Usage: python -m Analysis <experiment name> [logs directory]")
+    sys.exit(1)
+
+started_at: float = time.perf_counter()
+paths: list[str] = log_files(sys.argv[1], directory = sys.argv[2] if len(sys.argv) > 2 else "Logs")
+summary = analyze(paths).summary()
+summary["analysis_seconds"] = time.perf_counter() - started_at
+print(json.dumps(summary, indent = 4))
@@ -0,0 +1,220 @@
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import os
+import re
+import time
+from typing import Any, Iterator
+
+import numpy as np
+
+CHUNK_SIZE: int = 64 * 1024 * 1024
+
+_PAYMENT_HASH = re.compile(rb"'payment_hash': '([0-9a-f]{64})'")
+_AMOUNT = re.compile(rb"'amount_msat': (\d+)")
+_AMOUNT_SENT = re.compile(rb"'amount_sent_msat': (\d+)")
+_STATUS = re.compile(rb"'status': '(\w+)'")
+
+class _Clock:
+    def __init__(self) -> None:
+        self.__days: dict[bytes, float] = {}
+
+    def __call__(self, date: bytes, clock: bytes) -> float:
+        day: float | None = self.__days.get(date)
+        if day is None:
+            day = time.mktime(time.strptime(date.decode(), "%Y-%m-%d"))
+            self.__days[date] = day
+        return day + int(clock[0:2]) * 3600 + int(clock[3:5]) * 60 + int(clock[6:8]) + int(clock[9:12]) / 1000
+
+def _lines(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as file:
+        position: int = start
+        if start:
+            file.seek(start - 1)
+            position += len(file.readline()) - 1
+        else:
+            file.seek(0)
+        while position < end:
+            line: bytes = file.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line
+
+def _parse_range(path: str, start: int, end: int) -> dict[str, Any]:
+    clock = _Clock()
+
+    invoices: dict[str, list] = {"hash": [], "time": []}
+    payments: dict[str, list] = {"time": [], "sender": [], "recipient": [], "amount": [], "fee": [], "success": [], "hash": []}
+    tasks: dict[str, list] = {"time": [], "event": [], "name": []}
+    stats: int = 0
+
+    for line in _lines(path, start, end):
+        fields: list[bytes] = line.split(b" ", 5)
+        if len(fields) < 4:
+            continue
+        tag: bytes = fields[3]
+
+        if tag == b"PAYMENT" and len(fields) == 6:
+            sender, recipient = fields[4], fields[5].split(b" ", 1)[0]
+            hash_match = _PAYMENT_HASH.search(line)
+            payments["time"].append(clock(fields[0], fields[1]))
+            payments["sender"].append(sender.decode())
+            payments["recipient"].append(recipient.decode())
+            payments["hash"].append(hash_match.group(1) if hash_match else b"")
+            if fields[2] == b"INFO":
+                amount = _AMOUNT.search(line)
+                amount_sent = _AMOUNT_SENT.search(line)
+                status = _STATUS.search(line)
+                amount_msat: int = int(amount.group(1)) if amount else 0
+                payments["amount"].append(amount_msat)
+                payments["fee"].append(int(amount_sent.group(1)) - amount_msat if amount_sent else 0)
+                payments["success"].append(status is None or status.group(1) == b"complete")
+            else:
+                amount_field: bytes = fields[5].split(b" ", 2)[1] if fields[5].count(b" ") else b"0"
+                payments["amount"].append(int(amount_field) if amount_field.isdigit() else 0)
+                payments["fee"].append(0)
+                payments["success"].append(False)
+        elif tag == b"INVOICE":
+            hash_match = _PAYMENT_HASH.search(line)
+            if hash_match:
+                invoices["hash"].append(hash_match.group(1))
+                invoices["time"].append(clock(fields[0], fields[1]))
+        elif tag.startswith(b"TASK_") and len(fields) >= 5:
+            tasks["time"].append(clock(fields[0], fields[1]))
+            tasks["event"].append(tag[5:].decode())
+            tasks["name"].append((fields[4] + (b" " + fields[5] if len(fields) == 6 else b"")).strip().decode(errors = "replace"))
+        elif tag == b"STATS":
+            stats += 1
+
+    return {
+        "invoices": {
+            "hash": np.array(invoices["hash"], dtype = "S64"),
+            "time": np.array(invoices["time"], dtype = np.float64)
+        },
+        "payments": {
+            "time": np.array(payments["time"], dtype = np.float64),
+            "sender": np.array(payments["sender"], dtype = np.str_),
+            "recipient": np.array(payments["recipient"], dtype = np.str_),
+            "amount": np.array(payments["amount"], dtype = np.int64),
+            "fee": np.array(payments["fee"], dtype = np.int64),
+            "success": np.array(payments["success"], dtype = np.bool_),
+            "hash": np.array(payments["hash"], dtype = "S64")
+        },
+        "tasks": tasks,
+        "stats": stats
+    }
+
+def _concatenate(parts: list[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    return {column: np.concatenate([p[column] for p in parts]) for column in parts[0]}
+
+class LogTables:
+    def __init__(self, parts: list[dict[str, Any]]) -> None:
+        invoices: dict[str, np.ndarray] = _concatenate([p["invoices"] for p in parts])
+        self.payments: dict[str, np.ndarray] = _concatenate([p["payments"] for p in parts])
+        self.stats_count: int = sum(p["stats"] for p in parts)
+
+        order: np.ndarray = np.argsort(invoices["hash"], kind = "stable")
+        invoice_hashes: np.ndarray = invoices["hash"][order]
+        invoice_times: np.ndarray = invoices["time"][order]
+        latency: np.ndarray = np.full(len(self.payments["hash"]), np.nan)
+        if len(invoice_hashes):
+            positions: np.ndarray = np.minimum(np.searchsorted(invoice_hashes, self.payments["hash"]), len(invoice_hashes) - 1)
+            matched: np.ndarray = (invoice_hashes[positions] == self.payments["hash"]) & (self.payments["hash"] != b"")
+            latency[matched] = self.payments["time"][matched] - invoice_times[positions[matched]]
+        self.payments["latency"] = latency
+
+        self.tasks: dict[str, np.ndarray] = self.__pair_tasks(parts)
+
+    @staticmethod
+    def __pair_tasks(parts: list[dict[str, Any]]) -> dict[str, np.ndarray]:
+        events: list[tuple[float, str, str]] = sorted(
+            (t, e, n) for p in parts for t, e, n in zip(p["tasks"]["time"], p["tasks"]["event"], p["tasks"]["name"])
+        )
+        started: dict[str, deque[float]] = {}
+        name_tokens: int = 0
+        names: list[str] = []
+        durations: list[float] = []
+        statuses: list[str] = []
+        for timestamp, event, line in events:
+            if event == "STARTED":
+                started.setdefault(line, deque()).append(timestamp)
+                name_tokens = max(name_tokens, line.count(" ") + 1)
+                continue
+            tokens: list[str] = line.split(" ", name_tokens)
+            for count in range(min(name_tokens, len(tokens)), 0, -1):
+                name: str = " ".join(tokens[:count])
+                if started.get(name):
+                    names.append(name)
+                    durations.append(timestamp - started[name].popleft())
+                    statuses.append(event)
+                    break
+        return {
+            "name": np.array(names, dtype = np.str_),
+            "kind": np.array([n.split(" ")[0] for n in names], dtype = np.str_),
+            "duration": np.array(durations, dtype = np.float64),
+            "status": np.array(statuses, dtype = np.str_)
+        }
+
+    def summary(self, *, top: int = 10) -> dict[str, Any]:
+        payments = self.payments
+        success: np.ndarray = payments["success"]
+        latency: np.ndarray = payments["latency"][success & ~np.isnan(payments["latency"])]
+        failed_senders, failed_sender_counts = np.unique(payments["sender"][~success], return_counts = True)
+        failed_recipients, failed_recipient_counts = np.unique(payments["recipient"][~success], return_counts = True)
+
+        def hotspots(keys: np.ndarray, counts: np.ndarray) -> list[tuple[str, int]]:
+            order: np.ndarray = np.argsort(counts)[::-1][:top]
+            return [(str(keys[i]), int(counts[i])) for i in order]
+
+        tasks: dict[str, Any] = {}
+        for kind in np.unique(self.tasks["kind"]):
+            mask: np.ndarray = self.tasks["kind"] == kind
+            durations: np.ndarray = self.tasks["duration"][mask]
+            tasks[str(kind)] = {
+                "count": int(mask.sum()),
+                "failed": int((self.tasks["status"][mask] != "DONE").sum()),
+                "mean": float(durations.mean()),
+                "p50": float(np.percentile(durations, 50)),
+                "p99": float(np.percentile(durations, 99))
+            }
+
+        return {
+            "payments": int(len(success)),
+            "succeeded": int(success.sum()),
+            "success_ratio": float(success.mean()) if len(success) else 0.0,
+            "latency": {
+                f"p{p}": float(np.percentile(latency, p)) if len(latency) else None for p in (50, 90, 99)
+            },
+            "amount_msat": int(payments["amount"][success].sum()),
+            "fees_msat": int(payments["fee"][success].sum()),
+            "fee_ppm": float(payments["fee"][success].sum() / max(1, payments["amount"][success].sum()) * 1_000_000),
+            "failing_senders": hotspots(failed_senders, failed_sender_counts),
+            "failing_recipients": hotspots(failed_recipients, failed_recipient_counts),
+            "tasks": tasks,
+            "stats_samples": self.stats_count
+        }
+
+def log_files(name: str, *, directory: str = "Logs", backups: bool = False) -> list[str]:
+    paths: list[str] = [os.path.join(directory, f"{name}.log")]
+    if backups:
+        paths += sorted(glob.glob(os.path.join(directory, f"{name}.log.*")), key = lambda p: int(p.rsplit(".", 1)[1]) if p.rsplit(".", 1)[1].isdigit() else 0)
+    return [p for p in paths if os.path.isfile(p)]
+
+def analyze(paths: list[str], *, workers: int | None = None) -> LogTables:
+    ranges: list[tuple[str, int, int]] = []
+    for path in paths:
+        size: int = os.path.getsize(path)
+        ranges += [(path, start, min(size, start + CHUNK_SIZE)) for start in range(0, max(size, 1), CHUNK_SIZE)]
+
+    if not ranges:
+        raise FileNotFoundError("No log files to analyze")
+
+    if len(ranges) == 1:
+        parts: list[dict[str, Any]] = [_parse_range(*ranges[0])]
+    else:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            parts = list(executor.map(_parse_range, *zip(*ranges)))
+
+    return LogTables(parts)
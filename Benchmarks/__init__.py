@@ -0,0 +1,2 @@
+from .fakes import FakeBackend, FakeServices, Faults
+from .suite import BenchmarkConfig, run_benchmark, run_suite
@@ -0,0 +1,33 @@
+import argparse
+
+from .suite import HISTORY_PATH, SIZES, main
+
+parser = argparse.ArgumentParser(prog = "python -m Benchmarks", description = "Time lab orchestration against local stand-in services")
+parser.add_argument("--sizes", type = int, nargs = "+", default = list(SIZES))
+parser.add_argument("--latency", type = float, default = 0.0)
+parser.add_argument("--error-rate", type = float, default = 0.0)
+parser.add_argument("--duration", type = float, default = 10.0)
+parser.add_argument("--rate", type = float, default = None)
+parser.add_argument("--history", default = HISTORY_PATH)
+parser.add_argument("--threshold", type = float, default = 0.2)
+arguments = parser.parse_args()
+
+records = main(
+    tuple(arguments.sizes),
+    history_path = arguments.history,
+    threshold = arguments.threshold,
+    latency = arguments.latency,
+    error_rate = arguments.error_rate,
+    traffic_duration = arguments.duration,
+    traffic_rate = arguments.rate
+)
+
+print(f"{'NODES':>8} {'START':>9} {'SYNC':>9} {'TRAFFIC':>9} {'STOP':>9} {'PAY/S':>9}  REGRESSIONS")
+for record in records:
+    timings = record["timings"]
+    print(
+        f"{record['config']['nodes']:>8}",
+        *(f"{timings.get(case, float('nan')):>9.2f}" for case in ("start", "sync_mine", "traffic", "stop")),
+        f"{record['payments_per_second'] or 0:>9.1f} ",
+        ", ".join(f"{case} {r['seconds']:.2f}s vs {r['baseline']:.2f}s" for case, r in record["regressions"].items()) or "-"
+    )
@@ -0,0 +1,385 @@
+from __future__ import annotations
+import asyncio
+from collections import Counter
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Any, AsyncIterator
+import uuid
+
+from aiohttp import web
+
+from Lab.backend import ContainerBackend
+from Lab.containers import ContainerStateCache
+from Lab.logmux import LogMultiplexer
+
+COOKIE: str = "__cookie__:benchmark"
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha256(":".join(str(p) for p in parts).encode()).hexdigest()
+
+class Faults:
+    def __init__(self, *, latency: float = 0.0, jitter: float = 0.5, error_rate: float = 0.0, error_methods: tuple[str, ...] = ("pay",), seed: int = 0) -> None:
+        self.latency: float = float(latency)
+        self.jitter: float = float(jitter)
+        self.error_rate: float = float(error_rate)
+        self.error_methods: frozenset[str] = frozenset(error_methods)
+        self.injected: Counter[str] = Counter()
+        self.__random: random.Random = random.Random(seed)
+
+    async def delay(self) -> None:
+        if self.latency > 0:
+            await asyncio.sleep(self.latency * (1 + self.__random.uniform(-self.jitter, self.jitter)))
+
+    def fails(self, method: str) -> bool:
+        if method in self.error_methods and self.__random.random() < self.error_rate:
+            self.injected[method] += 1
+            return True
+        return False
+
+class FakeChain:
+    def __init__(self, network: str) -> None:
+        self.network: str = network
+        self.block_hashes: list[str] = [_digest(network, 0)]
+        self.transactions: dict[str, list[str]] = {self.block_hashes[0]: []}
+
+    @property
+    def height(self) -> int:
+        return len(self.block_hashes) - 1
+
+    def mine(self, block_count: int, address: str) -> list[str]:
+        mined: list[str] = []
+        for _ in range(block_count):
+            block_hash: str = _digest(self.network, len(self.block_hashes), address)
+            self.block_hashes.append(block_hash)
+            self.transactions[block_hash] = [_digest(block_hash, "coinbase")]
+            mined.append(block_hash)
+        return mined
+
+class FakeChannel:
+    def __init__(self, channel_id: str, short_channel_id: str, opener: str, peer: str, capacity: int, balance: int) -> None:
+        self.channel_id: str = channel_id
+        self.short_channel_id: str = short_channel_id
+        self.opener: str = opener
+        self.peer: str = peer
+        self.capacity: int = capacity
+        self.balances: dict[str, int] = {opener: balance, peer: capacity - balance}
+        self.fees: dict[str, tuple[int, int]] = {opener: (1000, 1), peer: (1000, 1)}
+
+    def state(self, public_key: str) -> dict[str, Any]:
+        base_fee, ppm_fee = self.fees[public_key]
+        return {
+            "peer_id": self.peer if public_key == self.opener else self.opener,
+            "channel_id": self.channel_id,
+            "short_channel_id": self.short_channel_id,
+            "state": "CHANNELD_NORMAL",
+            "total_msat": self.capacity,
+            "to_us_msat": self.balances[public_key],
+            "updates": {"local": {"fee_base_msat": base_fee, "fee_proportional_millionths": ppm_fee, "cltv_expiry_delta": 34}}
+        }
+
+class FakeContainer:
+    def __init__(self, container_id: str, name: str, image: str, network: str, labels: dict[str, str]) -> None:
+        self.container_id: str = container_id
+        self.name: str = name
+        self.kind: str = "bitcoind" if "bitcoin" in image else "lightningd"
+        self.network: str = network
+        self.labels: dict[str, str] = labels
+        self.public_key: str = "02" + _digest(container_id)
+        self.status: str = "created"
+        self.logs: list[tuple[float, bytes]] = []
+        self.logged: asyncio.Event = asyncio.Event()
+
+    def log(self, line: str) -> None:
+        self.logs.append((time.time(), f"{time.strftime('%Y-%m-%dT%H:%M:%S')} {line}\n".encode()))
+        self.logged.set()
+        self.logged = asyncio.Event()
+
+class FakeServices:
+    def __init__(self, faults: Faults) -> None:
+        self.faults: Faults = faults
+        self.port: int = 0
+        self.requests: Counter[str] = Counter()
+        self.containers: dict[str, FakeContainer] = {}
+        self.chains: dict[str, FakeChain] = {}
+        self.channels: dict[str, FakeChannel] = {}
+        self.peer_channels: dict[str, list[FakeChannel]] = {}
+        self.invoices: dict[str, int] = {}
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__runner: web.AppRunner | None = None
+        self.__thread: threading.Thread | None = None
+
+    def chain(self, network: str) -> FakeChain:
+        return self.chains.setdefault(network, FakeChain(network))
+
+    def start(self) -> None:
+        ready: threading.Event = threading.Event()
+        self.__thread = threading.Thread(target = self.__run, args = (ready,), name = "FAKE_SERVICES", daemon = True)
+        self.__thread.start()
+        ready.wait()
+
+    def stop(self) -> None:
+        if self.__loop and self.__thread:
+            asyncio.run_coroutine_threadsafe(self.__cleanup(), self.__loop).result()
+            self.__loop.call_soon_threadsafe(self.__loop.stop)
+            self.__thread.join()
+            self.__loop = self.__thread = None
+
+    def __run(self, ready: threading.Event) -> None:
+        self.__loop = asyncio.new_event_loop()
+        self.__loop.run_until_complete(self.__serve())
+        ready.set()
+        self.__loop.run_forever()
+        self.__loop.close()
+
+    async def __serve(self) -> None:
+        application: web.Application = web.Application(client_max_size = 16 * 1024 ** 2)
+        application.router.add_post("/{container_id}/{path:.*}", self.__handle)
+        self.__runner = web.AppRunner(application, access_log = None)
+        await self.__runner.setup()
+        site: web.TCPSite = web.TCPSite(self.__runner, "127.0.0.1", 0, backlog = 4096)
+        await site.start()
+        self.port = self.__runner.addresses[0][1]
+
+    async def __cleanup(self) -> None:
+        if self.__runner:
+            await self.__runner.cleanup()
+
+    async def __handle(self, request: web.Request) -> web.Response:
+        container: FakeContainer | None = self.containers.get(request.match_info["container_id"])
+        if container is None or container.status != "running":
+            return web.json_response({"code": -32000, "message": "container is not running"}, status = 502)
+
+        body: Any = json.loads(await request.read() or b"{}")
+        await self.faults.delay()
+        if container.kind == "bitcoind":
+            return self.__bitcoind(container, body)
+        return self.__lightningd(container, request.match_info["path"].removeprefix("v1/"), body)
+
+    def __bitcoind(self, container: FakeContainer, call: dict[str, Any]) -> web.Response:
+        method: str = call.get("method", "")
+        params: list[Any] = call.get("params", [])
+        self.requests[f"bitcoind.{method}"] += 1
+        chain: FakeChain = self.chain(container.network)
+
+        if self.faults.fails(method):
+            return web.json_response({"result": None, "error": {"code": -1, "message": "injected failure"}, "id": call.get("id")}, status = 500)
+
+        result: Any
+        match method:
+            case "generatetoaddress":
+                result = chain.mine(int(params[0]), str(params[1]))
+            case "getblock":
+                result = {"hash": params[0], "tx": chain.transactions.get(params[0], [])}
+            case "getblockchaininfo":
+                result = {"chain": "regtest", "blocks": chain.height, "headers": chain.height, "bestblockhash": chain.block_hashes[-1]}
+            case "getblockcount":
+                result = chain.height
+            case "getbestblockhash":
+                result = chain.block_hashes[-1]
+            case "getblockhash":
+                result = chain.block_hashes[int(params[0])]
+            case "getnewaddress":
+                result = "bcrt1q" + _digest(container.container_id, time.monotonic_ns())[:38]
+            case "sendtoaddress":
+                result = _digest(container.container_id, "send", time.monotonic_ns())
+            case "estimatesmartfee":
+                result = {"feerate": 0.00001, "blocks": 2}
+            case "getnetworkinfo":
+                result = {"version": 270000, "connections": 1}
+            case "getmininginfo":
+                result = {"blocks": chain.height}
+            case "createwallet" | "addnode":
+                result = None
+            case _:
+                return web.json_response({"result": None, "error": {"code": -32601, "message": f"Method not found: {method}"}, "id": call.get("id")}, status = 404)
+        return web.json_response({"result": result, "error": None, "id": call.get("id")})
+
+    def __lightningd(self, container: FakeContainer, method: str, payload: dict[str, Any]) -> web.Response:
+        self.requests[f"lightningd.{method}"] += 1
+        public_key: str = container.public_key
+
+        if self.faults.fails(method):
+            return web.json_response({"code": -1, "message": "injected failure"}, status = 500)
+
+        result: Any
+        match method:
+            case "getinfo":
+                result = {"id": public_key, "alias": container.name, "blockheight": self.chain(container.network).height, "network": "regtest"}
+            case "newaddr":
+                result = {"bech32": "bcrt1q" + _digest(public_key, time.monotonic_ns())[:38]}
+            case "connect":
+                result = {"id": payload.get("id"), "direction": "out"}
+            case "listfunds":
+                result = {"outputs": [], "channels": [c.state(public_key) for c in self.peer_channels.get(public_key, [])]}
+            case "fundchannel":
+                chain: FakeChain = self.chain(container.network)
+                channel_id: str = _digest(public_key, payload["id"], payload["utxos"][0])
+                channel: FakeChannel = FakeChannel(
+                    channel_id,
+                    f"{chain.height}x{len(self.channels)}x0",
+                    public_key,
+                    payload["id"],
+                    int(payload["amount"]) * 1000,
+                    int(payload["amount"]) * 1000 - int(payload.get("push_msat", 0))
+                )
+                self.channels[channel_id] = channel
+                self.peer_channels.setdefault(public_key, []).append(channel)
+                self.peer_channels.setdefault(payload["id"], []).append(channel)
+                result = {"channel_id": channel_id, "txid": _digest(channel_id, "funding"), "outnum": 0}
+            case "setchannel":
+                channels: list[FakeChannel] = self.peer_channels.get(public_key, []) if payload.get("id") == "all" else [self.channels[payload["id"]]]
+                for channel in channels:
+                    base_fee, ppm_fee = channel.fees[public_key]
+                    channel.fees[public_key] = (int(payload.get("feebase", base_fee)), int(payload.get("feeppm", ppm_fee)))
+                result = {"channels": [{"channel_id": c.channel_id} for c in channels]}
+            case "listpeerchannels":
+                peer: str | None = payload.get("id")
+                result = {"channels": [
+                    c.state(public_key) for c in self.peer_channels.get(public_key, [])
+                    if peer is None or peer in (c.opener, c.peer)
+                ]}
+            case "close":
+                result = {"type": "mutual", "txid": _digest(payload["id"], "close")}
+            case "invoice":
+                payment_hash: str = _digest(public_key, payload["label"])
+                bolt11: str = f"lnbcrt{payload['amount_msat']}n1{payment_hash}"
+                self.invoices[bolt11] = int(payload["amount_msat"])
+                result = {"bolt11": bolt11, "payment_hash": payment_hash, "payment_secret": _digest(payment_hash, "secret"), "expires_at": int(time.time()) + 604_800}
+            case "pay":
+                amount: int | None = self.invoices.pop(payload["bolt11"], None)
+                if amount is None:
+                    return web.json_response({"code": 203, "message": "unknown invoice"}, status = 500)
+                result = {"payment_hash": payload["bolt11"][-64:], "status": "complete", "amount_msat": amount, "amount_sent_msat": amount, "parts": 1}
+            case "getroute":
+                result = {"route": [{"id": payload["id"], "channel": "0x0x0", "direction": 0, "amount_msat": payload["amount_msat"], "delay": 9}]}
+            case "sendpay":
+                result = {"payment_hash": payload["payment_hash"], "status": "pending"}
+            case "waitsendpay":
+                result = {"payment_hash": payload["payment_hash"], "status": "complete"}
+            case _:
+                return web.json_response({"code": -32601, "message": f"Unknown command '{method}'"}, status = 404)
+        return web.json_response(result)
+
+class FakeAPI:
+    def __init__(self, backend: FakeBackend) -> None:
+        self.__backend: FakeBackend = backend
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        return None
+
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[bytes]:
+        if url == "/events":
+            await asyncio.Event().wait()
+            return
+
+        container: FakeContainer | None = self.__backend.services.containers.get(url.split("/")[2])
+        if container is None:
+            return
+        params: dict[str, Any] = kwargs.get("params", {})
+        since: float = float(params.get("since", 0))
+        position: int = 0
+        while container.status in ("created", "running"):
+            while position < len(container.logs):
+                logged_at, line = container.logs[position]
+                position += 1
+                if logged_at >= since:
+                    if params.get("timestamps"):
+                        stamp: str = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(logged_at))
+                        line = f"{stamp}.{int(logged_at * 1e9) % 1_000_000_000:09d}Z ".encode() + line
+                    yield line
+            await container.logged.wait()
+
+class FakeBackend(ContainerBackend):
+    def __init__(self, *, faults: Faults | None = None, startup_delay: float = 0.0) -> None:
+        self.faults: Faults = faults or Faults()
+        self.startup_delay: float = float(startup_delay)
+        self.services: FakeServices = FakeServices(self.faults)
+        self.networks: set[str] = set()
+        self.__api: FakeAPI = FakeAPI(self)
+        self.__log_multiplexer: LogMultiplexer | None = None
+        self.__container_states: ContainerStateCache | None = None
+
+    def __enter__(self) -> FakeBackend:
+        self.services.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.services.stop()
+
+    def logs(self) -> LogMultiplexer:
+        if self.__log_multiplexer is None:
+            self.__log_multiplexer = LogMultiplexer(self.__api)
+        return self.__log_multiplexer
+
+    def container_states(self) -> ContainerStateCache:
+        if self.__container_states is None:
+            self.__container_states = ContainerStateCache(self.__api)
+        return self.__container_states
+
+    def create_container(
+        self,
+        *,
+        image: str,
+        command: str | list[str],
+        environment: dict[str, str] | None,
+        control_port: int | None,
+        host_port: int | None,
+        mem_limit: int,
+        cpuset_cpus: str | None,
+        network: str,
+        name: str | None,
+        labels: dict[str, str] | None,
+        extra_hosts: dict[str, str] | None
+    ) -> tuple[str, str]:
+        container_id: str = uuid.uuid4().hex * 2
+        container: FakeContainer = FakeContainer(container_id, name or container_id[:12], image, network, labels or {})
+        self.services.containers[container_id] = container
+        return container_id, container.name
+
+    def control_url(self, container_id: str, host_port: int) -> str:
+        return f"http://127.0.0.1:{self.services.port}/{container_id}"
+
+    def create_network(self, name: str, labels: dict[str, str] | None = None) -> None:
+        self.networks.add(name)
+
+    def remove_network(self, name: str) -> None:
+        self.networks.discard(name)
+        self.services.chains.pop(name, None)
+
+    async def start_container(self, container_id: str) -> None:
+        container: FakeContainer = self.services.containers[container_id]
+        container.status = "running"
+        if self.startup_delay:
+            await asyncio.sleep(self.startup_delay)
+        container.log("Generated RPC authentication cookie" if container.kind == "bitcoind" else "lightningd: Server started, no longer in startup mode")
+
+    async def stop_container(self, container_id: str, grace: float) -> None:
+        await self.remove_container(container_id)
+
+    async def remove_container(self, container_id: str) -> None:
+        container: FakeContainer | None = self.services.containers.pop(container_id, None)
+        if container is not None:
+            container.status = "removed"
+            container.logged.set()
+
+    async def list_containers(self, labels: dict[str, str]) -> list[str]:
+        return [
+            container_id for container_id, container in list(self.services.containers.items())
+            if all(container.labels.get(k) == v for k, v in labels.items())
+        ]
+
+    async def exec(self, container_id: str, command: list[str]) -> tuple[int, bytes]:
+        if "commando-rune" in command:
+            return 0, json.dumps({"rune": _digest(container_id, "rune"), "unique_id": "0"}).encode()
+        return 1, json.dumps({"message": f"Unsupported command {command}"}).encode()
+
+    async def read_file(self, container_id: str, file_path: str) -> str:
+        if file_path.endswith(".cookie"):
+            return COOKIE
+        raise FileNotFoundError(f"Unable to read {file_path} from {container_id[:12]}")
+
+    async def read_stats(self, container_id: str) -> dict[str, Any]:
+        return {"cpu_stats": {}, "precpu_stats": {}, "memory_stats": {}}
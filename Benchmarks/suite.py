@@ -0,0 +1,168 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import time
+from typing import Any
+
+from Lab.backend import ContainerBackend
+from Lab.experiment import generate_traffic
+from Lab.lab import Lab
+from Lab.metrics import TrafficMetrics
+from Lab.paygraph import PayGraph
+from Lab.scheduler import MIB, AdmissionScheduler
+from Lab.server import Server
+from Lab.topology import generate
+
+from .fakes import FakeBackend, Faults
+
+CASES: tuple[str, ...] = ("start", "sync_mine", "traffic", "stop")
+SIZES: tuple[int, ...] = (100, 1_000, 10_000)
+HISTORY_PATH: str = "Benchmarks/Results/history.jsonl"
+
+class BenchmarkConfig:
+    def __init__(
+        self,
+        *,
+        nodes: int,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        traffic_duration: float = 10.0,
+        traffic_rate: float | None = None,
+        blocks: int = 6,
+        seed: int = 0
+    ) -> None:
+        self.nodes: int = int(nodes)
+        self.latency: float = float(latency)
+        self.error_rate: float = float(error_rate)
+        self.traffic_duration: float = float(traffic_duration)
+        self.traffic_rate: float | None = traffic_rate
+        self.blocks: int = int(blocks)
+        self.seed: int = int(seed)
+
+    @property
+    def key(self) -> str:
+        return f"{self.nodes}:{self.latency}:{self.error_rate}:{self.traffic_duration}:{self.traffic_rate}"
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "nodes": self.nodes,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "traffic_duration": self.traffic_duration,
+            "traffic_rate": self.traffic_rate,
+            "blocks": self.blocks,
+            "seed": self.seed
+        }
+
+def raise_file_limit() -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_benchmark(config: BenchmarkConfig) -> dict[str, Any]:
+    graph: PayGraph = generate(f"benchmark{config.nodes}", "barabasi_albert", nodes = config.nodes, seed = config.seed, attachments = 2)
+    scheduler: AdmissionScheduler = AdmissionScheduler(
+        role_memory = {"miner": MIB, "node": MIB},
+        budget = 2 * MIB * (config.nodes + config.nodes // 10 + 1),
+        startup_slots = 512
+    )
+    timings: dict[str, float] = {}
+    traffic: dict[str, int] = {}
+    metrics: TrafficMetrics = TrafficMetrics()
+
+    previous_backend: ContainerBackend | None = Server.active_backend()
+    with FakeBackend(faults = Faults(latency = config.latency, error_rate = config.error_rate, seed = config.seed)) as backend:
+        Server.use_backend(backend)
+        try:
+            lab: Lab = Lab(graph, namespace = f"benchmark_{config.nodes}", scheduler = scheduler)
+            try:
+                started_at: float = time.perf_counter()
+                await lab.start()
+                timings["start"] = time.perf_counter() - started_at
+
+                started_at = time.perf_counter()
+                await lab.sync_mine(config.blocks)
+                timings["sync_mine"] = time.perf_counter() - started_at
+
+                started_at = time.perf_counter()
+                traffic = await generate_traffic(lab, 10_000_000, rate = config.traffic_rate, duration = config.traffic_duration, seed = str(config.seed), metrics = metrics)
+                timings["traffic"] = time.perf_counter() - started_at
+            finally:
+                started_at = time.perf_counter()
+                await lab.stop()
+                timings["stop"] = time.perf_counter() - started_at
+                lab.close_log()
+        finally:
+            Server.use_backend(previous_backend)
+
+        requests: int = sum(backend.services.requests.values())
+        injected: int = sum(backend.faults.injected.values())
+
+    latency: list[float] | None = metrics.latency(50, 99)
+    return {
+        "config": config.as_dict(),
+        "timings": timings,
+        "traffic": traffic,
+        "payments_per_second": traffic.get("sent", 0) / timings["traffic"] if timings.get("traffic") else None,
+        "payment_latency": {"p50": latency[0], "p99": latency[1]} if latency else None,
+        "requests": requests,
+        "injected_failures": injected
+    }
+
+def load_history(path: str) -> list[dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding = "utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+def append_history(path: str, record: dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+    with open(path, "a", encoding = "utf-8") as file:
+        file.write(json.dumps(record, sort_keys = True) + "\n")
+
+def regressions(record: dict[str, Any], history: list[dict[str, Any]], *, threshold: float = 0.2, window: int = 5) -> dict[str, tuple[float, float]]:
+    key: str = BenchmarkConfig(**record["config"]).key
+    previous: list[dict[str, Any]] = [r for r in history if BenchmarkConfig(**r["config"]).key == key][-window:]
+    found: dict[str, tuple[float, float]] = {}
+    for case in CASES:
+        samples: list[float] = [r["timings"][case] for r in previous if case in r.get("timings", {})]
+        if case in record["timings"] and samples:
+            baseline: float = statistics.median(samples)
+            if record["timings"][case] > baseline * (1 + threshold):
+                found[case] = (record["timings"][case], baseline)
+    return found
+
+async def run_suite(
+    sizes: tuple[int, ...] = SIZES,
+    *,
+    history_path: str = HISTORY_PATH,
+    threshold: float = 0.2,
+    **options: Any
+) -> list[dict[str, Any]]:
+    raise_file_limit()
+    history: list[dict[str, Any]] = load_history(history_path)
+    revision: str | None = git_revision()
+    records: list[dict[str, Any]] = []
+
+    for size in sizes:
+        result: dict[str, Any] = await run_benchmark(BenchmarkConfig(nodes = size, **options))
+        record: dict[str, Any] = {"at": time.time(), "revision": revision, **result}
+        record["regressions"] = {case: {"seconds": seconds, "baseline": baseline} for case, (seconds, baseline) in regressions(record, history, threshold = threshold).items()}
+        append_history(history_path, record)
+        history.append(record)
+        records.append(record)
+
+    return records
+
+def main(sizes: tuple[int, ...] = SIZES, **options: Any) -> list[dict[str, Any]]:
+    return asyncio.run(run_suite(sizes, **options))
@@ -2,5 +2,22 @@ from .miner import Miner
 from .node import Node
 from .channel import Channel
 from .lab import Lab
+from .channelstate import ChannelStateCache
 from .paygraph import PayGraph
-from .experiment import generate_traffic
\ No newline at end of file
+from .experiment import generate_traffic
+from .recorder import BalanceRecorder
+from .fees import FeePolicy
+from .routing import Router
+from .scheduler import AdmissionScheduler, HostResources
+from .ports import PortAllocator
+from .containers import ContainerStateCache
+from .labscheduler import LabJob, LabScheduler, run_lab_job
+from .graphdiff import GraphDiff
+from .rebalance import reset_balances
+from .progress import ProgressBus, ProgressEvent, PhaseChanged, TaskCompleted, TaskFailed
+from .metrics import TrafficMetrics
+from .rpcproxy import RPCProxy
+from .blockclock import BlockClock
+from .workload import WorkloadSampler, AliasTable
+from .results import ResultStore, RunRecorder
+from .backend import ContainerBackend, DockerBackend, register_backend, create_backend
@@ -0,0 +1,254 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+import asyncio
+import io
+import json
+import math
+import os
+import tarfile
+from typing import TYPE_CHECKING, Any, Callable
+
+import httpx
+
+from .containers import ContainerStateCache
+from .dockerapi import DockerAPI
+from .logmux import LogMultiplexer
+
+if TYPE_CHECKING:
+    import docker
+
+DEFAULT_BACKEND: str = "docker"
+
+class ContainerBackend(ABC):
+    @abstractmethod
+    def create_container(
+        self,
+        *,
+        image: str,
+        command: str | list[str],
+        environment: dict[str, str] | None,
+        control_port: int | None,
+        host_port: int | None,
+        mem_limit: int,
+        cpuset_cpus: str | None,
+        network: str,
+        name: str | None,
+        labels: dict[str, str] | None,
+        extra_hosts: dict[str, str] | None
+    ) -> tuple[str, str]:
+        ...
+
+    def control_url(self, container_id: str, host_port: int) -> str:
+        return f"http://127.0.0.1:{host_port}"
+
+    def host_gateway(self) -> str:
+        return "127.0.0.1"
+
+    @abstractmethod
+    def create_network(self, name: str, labels: dict[str, str] | None = None) -> None:
+        ...
+
+    @abstractmethod
+    def remove_network(self, name: str) -> None:
+        ...
+
+    @abstractmethod
+    async def start_container(self, container_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def stop_container(self, container_id: str, grace: float) -> None:
+        ...
+
+    @abstractmethod
+    async def remove_container(self, container_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def list_containers(self, labels: dict[str, str]) -> list[str]:
+        ...
+
+    @abstractmethod
+    async def exec(self, container_id: str, command: list[str]) -> tuple[int, bytes]:
+        ...
+
+    @abstractmethod
+    async def read_file(self, container_id: str, file_path: str) -> str:
+        ...
+
+    @abstractmethod
+    async def read_stats(self, container_id: str) -> dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def logs(self) -> LogMultiplexer:
+        ...
+
+    @abstractmethod
+    def container_states(self) -> ContainerStateCache:
+        ...
+
+class DockerBackend(ContainerBackend):
+    def __init__(self, *, timeout: int = 600, max_pool_size: int = 10_000, stats_concurrency: int = 32) -> None:
+        self.timeout: int = timeout
+        self.max_pool_size: int = max_pool_size
+        self.stats_concurrency: int = int(stats_concurrency)
+        self.__client: docker.DockerClient | None = None
+        self.__networks: set[str] = set()
+        self.__api: DockerAPI | None = None
+        self.__stats_api: DockerAPI | None = None
+        self.__stats_semaphore: asyncio.Semaphore = asyncio.Semaphore(self.stats_concurrency)
+        self.__log_multiplexer: LogMultiplexer | None = None
+        self.__container_states: ContainerStateCache | None = None
+        self.__host_gateway: str | None = None
+
+    @property
+    def client(self) -> docker.DockerClient:
+        if self.__client is None:
+            import docker
+            self.__client = docker.from_env(timeout = self.timeout, max_pool_size = self.max_pool_size)
+        return self.__client
+
+    def api(self) -> DockerAPI:
+        if self.__api is None:
+            self.__api = DockerAPI(timeout = self.timeout)
+        return self.__api
+
+    def logs(self) -> LogMultiplexer:
+        if self.__log_multiplexer is None:
+            self.__log_multiplexer = LogMultiplexer(self.api())
+        return self.__log_multiplexer
+
+    def container_states(self) -> ContainerStateCache:
+        if self.__container_states is None:
+            self.__container_states = ContainerStateCache(self.api())
+        return self.__container_states
+
+    def create_container(
+        self,
+        *,
+        image: str,
+        command: str | list[str],
+        environment: dict[str, str] | None,
+        control_port: int | None,
+        host_port: int | None,
+        mem_limit: int,
+        cpuset_cpus: str | None,
+        network: str,
+        name: str | None,
+        labels: dict[str, str] | None,
+        extra_hosts: dict[str, str] | None
+    ) -> tuple[str, str]:
+        if network not in self.__networks:
+            self.create_network(network)
+        container = self.client.containers.create(
+            image = image,
+            command = command,
+            detach = True,
+            name = name,
+            labels = labels,
+            network = network,
+            environment = environment,
+            ports = {f"{control_port}/tcp": host_port} if control_port else None,
+            mem_limit = mem_limit,
+            memswap_limit = mem_limit,
+            cpuset_cpus = cpuset_cpus,
+            extra_hosts = extra_hosts,
+            auto_remove = True
+        )
+        return str(container.id), str(container.name)
+
+    def host_gateway(self) -> str:
+        if self.__host_gateway is None:
+            configs: list[dict[str, Any]] = self.client.networks.get("bridge").attrs.get("IPAM", {}).get("Config") or []
+            gateway: str | None = next((c["Gateway"] for c in configs if c.get("Gateway")), None)
+            if gateway is None:
+                raise RuntimeError("Docker bridge network has no gateway address")
+            self.__host_gateway = gateway
+        return self.__host_gateway
+
+    def create_network(self, name: str, labels: dict[str, str] | None = None) -> None:
+        if not self.client.networks.list(names = [name]):
+            self.client.networks.create(name, labels = labels)
+        self.__networks.add(name)
+
+    def remove_network(self, name: str) -> None:
+        self.__networks.discard(name)
+        for network in self.client.networks.list(names = [name]):
+            network.remove()
+        if self.client.networks.list(names = [name]):
+            raise RuntimeError(f"Network {name} survived teardown")
+
+    async def __request(self, method: str, url: str, *ignored: int, **params: Any) -> Any:
+        try:
+            return await self.api().request(method, url, params = params)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in ignored:
+                raise
+
+    async def start_container(self, container_id: str) -> None:
+        await self.__request("POST", f"/containers/{container_id}/start")
+
+    async def stop_container(self, container_id: str, grace: float) -> None:
+        await self.__request("POST", f"/containers/{container_id}/stop", 304, 404, 409, t = math.ceil(grace))
+
+    async def remove_container(self, container_id: str) -> None:
+        await self.__request("DELETE", f"/containers/{container_id}", 304, 404, 409, force = "true")
+
+    async def list_containers(self, labels: dict[str, str]) -> list[str]:
+        containers: list[dict[str, Any]] = await self.api().request(
+            "GET",
+            "/containers/json",
+            params = {
+                "all": "true",
+                "filters": json.dumps({"label": [f"{k}={v}" for k, v in labels.items()]})
+            }
+        )
+        return [container["Id"] for container in containers]
+
+    async def exec(self, container_id: str, command: list[str]) -> tuple[int, bytes]:
+        container = await asyncio.to_thread(self.client.containers.get, container_id)
+        exec_code, output = await asyncio.to_thread(container.exec_run, command)
+        return exec_code, output
+
+    async def read_file(self, container_id: str, file_path: str) -> str:
+        container = await asyncio.to_thread(self.client.containers.get, container_id)
+        data_stream, stat = await asyncio.to_thread(container.get_archive, file_path)
+
+        file_bytes = io.BytesIO()
+        for chunk in data_stream:
+            file_bytes.write(chunk)
+
+        file_bytes.seek(0)
+
+        with tarfile.open(fileobj = file_bytes) as tar:
+            member = tar.getmembers()[0]
+            extracted_file = tar.extractfile(member)
+            if extracted_file:
+                return extracted_file.read().decode("utf-8")
+            raise FileNotFoundError(f"Unable to read {file_path} from {container_id[:12]}")
+
+    def stats_api(self) -> DockerAPI:
+        if self.__stats_api is None:
+            self.__stats_api = DockerAPI(
+                timeout = self.timeout,
+                limits = httpx.Limits(max_connections = self.stats_concurrency, max_keepalive_connections = self.stats_concurrency)
+            )
+        return self.__stats_api
+
+    async def read_stats(self, container_id: str) -> dict[str, Any]:
+        async with self.__stats_semaphore:
+            return await self.stats_api().request("GET", f"/containers/{container_id}/stats", params = {"stream": "false"})
+
+BACKENDS: dict[str, Callable[[], ContainerBackend]] = {}
+
+def register_backend(name: str, factory: Callable[[], ContainerBackend]) -> None:
+    BACKENDS[name] = factory
+
+def create_backend(name: str | None = None) -> ContainerBackend:
+    name = name or os.environ.get("STREAMSLAB_BACKEND", DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown container backend {name}, expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+register_backend("docker", DockerBackend)
@@ -0,0 +1,236 @@
+from __future__ import annotations
+from itertools import product
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any
+import uuid
+
+import networkx as nx
+
+from .experiment import generate_traffic
+from .gossip import import_snapshot
+from .lab import Lab
+from .labscheduler import LabJob, LabScheduler, run_lab_job
+from .paygraph import PayGraph
+from .rebalance import reset_balances
+from .results import ResultStore, RunRecorder
+from .topology import generate
+from .workload import WorkloadSampler
+
+class ExperimentEntry:
+    def __init__(self, *, graph: dict[str, Any], rate: float | None, amount: int, duration: float, repetition: int) -> None:
+        self.graph: dict[str, Any] = graph
+        self.rate: float | None = rate
+        self.amount: int = int(amount)
+        self.duration: float = float(duration)
+        self.repetition: int = int(repetition)
+
+    @property
+    def graph_key(self) -> str:
+        return json.dumps(self.graph, sort_keys = True)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "graph": self.graph,
+            "rate": self.rate,
+            "amount": self.amount,
+            "duration": self.duration,
+            "repetition": self.repetition
+        }
+
+class ExperimentSpec:
+    def __init__(
+        self,
+        name: str,
+        *,
+        graphs: list[dict[str, Any]],
+        rates: list[float | None],
+        amounts: list[int],
+        durations: list[float],
+        repetitions: int = 1,
+        reset_balances: bool = True,
+        reset_tolerance: float = 0.05,
+        block_interval: float | None = None,
+        senders: str = "uniform",
+        recipients: str = "uniform",
+        amount_distribution: str = "normal",
+        processes: int = 1
+    ) -> None:
+        if not graphs:
+            raise ValueError("An experiment spec needs at least one graph")
+        self.name: str = name
+        self.graphs: list[dict[str, Any]] = graphs
+        self.rates: list[float | None] = rates or [None]
+        self.amounts: list[int] = amounts
+        self.durations: list[float] = durations
+        self.repetitions: int = int(repetitions)
+        self.reset_balances: bool = bool(reset_balances)
+        self.reset_tolerance: float = float(reset_tolerance)
+        self.block_interval: float | None = block_interval
+        self.senders: str = senders
+        self.recipients: str = recipients
+        self.amount_distribution: str = amount_distribution
+        self.processes: int = int(processes)
+
+    @classmethod
+    def load(cls, path: str) -> ExperimentSpec:
+        with open(path, encoding = "utf-8") as file:
+            spec: dict[str, Any] = json.load(file)
+
+        return cls(
+            spec.get("name", os.path.splitext(os.path.basename(path))[0]),
+            graphs = spec["graphs"],
+            rates = spec.get("rates", [None]),
+            amounts = spec.get("amounts", [10_000_000]),
+            durations = spec.get("durations", [600]),
+            repetitions = spec.get("repetitions", 1),
+            reset_balances = spec.get("reset_balances", True),
+            reset_tolerance = spec.get("reset_tolerance", 0.05),
+            block_interval = spec.get("block_interval"),
+            senders = spec.get("senders", "uniform"),
+            recipients = spec.get("recipients", "uniform"),
+            amount_distribution = spec.get("amount_distribution", "normal"),
+            processes = spec.get("processes", 1)
+        )
+
+    def entries(self) -> list[ExperimentEntry]:
+        return [
+            ExperimentEntry(graph = graph, rate = rate, amount = amount, duration = duration, repetition = repetition)
+            for graph, rate, amount, duration, repetition in product(self.graphs, self.rates, self.amounts, self.durations, range(self.repetitions))
+        ]
+
+def build_graph(graph: dict[str, Any]) -> PayGraph:
+    if "file" in graph:
+        return PayGraph.load(graph["file"])
+    if "snapshot" in graph:
+        return import_snapshot(
+            graph["name"],
+            graph["snapshot"],
+            k_core = graph.get("k_core"),
+            center = graph.get("center"),
+            radius = graph.get("radius"),
+            mean_balance_ratio = graph.get("mean_balance_ratio", 0.5)
+        )
+    if "model" in graph:
+        return generate(
+            graph["name"],
+            graph["model"],
+            nodes = graph["nodes"],
+            seed = graph.get("seed"),
+            attributes = graph.get("attributes"),
+            **graph.get("parameters", {})
+        )
+    raise ValueError(f"Graph entry {graph} needs one of file, snapshot or model")
+
+class BatchRunner:
+    def __init__(self, spec: ExperimentSpec, *, directory: str = "Experiments", concurrent: bool = False, store: ResultStore | None = None) -> None:
+        self.spec: ExperimentSpec = spec
+        self.directory: str = os.path.join(directory, spec.name)
+        self.concurrent: bool = concurrent
+        self.store: ResultStore = store or ResultStore(os.path.join(directory, "results.sqlite"))
+        self.runs: list[dict[str, Any]] = []
+        self.batch_id: str = f"{spec.name}_{time.strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+    def __write(self, file_name: str, content: Any) -> None:
+        with open(os.path.join(self.directory, file_name), "w", encoding = "utf-8") as file:
+            json.dump(content, file, indent = 4)
+
+    def __run_id(self, index: int, namespace: str) -> str:
+        return f"{self.batch_id}_{index:04d}_{namespace}"
+
+    async def __run_entries(self, lab: Lab, entries: list[tuple[int, ExperimentEntry]], graph_hash: str) -> None:
+        for position, (index, entry) in enumerate(entries):
+            run_id: str = self.__run_id(index, lab.namespace)
+            self.store.switch_run(lab, run_id)
+            reset: dict[str, int] = {}
+            if position and self.spec.reset_balances:
+                reset = await reset_balances(lab, tolerance = self.spec.reset_tolerance)
+            with lab.log_context():
+                logging.info(f"BATCH_RUN_START {self.spec.name} {run_id}")
+            started_at: float = time.time()
+            try:
+                workload: WorkloadSampler = WorkloadSampler.from_graph(
+                    lab.graph,
+                    entry.amount,
+                    node_keys = list(lab.nodes),
+                    senders = self.spec.senders,
+                    recipients = self.spec.recipients,
+                    amount_distribution = self.spec.amount_distribution,
+                    seed = f"{lab.name}:{entry.rate}:{entry.amount}:{entry.repetition}"
+                )
+                stats: dict[str, int] = await generate_traffic(
+                    lab,
+                    entry.amount,
+                    rate = entry.rate,
+                    duration = entry.duration,
+                    workload = workload,
+                    processes = self.spec.processes,
+                    recorder = RunRecorder(self.store, run_id)
+                )
+                error: str | None = None
+            except Exception as e:
+                stats, error = {}, str(e)
+                with lab.log_context():
+                    logging.error(f"BATCH_RUN_FAILED {self.spec.name} {run_id} {e}")
+
+            run: dict[str, Any] = {
+                "id": run_id,
+                "batch": self.spec.name,
+                "lab": lab.namespace,
+                "graph": graph_hash,
+                "log": f"Logs/{lab.namespace}.log",
+                "started_at": started_at,
+                "finished_at": time.time(),
+                "parameters": entry.as_dict(),
+                "traffic": stats,
+                "reset": reset,
+                "error": error
+            }
+            self.runs.append(run)
+            self.store.add_run(run, graph_hash)
+            self.__write(f"{run_id}.json", run)
+            self.__write("manifest.json", {"spec": self.spec.name, "runs": sorted(r["id"] for r in self.runs)})
+            with lab.log_context():
+                logging.info(f"BATCH_RUN_DONE {self.spec.name} {run_id} {stats}")
+
+    async def run(self) -> list[dict[str, Any]]:
+        os.makedirs(self.directory, exist_ok = True)
+        self.store.open()
+        try:
+            await self.__run()
+        finally:
+            await asyncio.to_thread(self.store.close)
+        return self.runs
+
+    async def __run(self) -> None:
+        groups: dict[str, list[tuple[int, ExperimentEntry]]] = {}
+        for index, entry in enumerate(self.spec.entries()):
+            groups.setdefault(entry.graph_key, []).append((index, entry))
+
+        jobs: list[LabJob] = []
+        for position, entries in enumerate(groups.values()):
+            graph: PayGraph = build_graph(entries[0][1].graph)
+            graph_file: str = f"Graphs/{graph.name}.graphml.xml"
+            nx.write_graphml_xml(graph, graph_file)
+            graph_hash: str = self.store.add_graph(graph, graph_file)
+            jobs.append(LabJob(
+                graph,
+                lambda lab, entries = entries, graph_hash = graph_hash: self.__run_entries(lab, entries, graph_hash),
+                namespace = f"{graph.name}_{position}" if self.concurrent else graph.name,
+                setup = lambda lab, index = entries[0][0]: self.store.follow(lab, self.__run_id(index, lab.namespace)),
+                block_interval = self.spec.block_interval
+            ))
+
+        if self.concurrent:
+            for result in await LabScheduler().run(jobs):
+                if isinstance(result, BaseException):
+                    logging.error(f"BATCH_LAB_FAILED {self.spec.name} {result}")
+        else:
+            for job in jobs:
+                try:
+                    await run_lab_job(job, Lab(job.graph, namespace = job.namespace, **job.options))
+                except Exception as e:
+                    logging.error(f"BATCH_LAB_FAILED {self.spec.name} {job.namespace} {e}")
@@ -0,0 +1,117 @@
+from __future__ import annotations
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable
+
+from .node import Node
+
+class BlockClock:
+    def __init__(
+        self,
+        mine: Callable[[int], Awaitable[int]],
+        nodes: dict[str, Node],
+        *,
+        tip: Callable[[], Awaitable[int]] | None = None,
+        interval: float = 30.0,
+        jitter: float = 0.2,
+        lag_interval: float = 10.0,
+        concurrency: int = 50,
+        seed: int | str | None = None
+    ) -> None:
+        self.__mine: Callable[[int], Awaitable[int]] = mine
+        self.__nodes: dict[str, Node] = nodes
+        self.__tip: Callable[[], Awaitable[int]] | None = tip
+        self.interval: float = float(interval)
+        self.jitter: float = float(jitter)
+        self.lag_interval: float = float(lag_interval)
+        self.__semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        self.__random: random.Random = random.Random(seed)
+        self.height: int | None = None
+        self.blocks_mined: int = 0
+        self.heights: dict[str, int] = {}
+        self.__tasks: list[asyncio.Task] = []
+
+    @property
+    def is_running(self) -> bool:
+        return any(not task.done() for task in self.__tasks)
+
+    @property
+    def lags(self) -> dict[str, int]:
+        if self.height is None:
+            return {}
+        return {node_key: max(0, self.height - height) for node_key, height in self.heights.items()}
+
+    @property
+    def max_lag(self) -> int:
+        return max(self.lags.values(), default = 0)
+
+    def lagging(self, threshold: int = 1) -> list[str]:
+        return [node_key for node_key, lag in self.lags.items() if lag >= threshold]
+
+    def next_delay(self) -> float:
+        return max(0.0, self.interval * (1 + self.__random.uniform(-self.jitter, self.jitter)))
+
+    def __reset(self) -> None:
+        self.height = None
+        self.blocks_mined = 0
+        self.heights = {}
+
+    def start(self) -> None:
+        if not self.is_running:
+            self.__reset()
+            self.__tasks = [
+                asyncio.create_task(self.__produce(), name = "BLOCK_CLOCK"),
+                asyncio.create_task(self.__track(), name = "BLOCK_CLOCK_LAG")
+            ]
+
+    async def __produce(self) -> None:
+        while True:
+            delay: float = self.next_delay()
+            await asyncio.sleep(delay)
+            try:
+                self.height = await self.__mine(1)
+                self.blocks_mined += 1
+                logging.info(f"BLOCK_MINED {self.height} {delay:.1f}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"BLOCK_CLOCK {e}")
+
+    async def __read_height(self, node_key: str, node: Node) -> None:
+        async with self.__semaphore:
+            try:
+                self.heights[node_key] = await node.get_block_height()
+            except Exception as e:
+                logging.warning(f"BLOCK_CLOCK_LAG {node_key} {e}")
+
+    async def __seed_height(self) -> None:
+        if self.height is None and self.__tip is not None:
+            try:
+                self.height = await self.__tip()
+            except Exception as e:
+                logging.warning(f"BLOCK_CLOCK_TIP {e}")
+
+    async def __track(self) -> None:
+        await self.__seed_height()
+        while True:
+            started_at: float = time.monotonic()
+            await asyncio.gather(*(self.__read_height(k, n) for k, n in list(self.__nodes.items())))
+            for node_key in self.heights.keys() - self.__nodes.keys():
+                del self.heights[node_key]
+            lags: dict[str, int] = self.lags
+            if lags:
+                logging.info(f"SYNC_LAG {self.height} {max(lags.values())} {sum(lags.values()) / len(lags):.2f} {sum(1 for lag in lags.values() if lag)}")
+            await asyncio.sleep(max(0.0, self.lag_interval - (time.monotonic() - started_at)))
+
+    async def stop(self) -> None:
+        for task in self.__tasks:
+            task.cancel()
+        for task in self.__tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                ...
+        self.__tasks = []
+        self.__reset()
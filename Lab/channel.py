@@ -1,4 +1,5 @@
 from typing import Any, Generator, Self, overload
+import time
 from .node import Node
 
 class Channel:
@@ -10,19 +11,51 @@ class Channel:
         self.id: str = str(id)
         self.source: Node = source
         self.destination: Node = destination
+        self.short_channel_id: str | None = None
+        self.state: str | None = None
         self.capacity: int
         self.balance: int
         self.base_fee: int
         self.ppm_fee: int
+        self.cltv_delta: int = 34
+        self.updated_at: float = 0.0
 
     def __await__(self) -> Generator[Any, None, Self]:
         return self.update().__await__()
     
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.updated_at
+
     async def update(self) -> Self:
-        list_funds = await self.source.execute("listfunds")
+        peer_channels = await self.source.execute("listpeerchannels", id = self.destination.public_key)
+
+        for state in peer_channels["channels"]:
+            if state.get("channel_id") == self.id:
+                self.load(state)
+                break
 
         return self
     
+    def load(self, state: dict[str, Any]) -> bool:
+        local_policy: dict[str, Any] = state.get("updates", {}).get("local", {})
+
+        previous: tuple[Any, ...] = self.__snapshot()
+
+        self.short_channel_id = state.get("short_channel_id", self.short_channel_id)
+        self.state = state.get("state", self.state)
+        self.capacity = int(state["total_msat"])
+        self.balance = int(state["to_us_msat"])
+        self.base_fee = int(local_policy.get("fee_base_msat", state.get("fee_base_msat", 0)))
+        self.ppm_fee = int(local_policy.get("fee_proportional_millionths", state.get("fee_proportional_millionths", 0)))
+        self.cltv_delta = int(local_policy.get("cltv_expiry_delta", self.cltv_delta))
+        self.updated_at = time.monotonic()
+
+        return previous != self.__snapshot()
+    
+    def __snapshot(self) -> tuple[Any, ...]:
+        return tuple(getattr(self, a, None) for a in ("capacity", "balance", "base_fee", "ppm_fee", "state"))
+    
     @overload
     async def set_fee(self, *, new_base_fee: int):
         ...
@@ -50,4 +83,10 @@ class Channel:
         await self.source.execute(
             "setchannel",
             **parameters
-        )
\ No newline at end of file
+        )
+
+        if new_base_fee is not None:
+            self.base_fee = new_base_fee
+        
+        if new_ppm_fee is not None:
+            self.ppm_fee = new_ppm_fee
@@ -0,0 +1,118 @@
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+
+from .channel import Channel
+from .node import Node
+
+class ChannelStateCache:
+    def __init__(self, channels: dict[str, Channel], *, max_age: float = 10, concurrency: int = 200) -> None:
+        self.__channels: dict[str, Channel] = channels
+        self.max_age: float = float(max_age)
+        self.__semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        self.__index: dict[Node, dict[str, list[str]]] = {}
+        self.__indexed_count: int = -1
+        self.__refreshed_at: dict[Node, float] = {}
+        self.__pending: dict[Node, asyncio.Task[set[str]]] = {}
+        self.__task: asyncio.Task | None = None
+        self.__listeners: list[Callable[[set[str]], None]] = []
+
+    @property
+    def is_running(self) -> bool:
+        return self.__task is not None and not self.__task.done()
+
+    def __build_index(self) -> dict[Node, dict[str, list[str]]]:
+        if self.__indexed_count != len(self.__channels):
+            index: dict[Node, dict[str, list[str]]] = {}
+            for key, channel in self.__channels.items():
+                index.setdefault(channel.source, {}).setdefault(channel.id, []).append(key)
+            self.__index = index
+            self.__indexed_count = len(self.__channels)
+        return self.__index
+
+    def add_listener(self, listener: Callable[[set[str]], None]) -> None:
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[set[str]], None]) -> None:
+        self.__listeners.remove(listener)
+
+    def reindex(self) -> None:
+        self.__indexed_count = -1
+
+    def notify(self, keys: set[str]) -> None:
+        if keys:
+            for listener in self.__listeners:
+                listener(keys)
+
+    def age(self, node: Node) -> float:
+        return time.monotonic() - self.__refreshed_at.get(node, float("-inf"))
+
+    async def refresh_node(self, node: Node) -> set[str]:
+        if node in self.__pending:
+            return await asyncio.shield(self.__pending[node])
+
+        task: asyncio.Task[set[str]] = asyncio.create_task(self.__refresh_node(node), name = f"REFRESH_CHANNELS {node}")
+        self.__pending[node] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self.__pending.pop(node, None)
+
+    async def __refresh_node(self, node: Node) -> set[str]:
+        channel_keys: dict[str, list[str]] = self.__build_index().get(node, {})
+        changed: set[str] = set()
+
+        async with self.__semaphore:
+            peer_channels: Any = await node.execute("listpeerchannels")
+
+        for state in peer_channels["channels"]:
+            for key in channel_keys.get(state.get("channel_id", ""), []):
+                if self.__channels[key].load(state):
+                    changed.add(key)
+
+        self.__refreshed_at[node] = time.monotonic()
+
+        self.notify(changed)
+
+        return changed
+
+    async def refresh(self, max_age: float = 0) -> set[str]:
+        nodes: list[Node] = [n for n in self.__build_index() if self.age(n) >= max_age]
+        results = await asyncio.gather(*(self.refresh_node(n) for n in nodes), return_exceptions = True)
+
+        changed: set[str] = set()
+        for node, result in zip(nodes, results):
+            if isinstance(result, BaseException):
+                logging.error(f"REFRESH_CHANNELS {node} {result}")
+            else:
+                changed |= result
+
+        return changed
+
+    async def get(self, key: str, max_age: float | None = None) -> Channel:
+        channel: Channel = self.__channels[key]
+        if self.age(channel.source) > (self.max_age if max_age is None else max_age):
+            await self.refresh_node(channel.source)
+        return channel
+
+    def start(self, interval: float | None = None) -> None:
+        if not self.is_running:
+            self.__task = asyncio.create_task(self.__run(self.max_age if interval is None else interval), name = "REFRESH_CHANNELS")
+
+    async def __run(self, interval: float) -> None:
+        while True:
+            started_at: float = time.monotonic()
+            changed: set[str] = await self.refresh(max_age = interval / 2)
+            logging.info(f"CHANNELS_REFRESHED {len(changed)} {time.monotonic() - started_at:.3f}")
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started_at)))
+
+    async def stop(self) -> None:
+        if self.__task:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                ...
+            self.__task = None
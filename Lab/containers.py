@@ -0,0 +1,86 @@
+from __future__ import annotations
+import asyncio
+import contextvars
+from contextlib import aclosing
+import json
+import logging
+
+from .dockerapi import DockerAPI
+
+class ContainerStateCache:
+    STATUSES: dict[str, str] = {
+        "create": "created",
+        "start": "running",
+        "restart": "running",
+        "unpause": "running",
+        "pause": "paused",
+        "die": "exited",
+        "kill": "exited",
+        "stop": "exited",
+        "oom": "exited",
+        "destroy": "removed"
+    }
+
+    def __init__(self, api: DockerAPI) -> None:
+        self.__api: DockerAPI = api
+        self.__statuses: dict[str, str] = {}
+        self.__changed: asyncio.Event = asyncio.Event()
+        self.__task: asyncio.Task | None = None
+
+    @property
+    def is_following(self) -> bool:
+        return self.__task is not None and not self.__task.done()
+
+    def follow(self) -> None:
+        if not self.is_following:
+            self.__task = asyncio.create_task(self.__follow(), name = "FOLLOW_CONTAINER_EVENTS", context = contextvars.Context())
+
+    def status(self, container_id: str) -> str | None:
+        return self.__statuses.get(container_id)
+
+    def update(self, container_id: str, status: str) -> None:
+        self.__statuses[container_id] = status
+        self.__changed.set()
+        self.__changed = asyncio.Event()
+
+    async def wait(self, container_id: str, *statuses: str) -> str:
+        while (status := self.__statuses.get(container_id)) not in statuses:
+            await self.__changed.wait()
+        return status
+
+    async def __follow(self) -> None:
+        while True:
+            buffer: bytes = b""
+            try:
+                async with aclosing(self.__api.stream(
+                    "GET",
+                    "/events",
+                    params = {"filters": json.dumps({"type": ["container"]})},
+                    timeout = None
+                )) as chunks:
+                    async for chunk in chunks:
+                        buffer += chunk
+                        *events, buffer = buffer.split(b"\n")
+                        for event in events:
+                            if event.strip():
+                                self.__apply(json.loads(event))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"FOLLOW_CONTAINER_EVENTS {e}")
+                await asyncio.sleep(1)
+
+    def __apply(self, event: dict) -> None:
+        action: str = event.get("Action", event.get("status", "")).split(":")[0]
+        container_id: str | None = event.get("Actor", {}).get("ID", event.get("id"))
+        if container_id and action in self.STATUSES:
+            self.update(container_id, self.STATUSES[action])
+
+    async def close(self) -> None:
+        if self.__task:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                ...
+            self.__task = None
@@ -0,0 +1,46 @@
+from __future__ import annotations
+import os
+from typing import Any, AsyncIterator
+
+import httpx
+
+class DockerAPI:
+    def __init__(self, host: str | None = None, *, timeout: float | None = None, limits: httpx.Limits | None = None) -> None:
+        self.host: str = host or os.environ.get("DOCKER_HOST", "unix:///var/run/docker.sock")
+        self.__timeout: float | None = timeout
+        self.__limits: httpx.Limits = limits or httpx.Limits(max_connections = 100, max_keepalive_connections = 20)
+        self.__client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self.__client is None:
+            if self.host.startswith("unix://"):
+                self.__client = httpx.AsyncClient(
+                    transport = httpx.AsyncHTTPTransport(uds = self.host.removeprefix("unix://")),
+                    base_url = "http://docker",
+                    timeout = self.__timeout,
+                    limits = self.__limits
+                )
+            else:
+                self.__client = httpx.AsyncClient(
+                    base_url = self.host.replace("tcp://", "http://", 1),
+                    timeout = self.__timeout,
+                    limits = self.__limits
+                )
+        return self.__client
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        response: httpx.Response = await self.client.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[bytes]:
+        async with self.client.stream(method, url, **kwargs) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_raw():
+                yield chunk
+
+    async def close(self) -> None:
+        if self.__client is not None:
+            await self.__client.aclose()
+            self.__client = None
@@ -1,39 +1,101 @@
 import asyncio
 import logging
-import random
+import time
 
 from .lab import Lab
+from .metrics import TrafficMetrics
 from .node import Node
+from .results import RunRecorder
+from .routing import Router
+from .trafficshard import generate_sharded_traffic
+from .workload import WorkloadSampler
+
+async def generate_traffic(
+    lab: Lab,
+    mean_amount,
+    *,
+    router: Router | None = None,
+    rate: float | None = None,
+    duration: float | None = None,
+    seed: str | None = None,
+    metrics: TrafficMetrics | None = None,
+    workload: WorkloadSampler | None = None,
+    processes: int = 1,
+    recorder: RunRecorder | None = None
+) -> dict[str, int]:
+    with lab.log_context():
+        if processes > 1:
+            if router:
+                raise ValueError("Sharded traffic pays through each node and cannot use a router")
+            return await generate_sharded_traffic(
+                lab,
+                mean_amount,
+                processes = processes,
+                rate = rate,
+                duration = duration,
+                seed = seed or f"{lab.name.split("_")[0]}:{lab.total_node_count}:{lab.total_channel_count}",
+                metrics = metrics,
+                workload = workload,
+                recorder = recorder
+            )
+        return await _generate_traffic(lab, mean_amount, router = router, rate = rate, duration = duration, seed = seed, metrics = metrics, workload = workload, recorder = recorder)
+
+async def _generate_traffic(
+    lab: Lab,
+    mean_amount,
+    *,
+    router: Router | None,
+    rate: float | None,
+    duration: float | None,
+    seed: str | None,
+    metrics: TrafficMetrics | None,
+    workload: WorkloadSampler | None,
+    recorder: RunRecorder | None
+) -> dict[str, int]:
+    stats: dict[str, int] = {"sent": 0, "succeeded": 0, "failed": 0}
 
-async def generate_traffic(lab: Lab, mean_amount):
     async def generate_pay_invoice(sender_key: str, recipient_key: str, amount: int):
+        started_at: float = metrics.start() if metrics else time.monotonic()
         try:
             recipient: Node = lab.nodes[recipient_key]
             invoice = await recipient.new_invoice(amount = amount, description = "Hello world")
             logging.info(f"INVOICE {sender_key} {recipient_key} {invoice}")
             sender: Node = lab.nodes[sender_key]
-            pay = await sender.pay_invoice(invoice)
+            pay = await (router.pay(sender_key, recipient_key, invoice, amount) if router else sender.pay_invoice(invoice))
             logging.info(f"PAYMENT {sender_key} {recipient_key} {pay}")
+            stats["succeeded"] += 1
+            if metrics:
+                metrics.finish(started_at, True)
+            if recorder:
+                recorder.payment(sender_key, recipient_key, amount, time.monotonic() - started_at, True)
             return pay
         except Exception as e:
             logging.error(f"PAYMENT {sender_key} {recipient_key} {amount} {e}")
+            stats["failed"] += 1
+            if metrics:
+                metrics.finish(started_at, False, sender_key)
+            if recorder:
+                recorder.payment(sender_key, recipient_key, amount, time.monotonic() - started_at, False, str(e))
             if isinstance(e, asyncio.CancelledError):
                 raise
 
-    generator = random.Random(f"{lab.name.split("_")[0]}:{lab.total_node_count}:{lab.total_channel_count}")
-    node_keys: list[str] = list(lab.nodes)
+    if workload is None:
+        workload = WorkloadSampler(
+            list(lab.nodes),
+            mean_amount,
+            seed = seed or f"{lab.name.split("_")[0]}:{lab.total_node_count}:{lab.total_channel_count}"
+        )
 
-    request_count: int  = lab.total_node_count // 4
-    wait_interval: float = 10 / request_count
+    request_count: int  = max(1, lab.total_node_count // 4)
+    wait_interval: float = 1 / rate if rate else 10 / request_count
+    deadline: float = time.monotonic() + duration if duration else float("inf")
 
     logging.info(f"TRAFFIC_START {lab.name}")
 
     async with asyncio.TaskGroup() as group:
-        while lab.status == Lab.Status.READY:
+        while lab.status == Lab.Status.READY and time.monotonic() < deadline:
             for _ in range(request_count):
-                sender_key: str = generator.choice(node_keys)
-                recipient_key: str = generator.choice(node_keys)
-                amount: int = int(generator.gauss(mean_amount, mean_amount * 0.25))
+                sender_key, recipient_key, amount = workload.next()
                 group.create_task(
                     generate_pay_invoice(
                         sender_key,
@@ -41,7 +103,11 @@ async def generate_traffic(lab: Lab, mean_amount):
                         amount),
                     name = f"GENERATE_PAY_INVOICE {sender_key} {recipient_key} {amount}"
                 )
+                stats["sent"] += 1
                 await asyncio.sleep(wait_interval)
+                if time.monotonic() >= deadline:
+                    break
 
 
-    logging.info(f"TRAFFIC_STOP {lab.name}")
+    logging.info(f"TRAFFIC_STOP {lab.name} {stats['sent']} {stats['succeeded']} {stats['failed']}")
+    return stats
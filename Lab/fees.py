@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import Iterable
+
+import numpy as np
+
+class FeePolicy:
+    def __init__(
+        self,
+        *,
+        base_fee_scale: float = 1.0,
+        ppm_fee_scale: float = 1.0,
+        base_fee_offset: int = 0,
+        ppm_fee_offset: int = 0,
+        base_fee: int | None = None,
+        ppm_fee: int | None = None,
+        keys: Iterable[str] | None = None
+    ) -> None:
+        self.base_fee_scale: float = float(base_fee_scale)
+        self.ppm_fee_scale: float = float(ppm_fee_scale)
+        self.base_fee_offset: int = int(base_fee_offset)
+        self.ppm_fee_offset: int = int(ppm_fee_offset)
+        self.base_fee: int | None = base_fee
+        self.ppm_fee: int | None = ppm_fee
+        self.keys: set[str] | None = set(keys) if keys is not None else None
+
+    @classmethod
+    def scale(cls, *, base_fee: float = 1.0, ppm_fee: float = 1.0, keys: Iterable[str] | None = None) -> FeePolicy:
+        return cls(base_fee_scale = base_fee, ppm_fee_scale = ppm_fee, keys = keys)
+
+    @classmethod
+    def fixed(cls, *, base_fee: int | None = None, ppm_fee: int | None = None, keys: Iterable[str] | None = None) -> FeePolicy:
+        return cls(base_fee = base_fee, ppm_fee = ppm_fee, keys = keys)
+
+    def selects(self, key: str) -> bool:
+        return self.keys is None or key in self.keys
+
+    def apply(self, base_fees: np.ndarray, ppm_fees: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        new_base_fees: np.ndarray = (
+            np.full_like(base_fees, self.base_fee) if self.base_fee is not None
+            else np.rint(base_fees * self.base_fee_scale).astype(np.int64) + self.base_fee_offset
+        )
+        new_ppm_fees: np.ndarray = (
+            np.full_like(ppm_fees, self.ppm_fee) if self.ppm_fee is not None
+            else np.rint(ppm_fees * self.ppm_fee_scale).astype(np.int64) + self.ppm_fee_offset
+        )
+        return np.maximum(new_base_fees, 0), np.maximum(new_ppm_fees, 0)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+from typing import Any, BinaryIO, Iterator
+
+import ijson
+import networkx as nx
+import numpy as np
+
+from .paygraph import PayGraph
+
+class GossipChannel:
+    def __init__(self, short_channel_id: str, node1: str, node2: str, capacity: int) -> None:
+        self.short_channel_id: str = short_channel_id
+        self.node1: str = node1
+        self.node2: str = node2
+        self.capacity: int = capacity
+        self.policies: dict[str, tuple[int, int]] = {}
+
+def _msat(value: Any) -> int:
+    if isinstance(value, str):
+        return int(value.removesuffix("msat"))
+    return int(value)
+
+def _short_channel_id(channel_id: Any) -> str:
+    value: int = int(channel_id)
+    return f"{value >> 40}x{(value >> 16) & 0xFFFFFF}x{value & 0xFFFF}"
+
+def _describegraph(file: BinaryIO) -> Iterator[GossipChannel]:
+    for edge in ijson.items(file, "edges.item"):
+        channel = GossipChannel(_short_channel_id(edge["channel_id"]), edge["node1_pub"], edge["node2_pub"], int(edge["capacity"]) * 1_000)
+        for node, policy in ((edge["node1_pub"], edge.get("node1_policy")), (edge["node2_pub"], edge.get("node2_policy"))):
+            if policy and not policy.get("disabled", False):
+                channel.policies[node] = (int(policy["fee_base_msat"]), int(policy["fee_rate_milli_msat"]))
+        yield channel
+
+def _listchannels(file: BinaryIO) -> Iterator[GossipChannel]:
+    pending: dict[str, GossipChannel] = {}
+    for half in ijson.items(file, "channels.item"):
+        short_channel_id: str = half["short_channel_id"]
+        channel: GossipChannel | None = pending.pop(short_channel_id, None)
+        complete: bool = channel is not None
+        if channel is None:
+            channel = GossipChannel(short_channel_id, half["source"], half["destination"], _msat(half["amount_msat"]))
+            pending[short_channel_id] = channel
+        if half.get("active", True):
+            channel.policies[half["source"]] = (int(half["base_fee_millisatoshi"]), int(half["fee_per_millionth"]))
+        if complete:
+            yield channel
+    yield from pending.values()
+
+def _detect(path: str) -> str:
+    with open(path, "rb") as file:
+        for prefix, event, value in ijson.parse(file):
+            if prefix == "" and event == "map_key":
+                if value in ("edges", "nodes"):
+                    return "describegraph"
+                if value == "channels":
+                    return "listchannels"
+    raise ValueError(f"{path} is neither a describegraph nor a listchannels snapshot")
+
+def import_snapshot(
+    name: str,
+    path: str,
+    *,
+    k_core: int | None = None,
+    center: str | None = None,
+    radius: int | None = None,
+    mean_balance_ratio: float = 0.5
+) -> PayGraph:
+    node_index: dict[str, int] = {}
+    sources: list[int] = []
+    targets: list[int] = []
+    short_channel_ids: list[str] = []
+    capacities: list[int] = []
+    policies: list[tuple[int, int, int, int]] = []
+
+    with open(path, "rb") as file:
+        channels: Iterator[GossipChannel] = _describegraph(file) if _detect(path) == "describegraph" else _listchannels(file)
+        for channel in channels:
+            if channel.node1 == channel.node2 or len(channel.policies) < 2:
+                continue
+            sources.append(node_index.setdefault(channel.node1, len(node_index)))
+            targets.append(node_index.setdefault(channel.node2, len(node_index)))
+            short_channel_ids.append(channel.short_channel_id)
+            capacities.append(channel.capacity)
+            policies.append((*channel.policies[channel.node1], *channel.policies[channel.node2]))
+
+    source_array: np.ndarray = np.array(sources, dtype = np.int32)
+    target_array: np.ndarray = np.array(targets, dtype = np.int32)
+    selected: np.ndarray = np.ones(len(sources), dtype = np.bool_)
+
+    if k_core is not None or radius is not None:
+        topology: nx.Graph = nx.Graph()
+        topology.add_edges_from(zip(sources, targets))
+        if k_core is not None:
+            topology = nx.k_core(topology, k_core)
+        if radius is not None:
+            if topology.number_of_nodes() == 0:
+                raise ValueError(f"{path} has no nodes left to center a radius of {radius} on" + (f" after taking its {k_core}-core" if k_core is not None else ""))
+            if center is not None and node_index.get(center) not in topology:
+                raise ValueError(f"Center {center} is not a node of {path}" + (f" or of its {k_core}-core" if k_core is not None else ""))
+            root: int = node_index[center] if center is not None else max(topology.degree, key = lambda d: d[1])[0]
+            topology = nx.ego_graph(topology, root, radius = radius)
+        kept: np.ndarray = np.zeros(len(node_index), dtype = np.bool_)
+        kept[list(topology.nodes)] = True
+        selected = kept[source_array] & kept[target_array]
+
+    public_keys: list[str] = list(node_index)
+    remap: np.ndarray = np.full(len(node_index), -1, dtype = np.int64)
+    used: np.ndarray = np.unique(np.concatenate([source_array[selected], target_array[selected]]))
+    remap[used] = np.arange(len(used))
+
+    capacity: np.ndarray = np.array(capacities, dtype = np.int64)[selected]
+    fees: np.ndarray = np.array(policies, dtype = np.int64).reshape(-1, 4)[selected]
+    balance: np.ndarray = np.clip(np.rint(capacity * mean_balance_ratio), 0, capacity).astype(np.int64)
+
+    graph: PayGraph = PayGraph(name)
+    graph.add_channels(
+        [f"n{i}" for i in remap[source_array[selected]].tolist()],
+        [f"n{i}" for i in remap[target_array[selected]].tolist()],
+        capacity = capacity,
+        balance = balance,
+        base_fee = fees[:, 0],
+        ppm_fee = fees[:, 1],
+        inbound_base_fee = fees[:, 2],
+        inbound_ppm_fee = fees[:, 3],
+        short_channel_id = np.array(short_channel_ids, dtype = np.str_)[selected]
+    )
+
+    for index in used.tolist():
+        graph.nodes[f"n{remap[index]}"]["public_key"] = public_keys[index]
+
+    return graph
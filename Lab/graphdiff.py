@@ -0,0 +1,68 @@
+from __future__ import annotations
+from typing import Any
+
+from .paygraph import PayGraph
+
+class GraphDiff:
+    FEE_ATTRIBUTES: tuple[str, str] = ("base_fee", "ppm_fee")
+
+    def __init__(self, current: PayGraph, target: PayGraph) -> None:
+        current_channels: dict[str, tuple[str, str, Any]] = self.__channels(current)
+        target_channels: dict[str, tuple[str, str, Any]] = self.__channels(target)
+
+        self.added_nodes: list[str] = [n for n in target.nodes if n not in current]
+        self.removed_nodes: list[str] = [n for n in current.nodes if n not in target]
+        self.added_channels: list[str] = []
+        self.removed_channels: list[str] = []
+        self.reopened_channels: list[str] = []
+        self.rebalanced_channels: list[str] = []
+        self.fees: dict[str, dict[str, int]] = {}
+
+        for key, (source, destination, edge) in target_channels.items():
+            if key not in current_channels:
+                self.added_channels.append(key)
+                continue
+
+            current_source, current_target, current_edge = current_channels[key]
+            if (current_source, current_target) != (source, destination):
+                self.removed_channels.append(key)
+                self.added_channels.append(key)
+            elif int(current_edge["capacity"]) != int(edge["capacity"]):
+                self.reopened_channels.append(key)
+            elif (
+                int(current_edge["balance"]) != int(edge["balance"])
+                or int(current[destination][source][PayGraph.get_inbound_edge_key(key)]["balance"])
+                    != int(target[destination][source][PayGraph.get_inbound_edge_key(key)]["balance"])
+            ):
+                self.rebalanced_channels.append(key)
+
+        self.removed_channels += [k for k in current_channels if k not in target_channels]
+
+        unchanged: set[str] = set(target_channels) - set(self.added_channels) - set(self.reopened_channels)
+        for source, destination, key, edge in target.edges(keys = True, data = True):
+            out_key: str = key if PayGraph.is_outbound_edge(key) else f"e{int(key[1:]) - 1}"
+            if out_key not in unchanged or not current.has_edge(source, destination, key):
+                continue
+            current_edge: Any = current[source][destination][key]
+            if any(int(current_edge[a]) != int(edge[a]) for a in self.FEE_ATTRIBUTES):
+                self.fees[key] = {a: int(edge[a]) for a in self.FEE_ATTRIBUTES}
+
+    @staticmethod
+    def __channels(graph: PayGraph) -> dict[str, tuple[str, str, Any]]:
+        return {
+            key: (source, target, edge)
+            for source, target, key, edge in graph.edges(keys = True, data = True)
+            if PayGraph.is_outbound_edge(key)
+        }
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added_nodes or self.removed_nodes or self.added_channels or self.removed_channels or self.reopened_channels or self.rebalanced_channels or self.fees)
+
+    def __str__(self) -> str:
+        return (
+            f"+{len(self.added_nodes)}/-{len(self.removed_nodes)} nodes "
+            f"+{len(self.added_channels)}/-{len(self.removed_channels)}/~{len(self.reopened_channels)} channels "
+            f"{len(self.rebalanced_channels)} balances "
+            f"{len(self.fees)} fees"
+        )
@@ -6,59 +6,173 @@ import resource
 from asyncio import Task
 import asyncio
 import math
-from typing import Any, Generator, Self
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Generator, Iterator, Mapping, Self
 import logging
 import random
+import time
+
+import numpy as np
 
 from .miner import Miner
 from .node import Node
+from .server import Server
 from .channel import Channel
+from .blockclock import BlockClock
+from .channelstate import ChannelStateCache
+from .fees import FeePolicy
+from .graphdiff import GraphDiff
 from .paygraph import PayGraph
+from .rpcproxy import RPCProxy
+from .minertopology import MINER_TOPOLOGIES, assign_nodes, measure_rpc_service_time, miner_links, rpc_calls_per_node, size_nodes_per_miner
 from .mtg import ManagedTaskGroup
+from .progress import PhaseChanged, ProgressBus, TaskCompleted, TaskFailed
+from .scheduler import MIB, AdmissionScheduler
 
 NODES_PER_MINER: int = 100
 
+CURRENT_LAB: ContextVar[str | None] = ContextVar("CURRENT_LAB", default = None)
+
+class LabLogFilter(logging.Filter):
+    def __init__(self, namespace: str) -> None:
+        super().__init__()
+        self.namespace: str = namespace
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return CURRENT_LAB.get() in (None, self.namespace)
+
 class Lab:
-    def __init__(self, graph: PayGraph) -> None:
+    def __init__(
+        self,
+        graph: PayGraph,
+        *,
+        namespace: str | None = None,
+        channel_refresh_interval: float | None = None,
+        scheduler: AdmissionScheduler | None = None,
+        nodes_per_miner: int | None = NODES_PER_MINER,
+        miner_topology: str = "star",
+        rpc_proxy: bool = False,
+        block_interval: float | None = None
+    ) -> None:
+        if miner_topology not in MINER_TOPOLOGIES:
+            raise ValueError(f"Unknown miner topology {miner_topology}, expected one of {', '.join(MINER_TOPOLOGIES)}")
+
         self.__graph: PayGraph = graph
+        self.__namespace: str = namespace or graph.name
+        self.__scheduler: AdmissionScheduler = scheduler or AdmissionScheduler()
         self.__miners: list[Miner] = []
+        self.__nodes_per_miner: int = nodes_per_miner or NODES_PER_MINER
+        self.__adaptive_nodes_per_miner: bool = nodes_per_miner is None
+        self.__miner_topology: str = miner_topology
+        self.__miner_assignment: dict[str, int] = {}
+        self.__use_rpc_proxy: bool = rpc_proxy
+        self.__rpc_proxies: list[RPCProxy] = []
         self.__connected_miners: list[str] = []
         self.__nodes: dict[str, Node] = {}
         self.__synced_nodes: list[str] = []
         self.__channel_utxos: dict[str, str] = {}
         self.__channels: dict[str, Channel] = {}
+        self.__channel_state: ChannelStateCache = ChannelStateCache(self.__channels)
+        self.__channel_refresh_interval: float | None = channel_refresh_interval
+        self.__block_clock: BlockClock | None = BlockClock(self.mine, self.__nodes, tip = self.__tip_height, interval = block_interval, seed = self.__namespace) if block_interval else None
 
         self.__status: Lab.Status = Lab.Status.STOPPED
+        self.__progress: ProgressBus = ProgressBus()
 
-        log_handler: RotatingFileHandler = RotatingFileHandler(
-            f"Logs/{self.name}.log",
+        self.__log_handler: RotatingFileHandler = RotatingFileHandler(
+            f"Logs/{self.namespace}.log",
             backupCount = 100,
             encoding = "utf-8"
         )
-        
-        logging.basicConfig(
-            handlers = [
-                log_handler
-            ],
-            level = logging.INFO,
-            format = "%(asctime)s %(levelname)s %(message)s",
-            encoding = "utf-8"
-        )
+        self.__log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        self.__log_handler.addFilter(LabLogFilter(self.namespace))
+
+        root_logger: logging.Logger = logging.getLogger()
+        if root_logger.getEffectiveLevel() > logging.INFO:
+            root_logger.setLevel(logging.INFO)
+        root_logger.addHandler(self.__log_handler)
 
         logging.getLogger("urllib3").setLevel(logging.WARNING)
         
-        log_handler.doRollover()
+        self.__log_handler.doRollover()
     
     def __await__(self) -> Generator[Any, None, Self]:
         return self.start().__await__()
 
+    @classmethod
+    def max_node_count(cls) -> int:
+        return AdmissionScheduler().max_node_count(NODES_PER_MINER)
+
+    @property
+    def scheduler(self) -> AdmissionScheduler:
+        return self.__scheduler
+
+    @property
+    def namespace(self) -> str:
+        return self.__namespace
+
+    @property
+    def network(self) -> str:
+        return f"streamslab_{self.__namespace}"
+
+    @property
+    def labels(self) -> dict[str, str]:
+        return {"streamslab.lab": self.__namespace}
+
+    @contextmanager
+    def log_context(self) -> Iterator[None]:
+        token = CURRENT_LAB.set(self.__namespace)
+        try:
+            yield
+        finally:
+            CURRENT_LAB.reset(token)
+
+    @property
+    def log_handler(self) -> logging.Handler:
+        return self.__log_handler
+
+    def close_log(self) -> None:
+        logging.getLogger().removeHandler(self.__log_handler)
+        self.__log_handler.close()
+
+    def __server_options(self, role: str, name: str) -> dict[str, Any]:
+        return {
+            "mem_limit": self.__scheduler.memory_limit(role),
+            "cpuset_cpus": self.__scheduler.cpuset(role),
+            "network": self.network,
+            "name": f"{self.__namespace}_{name}",
+            "labels": {**self.labels, "streamslab.role": role}
+        }
+    
+    async def __admit(self, server: Server, role: str) -> Server:
+        async with self.__scheduler.admit(role):
+            return await server.start()
+    
+    async def __release(self, server: Server, role: str, grace: float = 10) -> None:
+        await server.stop(grace)
+        self.__scheduler.release(role)
+
     @property
     def name(self) -> str:
         return self.__graph.name
     
+    @property
+    def graph(self) -> PayGraph:
+        return self.__graph
+    
+    @property
+    def nodes_per_miner(self) -> int:
+        return self.__nodes_per_miner
+
+    @property
+    def miner_topology(self) -> str:
+        return self.__miner_topology
+
     @property
     def total_miner_count(self) -> int:
-        return math.ceil(len(self.__graph.nodes) / NODES_PER_MINER)
+        return math.ceil(len(self.__graph.nodes) / self.__nodes_per_miner)
     
     @property
     def created_miner_count(self) -> int:
@@ -103,19 +217,49 @@ class Lab:
     @property
     def channels(self) -> dict[str, Channel]:
         return self.__channels
+    
+    @property
+    def channel_state(self) -> ChannelStateCache:
+        return self.__channel_state
+
+    @property
+    def block_clock(self) -> BlockClock | None:
+        return self.__block_clock
 
     async def start(self) -> Self:
+        with self.log_context():
+            return await self.__start()
+
+    def __check_capacity(self) -> None:
+        max_node_count: int = self.__scheduler.max_node_count(self.__nodes_per_miner)
+        required_memory: int = self.__scheduler.required_memory(self.total_node_count, self.total_miner_count)
+        logging.info(f"LAB_CAPACITY {self.name} {self.total_node_count} {max_node_count} {required_memory // MIB} {self.__scheduler.budget // MIB}")
+        if self.total_node_count > max_node_count:
+            raise RuntimeError(f"Lab {self.name} has {self.total_node_count} nodes but this host fits at most {max_node_count} with {self.__nodes_per_miner} nodes per miner")
+
+    async def __start(self) -> Self:
         if self.__status == Lab.Status.STOPPED:
-            soft_limit = 4096 * 4
-            hard_limit = 4096 * 8
-            resource.setrlimit(resource.RLIMIT_NOFILE, (soft_limit, hard_limit))
+            soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+            if soft_limit != resource.RLIM_INFINITY and soft_limit < 4096 * 4:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (4096 * 4, hard_limit if hard_limit == resource.RLIM_INFINITY else max(hard_limit, 4096 * 8)))
+
+            self.__check_capacity()
+
+            await asyncio.to_thread(Server.create_network, self.network, self.labels)
             
             await self.create_miners()
             await self.create_nodes()
             await self.create_channels()
             await self.sync_mine(6)
 
-            self.__status = Lab.Status.READY
+            if self.__channel_refresh_interval:
+                await self.__channel_state.refresh()
+                self.__channel_state.start(self.__channel_refresh_interval)
+
+            if self.__block_clock:
+                self.__block_clock.start()
+
+            self.__set_status(Lab.Status.READY)
         
         return self
     
@@ -132,19 +276,50 @@ class Lab:
     @property
     def status(self) -> Status:
         return self.__status
+
+    @property
+    def progress(self) -> ProgressBus:
+        return self.__progress
+
+    def __set_status(self, status: Status, total: int = 0) -> None:
+        self.__status = status
+        self.__progress.publish(PhaseChanged(self.__namespace, status, total))
+
+    def __on_task_done(self, task: Task[Any], elapsed: float) -> None:
+        if not self.__progress.has_subscribers:
+            return
+        if task.cancelled():
+            self.__progress.publish(TaskFailed(self.__namespace, self.__status, task.get_name(), "cancelled", elapsed))
+        elif task.exception():
+            self.__progress.publish(TaskFailed(self.__namespace, self.__status, task.get_name(), str(task.exception()), elapsed))
+        else:
+            self.__progress.publish(TaskCompleted(self.__namespace, self.__status, task.get_name(), elapsed))
         
     async def sync_mine(self, block_count: int) -> None:
-        miner: Miner = random.choice(self.__miners)
+        with self.log_context():
+            await self.__sync_mine(block_count)
+
+    async def __tip_height(self) -> int:
+        return await self.__miners[0].get_block_height()
+
+    async def mine(self, block_count: int) -> int:
+        miner: Miner = self.__miners[0] if self.__miner_topology == "star" else random.choice(self.__miners)
         await miner.mine(block_count)
-        new_block_height = await miner.get_block_height()
+        for proxy in self.__rpc_proxies:
+            proxy.invalidate()
+        return await miner.get_block_height()
 
-        if self.__status != Lab.Status.READY:
-            self.__status = Lab.Status.SYNC_NODES
+    async def __sync_mine(self, block_count: int) -> None:
+        new_block_height: int = await self.mine(block_count)
+
+        previous_status: Lab.Status = self.__status
+        if previous_status != Lab.Status.READY:
+            self.__set_status(Lab.Status.SYNC_NODES, len(self.__nodes))
 
         self.__synced_nodes.clear()
 
         try:
-            async with ManagedTaskGroup() as task_group:
+            async with ManagedTaskGroup(on_done = self.__on_task_done) as task_group:
                 for node_key in self.__nodes:
                     node: Node = self.__nodes[node_key]
                     task: Task = task_group.create_task(
@@ -156,62 +331,82 @@ class Lab:
             for e in eg.exceptions:
                 logging.error("WAIT_SYNC", eg.message, e)
 
-        if self.__status != Lab.Status.READY:
-            self.__status = Lab.Status.READY
+        if previous_status != Lab.Status.READY:
+            self.__set_status(previous_status)
     
     async def create_miners(self) -> None:
-        self.__status = Lab.Status.CREATE_MINERS
+        if self.__adaptive_nodes_per_miner and not self.__miners:
+            self.__set_status(Lab.Status.CREATE_MINERS, 1)
+            self.__miners.append(Miner(**self.__server_options("miner", "m0")))
+            await self.__admit(self.__miners[0], "miner")
+            service_time: float = await measure_rpc_service_time(self.__miners[0])
+            calls_per_node: float = rpc_calls_per_node(self.__block_clock.interval if self.__block_clock else None)
+            self.__nodes_per_miner = size_nodes_per_miner(service_time, calls_per_node = calls_per_node)
+            logging.info(f"NODES_PER_MINER {self.name} {service_time * 1000:.3f} {calls_per_node:.3f} {self.__nodes_per_miner}")
+            self.__check_capacity()
+
+        self.__set_status(Lab.Status.CREATE_MINERS, self.total_miner_count - len(self.__miners))
         try:
-            async with ManagedTaskGroup() as group:
-                for i in range(self.total_miner_count):
-                    self.__miners.insert(i, Miner())
+            async with ManagedTaskGroup(on_done = self.__on_task_done) as group:
+                for i in range(len(self.__miners), self.total_miner_count):
+                    self.__miners.insert(i, Miner(**self.__server_options("miner", f"m{i}")))
                     group.create_task(
-                        self.__miners[i].start(),
+                        self.__admit(self.__miners[i], "miner"),
                         name = f"CREATE_MINER m{i}"
                     )
         except ExceptionGroup as eg:
             for e in eg.exceptions:
                 logging.error("CREATE_MINER", eg.message, e)
             raise
-        
-        self.__status = Lab.Status.CONNECT_MINERS
+
+        links: list[tuple[int, int]] = miner_links(len(self.__miners), self.__miner_topology)
+        self.__set_status(Lab.Status.CONNECT_MINERS, len(links))
 
         try:
-            async with ManagedTaskGroup() as group:
-                for i in range(self.total_miner_count - 1):
-                    for j in range(i, self.total_miner_count):
-                        task: Task = group.create_task(
-                            self.__miners[i].connect(self.__miners[j]),
-                            name = f"CONNECT_MINER m{i} m{j}"
-                        )
-                        task.add_done_callback(lambda t: self.__connected_miners.append(t.get_name().split(" ")[1]))
+            async with ManagedTaskGroup(on_done = self.__on_task_done) as group:
+                for i, j in links:
+                    task: Task = group.create_task(
+                        self.__miners[i].connect(self.__miners[j]),
+                        name = f"CONNECT_MINER m{i} m{j}"
+                    )
+                    task.add_done_callback(lambda t: self.__connected_miners.append(t.get_name().split(" ")[1]))
         except ExceptionGroup as eg:
             for e in eg.exceptions:
                 logging.error("CONNECT_MINER", eg.message, e)
             raise
 
+        if self.__use_rpc_proxy:
+            self.__rpc_proxies = [RPCProxy(miner) for miner in self.__miners]
+            await asyncio.gather(*(proxy.start() for proxy in self.__rpc_proxies))
+
+    def __create_node(self, key: str) -> Node:
+        if key not in self.__miner_assignment:
+            self.__miner_assignment[key] = next(
+                (self.__miner_assignment[n] for n in self.__graph.successors(key) if n in self.__miner_assignment),
+                len(self.__nodes) % len(self.__miners)
+            )
+        miner: Miner = self.__miners[self.__miner_assignment[key]]
+        options: dict[str, Any] = self.__server_options("node", key)
+        if self.__rpc_proxies:
+            options["rpc_endpoint"] = (RPCProxy.HOST_ALIAS, self.__rpc_proxies[self.__miner_assignment[key]].port)
+            options["extra_hosts"] = {RPCProxy.HOST_ALIAS: "host-gateway"}
+        self.__nodes[key] = Node(miner = miner, **options)
+        return self.__nodes[key]
+
     async def create_nodes(self) -> None:
-        self.__status = Lab.Status.CREATE_NODES_FUND_CHANNELS
-        async def fund_channel(create_node_task: Task[Node], key: str) -> str:
-            node: Node = await create_node_task
-            node_address: str = await node.new_address()
-            block_hash: str = (await self.__miners[0].mine(1, node_address))[0]
-            txid: str = (await self.__miners[0].execute("getblock", block_hash))["tx"][0]
-            self.__channel_utxos[key] = txid
-            return txid
+        self.__set_status(Lab.Status.CREATE_NODES_FUND_CHANNELS, self.total_node_count + self.total_channel_count // 2)
+        self.__miner_assignment = assign_nodes(self.__graph, len(self.__miners))
         try:
-            async with ManagedTaskGroup() as group:
-                for i, n in enumerate(self.__graph.nodes):
-                    miner: Miner = self.__miners[i % len(self.__miners)]
-                    self.__nodes[n] = Node(miner = miner)
+            async with ManagedTaskGroup(on_done = self.__on_task_done) as group:
+                for n in self.__graph.nodes:
                     create_task: Task = group.create_task(
-                        self.__nodes[n].start(),
+                        self.__admit(self.__create_node(n), "node"),
                         name = f"CREATE_NODE {n}"
                     )
                     for source, target, key in self.__graph.edges(n, keys = True):
                         if PayGraph.is_outbound_edge(key):
-                            fund_channel_task: Task = group.create_task(
-                                fund_channel(create_task, key),
+                            group.create_task(
+                                self.__fund_channel_utxo(create_task, key, source),
                                 name = f"FUND_CHANNEL {key}"
                             )
         except ExceptionGroup as eg:
@@ -220,49 +415,57 @@ class Lab:
             raise
 
         await self.sync_mine(100)
+
+    async def __fund_channel_utxo(self, create_node: Awaitable[Any], key: str, source: str) -> str:
+        await create_node
+        node_address: str = await self.__nodes[source].new_address()
+        block_hash: str = (await self.__miners[0].mine(1, node_address))[0]
+        txid: str = (await self.__miners[0].execute("getblock", block_hash))["tx"][0]
+        self.__channel_utxos[key] = txid
+        return txid
+
+    async def __create_channel(self, key: str, source: str, target: str) -> str:
+        out_key: str = key
+        out_edge = self.__graph[source][target][out_key]
+        in_key: str = PayGraph.get_inbound_edge_key(out_key)
+        in_edge: Any = self.__graph[target][source][in_key]
+        out_node: Node = self.__nodes[source]
+        in_node: Node = self.__nodes[target]
+        await out_node.connect(in_node)
+        channel_id: str = await out_node.fund_channel(
+            destination = in_node,
+            capacity = out_edge["capacity"],
+            balance = out_edge["balance"],
+            utxo = f"{self.__channel_utxos[out_key]}:0"
+        )
+        self.__channels[out_key] = Channel(
+            id = channel_id,
+            source = out_node,
+            destination = in_node
+        )
+        await self.__channels[out_key].set_fee(
+            new_base_fee = out_edge["base_fee"],
+            new_ppm_fee = out_edge["ppm_fee"]
+        )
+        self.__channels[in_key] = Channel(
+            id = channel_id,
+            source = in_node,
+            destination = out_node
+        )
+        await self.__channels[in_key].set_fee(
+            new_base_fee = in_edge["base_fee"],
+            new_ppm_fee = in_edge["ppm_fee"]
+        )
+        return channel_id
     
     async def create_channels(self) -> None:
-        self.__status = Lab.Status.CREATE_CHANNELS
-        async def create_channel(key: str, source: str, target: str) -> str:
-            out_key: str = key
-            out_edge = self.__graph[source][target][out_key]
-            in_key: str = PayGraph.get_inbound_edge_key(out_key)
-            in_edge: Any = self.__graph[target][source][in_key]
-            out_node: Node = self.__nodes[source]
-            in_node: Node = self.__nodes[target]
-            await out_node.connect(in_node)
-            channel_id: str = await out_node.fund_channel(
-                destination = in_node,
-                capacity = out_edge["capacity"],
-                balance = out_edge["balance"],
-                utxo = f"{self.__channel_utxos[out_key]}:0"
-            )
-            self.__channels[out_key] = Channel(
-                id = channel_id,
-                source = out_node,
-                destination = in_node
-            )
-            await self.__channels[out_key].set_fee(
-                new_base_fee = out_edge["base_fee"],
-                new_ppm_fee = out_edge["ppm_fee"]
-            )
-            self.__channels[in_key] = Channel(
-                id = channel_id,
-                source = in_node,
-                destination = out_node
-            )
-            await self.__channels[in_key].set_fee(
-                new_base_fee = in_edge["base_fee"],
-                new_ppm_fee = in_edge["ppm_fee"]
-            )
-            return channel_id
-
+        self.__set_status(Lab.Status.CREATE_CHANNELS, self.total_channel_count // 2)
         try:
-            async with ManagedTaskGroup() as group:
+            async with ManagedTaskGroup(on_done = self.__on_task_done) as group:
                 for source, target, key in self.__graph.edges(keys = True):
                     if PayGraph.is_outbound_edge(key):
                         group.create_task(
-                            create_channel(key, source, target),
+                            self.__create_channel(key, source, target),
                             name = f"CREATE_CHANNEL {key}"
                         )
         except ExceptionGroup as eg:
@@ -271,39 +474,230 @@ class Lab:
                 logging.error(f"CREATE_CHANNEL {e}")
             raise
 
-    async def stop(self) -> None:
-        if self.__status == Lab.Status.READY:
-            self.__status = Lab.Status.STOPPING
-            await self.stop_nodes()
-            await self.stop_miners()
-            self.__status = Lab.Status.STOPPED
+    async def reconfigure(self, target: PayGraph, *, concurrency: int = 100) -> GraphDiff:
+        with self.log_context():
+            return await self.__reconfigure(target, concurrency = concurrency)
+
+    async def __reconfigure(self, target: PayGraph, *, concurrency: int = 100) -> GraphDiff:
+        if self.__status != Lab.Status.READY:
+            raise RuntimeError(f"Lab {self.name} must be running to be reconfigured")
+
+        started_at: float = time.monotonic()
+        diff: GraphDiff = GraphDiff(self.__graph, target)
+        logging.info(f"RECONFIGURE_START {self.name} {target.name} {diff}")
+
+        if diff.fees:
+            await self.__update_fees(diff.fees, concurrency = concurrency)
+
+        closing: list[str] = diff.removed_channels + diff.reopened_channels
+        opening: list[str] = diff.reopened_channels + diff.added_channels
+
+        async def close_channel(key: str) -> None:
+            channel: Channel | None = self.__channels.pop(key, None)
+            self.__channels.pop(PayGraph.get_inbound_edge_key(key), None)
+            self.__channel_utxos.pop(key, None)
+            if channel is None:
+                logging.warning(f"RECONFIGURE_CLOSE_SKIPPED {key}")
+                return
+            await channel.source.close_channel(channel.id)
+
+        try:
+            async with ManagedTaskGroup(semaphore = concurrency, on_done = self.__on_task_done) as group:
+                for key in closing:
+                    group.create_task(close_channel(key), name = f"CLOSE_CHANNEL {key}")
+            async with ManagedTaskGroup(semaphore = concurrency, on_done = self.__on_task_done) as group:
+                for n in diff.removed_nodes:
+                    group.create_task(self.__release(self.__nodes.pop(n), "node", 0), name = f"STOP_NODE {n}")
+        except ExceptionGroup as eg:
+            for e in eg.exceptions:
+                logging.error(f"RECONFIGURE_CLOSE {e}")
+            raise
+
+        self.__graph = target
+
+        if opening or diff.added_nodes:
+            self.__set_status(Lab.Status.CREATE_NODES_FUND_CHANNELS, len(diff.added_nodes) + len(opening))
+            sources: dict[str, str] = {key: source for source, _, key in target.edges(keys = True) if PayGraph.is_outbound_edge(key)}
+            try:
+                async with ManagedTaskGroup(on_done = self.__on_task_done) as group:
+                    created: dict[str, Task] = {
+                        n: group.create_task(self.__admit(self.__create_node(n), "node"), name = f"CREATE_NODE {n}")
+                        for n in diff.added_nodes
+                    }
+                    for key in opening:
+                        group.create_task(
+                            self.__fund_channel_utxo(created.get(sources[key]) or asyncio.sleep(0), key, sources[key]),
+                            name = f"FUND_CHANNEL {key}"
+                        )
+            except ExceptionGroup as eg:
+                for e in eg.exceptions:
+                    logging.error(f"RECONFIGURE_FUND {e}")
+                raise
+
+            await self.__sync_mine(100)
+
+            self.__set_status(Lab.Status.CREATE_CHANNELS, len(opening))
+            try:
+                async with ManagedTaskGroup(semaphore = concurrency, on_done = self.__on_task_done) as group:
+                    for source, target_key, key in target.edges(keys = True):
+                        if key in opening:
+                            group.create_task(self.__create_channel(key, source, target_key), name = f"CREATE_CHANNEL {key}")
+            except ExceptionGroup as eg:
+                for e in eg.exceptions:
+                    logging.error(f"RECONFIGURE_OPEN {e}")
+                raise
+
+        if closing or opening:
+            await self.__sync_mine(6)
+
+        touched: set[str] = set(diff.fees)
+        for key in closing + opening:
+            touched |= {key, PayGraph.get_inbound_edge_key(key)}
+        self.__channel_state.reindex()
+        self.__channel_state.notify(touched)
+
+        if diff.rebalanced_channels:
+            from .rebalance import reset_balances
+            rebalanced: dict[str, int] = await reset_balances(self, concurrency = concurrency)
+            logging.info(f"RECONFIGURE_REBALANCED {self.name} {len(diff.rebalanced_channels)} {rebalanced}")
+
+        self.__set_status(Lab.Status.READY)
+        logging.info(f"RECONFIGURED {self.name} {diff} {time.monotonic() - started_at:.1f}")
+        return diff
+
+    async def update_fees(self, fees: Mapping[str, Mapping[str, int]] | FeePolicy, *, concurrency: int = 100) -> int:
+        with self.log_context():
+            return await self.__update_fees(fees, concurrency = concurrency)
+
+    async def __update_fees(self, fees: Mapping[str, Mapping[str, int]] | FeePolicy, *, concurrency: int = 100) -> int:
+        current: dict[str, tuple[int, int]] = {}
+        ends: dict[str, tuple[str, str]] = {}
+        for source, target, key, edge in self.__graph.edges(keys = True, data = True):
+            current[key] = (int(edge["base_fee"]), int(edge["ppm_fee"]))
+            ends[key] = (source, target)
+
+        targets: dict[str, tuple[int, int]] = {}
+        if isinstance(fees, FeePolicy):
+            keys: list[str] = [k for k in current if fees.selects(k)]
+            base_fees, ppm_fees = fees.apply(
+                np.fromiter((current[k][0] for k in keys), dtype = np.int64, count = len(keys)),
+                np.fromiter((current[k][1] for k in keys), dtype = np.int64, count = len(keys))
+            )
+            targets = {k: (int(b), int(p)) for k, b, p in zip(keys, base_fees, ppm_fees)}
+        else:
+            for key, fee in fees.items():
+                targets[key] = (int(fee.get("base_fee", current[key][0])), int(fee.get("ppm_fee", current[key][1])))
+
+        changes: dict[str, dict[str, tuple[int, int]]] = {}
+        for key, fee in targets.items():
+            if fee != current[key]:
+                changes.setdefault(ends[key][0], {})[key] = fee
+
+        async def update_node_fees(node_key: str, node_changes: dict[str, tuple[int, int]]) -> int:
+            node: Node = self.__nodes[node_key]
+            final: dict[str, tuple[int, int]] = {
+                k: node_changes.get(k, current[k]) for _, _, k in self.__graph.edges(node_key, keys = True)
+            }
+            common, _ = Counter(final.values()).most_common(1)[0]
+            remaining: dict[str, tuple[int, int]] = {k: f for k, f in final.items() if f != common}
+            calls: list[tuple[str, tuple[int, int]]]
+            if 1 + len(remaining) < len(node_changes):
+                calls = [("all", common), *((self.__channels[k].id, f) for k, f in remaining.items())]
+            else:
+                calls = [(self.__channels[k].id, f) for k, f in node_changes.items()]
+
+            if calls[0][0] == "all":
+                await node.execute("setchannel", id = "all", feebase = common[0], feeppm = common[1])
+            await asyncio.gather(*(
+                node.execute("setchannel", id = channel_id, feebase = base_fee, feeppm = ppm_fee)
+                for channel_id, (base_fee, ppm_fee) in calls if channel_id != "all"
+            ))
+
+            for key, (base_fee, ppm_fee) in final.items():
+                source, target = ends[key]
+                edge: Any = self.__graph[source][target][key]
+                edge["base_fee"], edge["ppm_fee"] = base_fee, ppm_fee
+                self.__channels[key].base_fee, self.__channels[key].ppm_fee = base_fee, ppm_fee
+            return len(calls)
+
+        try:
+            async with ManagedTaskGroup(semaphore = concurrency, on_done = self.__on_task_done) as group:
+                tasks: list[Task[int]] = [
+                    group.create_task(update_node_fees(node_key, node_changes), name = f"UPDATE_FEES {node_key}")
+                    for node_key, node_changes in changes.items()
+                ]
+        except ExceptionGroup as eg:
+            for e in eg.exceptions:
+                logging.error(f"UPDATE_FEES {e}")
+            raise
+
+        call_count: int = sum(t.result() for t in tasks)
+        logging.info(f"FEES_UPDATED {sum(len(c) for c in changes.values())} {call_count}")
+        return call_count
+
+    async def stop(self, *, grace: float = 0, bulk: bool = True) -> None:
+        with self.log_context():
+            if self.__status not in (Lab.Status.STOPPED, Lab.Status.STOPPING):
+                started_at: float = time.monotonic()
+                self.__set_status(Lab.Status.STOPPING, len(self.__nodes) + len(self.__miners))
+                await self.__channel_state.stop()
+                if self.__block_clock:
+                    await self.__block_clock.stop()
+                if bulk:
+                    await self.kill_servers(grace)
+                else:
+                    await self.stop_nodes(grace)
+                    await self.stop_miners(grace)
+                await asyncio.gather(*(proxy.stop() for proxy in self.__rpc_proxies))
+                self.__rpc_proxies.clear()
+                await asyncio.to_thread(Server.remove_network, self.network)
+                self.__connected_miners.clear()
+                self.__miner_assignment.clear()
+                self.__synced_nodes.clear()
+                self.__channel_utxos.clear()
+                self.__channels.clear()
+                self.__set_status(Lab.Status.STOPPED)
+                logging.info(f"LAB_STOPPED {self.namespace} {time.monotonic() - started_at:.1f}")
+
+    async def kill_servers(self, grace: float = 0) -> None:
+        started_at: float = time.monotonic()
+        removed: int = await Server.remove_containers(self.labels, grace = grace)
+        servers: list[tuple[Server, str]] = [
+            *((node, "node") for node in self.__nodes.values()),
+            *((miner, "miner") for miner in self.__miners)
+        ]
+        await asyncio.gather(*(server.close() for server, _ in servers))
+        for server, role in servers:
+            self.__scheduler.release(role)
+            self.__progress.publish(TaskCompleted(self.__namespace, self.__status, f"STOP_{role.upper()} {server}", time.monotonic() - started_at))
+        self.__nodes.clear()
+        self.__miners.clear()
+        logging.info(f"KILL_SERVERS {self.namespace} {removed} {len(servers)}")
     
-    async def stop_nodes(self) -> None:
+    async def stop_nodes(self, grace: float = 10) -> None:
         try:
-            async with ManagedTaskGroup() as group:
-                for key, node in self.nodes.items():
+            async with ManagedTaskGroup(on_done = self.__on_task_done) as group:
+                for key, node in list(self.__nodes.items()):
                     task: Task = group.create_task(
-                        node.stop(),
+                        self.__release(node, "node", grace),
                         name = f"STOP_NODE {key}"
                     )
-                    task.add_done_callback(lambda t: self.nodes.pop(t.get_name().split(" ")[1]))
+                    task.add_done_callback(lambda t, key = key: self.__nodes.pop(key, None))
         except ExceptionGroup as eg:
             for e in eg.exceptions:
-                logging.error("STOP_NODES", eg.message, e)
+                logging.error(f"STOP_NODES {e}")
             raise
 
-    async def stop_miners(self) -> None:
+    async def stop_miners(self, grace: float = 10) -> None:
         try:
-            async with ManagedTaskGroup() as group:
-                for i, miner in enumerate(self.miners):
+            async with ManagedTaskGroup(on_done = self.__on_task_done) as group:
+                for i, miner in enumerate(list(self.__miners)):
                     task: Task = group.create_task(
-                        miner.stop(),
+                        self.__release(miner, "miner", grace),
                         name = f"STOP_MINER m{i}"
                     )
-                    task.add_done_callback(lambda t: self.miners.pop(int(t.get_name().split(" m")[1])))
+                    task.add_done_callback(lambda t, miner = miner: self.__miners.remove(miner))
         except ExceptionGroup as eg:
             for e in eg.exceptions:
-                logging.error("STOP_MINERS", eg.message, e)
+                logging.error(f"STOP_MINERS {e}")
             raise
-
-    
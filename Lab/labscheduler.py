@@ -0,0 +1,81 @@
+from __future__ import annotations
+import asyncio
+import logging
+import math
+from typing import Any, Awaitable, Callable
+
+from .lab import NODES_PER_MINER, Lab
+from .minertopology import MIN_NODES_PER_MINER
+from .paygraph import PayGraph
+from .scheduler import MIB, AdmissionScheduler
+
+class LabJob:
+    def __init__(
+        self,
+        graph: PayGraph,
+        body: Callable[[Lab], Awaitable[Any]],
+        *,
+        namespace: str | None = None,
+        setup: Callable[[Lab], Any] | None = None,
+        **options: Any
+    ) -> None:
+        self.graph: PayGraph = graph
+        self.body: Callable[[Lab], Awaitable[Any]] = body
+        self.namespace: str = namespace or graph.name
+        self.setup: Callable[[Lab], Any] | None = setup
+        self.options: dict[str, Any] = options
+
+async def run_lab_job(job: LabJob, lab: Lab, *, setup_grace: float = 5.0) -> Any:
+    setup_task: Any = job.setup(lab) if job.setup else None
+    try:
+        await lab.start()
+        return await job.body(lab)
+    finally:
+        await lab.stop()
+        if isinstance(setup_task, asyncio.Task):
+            await asyncio.wait({setup_task}, timeout = setup_grace)
+            setup_task.cancel()
+            result: Any = (await asyncio.gather(setup_task, return_exceptions = True))[0]
+            if isinstance(result, Exception):
+                logging.error(f"LAB_SETUP_FAILED {job.namespace} {result}")
+        lab.close_log()
+
+class LabScheduler:
+    def __init__(self, scheduler: AdmissionScheduler | None = None) -> None:
+        self.scheduler: AdmissionScheduler = scheduler or AdmissionScheduler()
+        self.__reserved: int = 0
+        self.__changed: asyncio.Condition = asyncio.Condition()
+
+    def required_memory(self, job: LabJob) -> int:
+        node_count: int = len(job.graph.nodes)
+        nodes_per_miner: int = job.options.get("nodes_per_miner", NODES_PER_MINER) or MIN_NODES_PER_MINER
+        return self.scheduler.required_memory(node_count, math.ceil(node_count / nodes_per_miner))
+
+    async def __run(self, job: LabJob) -> Any:
+        memory: int = self.required_memory(job)
+        async with self.__changed:
+            await self.__changed.wait_for(lambda: self.__reserved + memory <= self.scheduler.budget)
+            self.__reserved += memory
+
+        logging.info(f"LAB_SCHEDULED {job.namespace} {memory // MIB} {self.__reserved // MIB} {self.scheduler.budget // MIB}")
+        lab: Lab = Lab(job.graph, namespace = job.namespace, scheduler = self.scheduler.partition(memory), **job.options)
+        try:
+            return await run_lab_job(job, lab)
+        finally:
+            async with self.__changed:
+                self.__reserved -= memory
+                self.__changed.notify_all()
+
+    async def run(self, jobs: list[LabJob]) -> list[Any]:
+        namespaces: list[str] = [job.namespace for job in jobs]
+        if len(set(namespaces)) != len(namespaces):
+            raise ValueError("Concurrent labs need distinct namespaces")
+
+        for job in jobs:
+            if self.required_memory(job) > self.scheduler.budget:
+                raise RuntimeError(f"Lab {job.namespace} needs {self.required_memory(job) // MIB} MiB but only {self.scheduler.budget // MIB} MiB can be admitted on this host")
+
+        ordered: list[LabJob] = sorted(jobs, key = self.required_memory, reverse = True)
+        results: list[Any] = await asyncio.gather(*(self.__run(job) for job in ordered), return_exceptions = True)
+        by_namespace: dict[str, Any] = {job.namespace: result for job, result in zip(ordered, results)}
+        return [by_namespace[job.namespace] for job in jobs]
@@ -0,0 +1,163 @@
+from __future__ import annotations
+import asyncio
+import contextvars
+from contextlib import aclosing
+from datetime import datetime
+import logging
+import re
+from typing import Callable
+
+from .dockerapi import DockerAPI
+
+_TIMESTAMP: re.Pattern[bytes] = re.compile(rb"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d+))?(Z|[+-]\d\d:\d\d)")
+
+def _timestamp_ns(stamp: bytes) -> int | None:
+    match: re.Match[bytes] | None = _TIMESTAMP.fullmatch(stamp)
+    if match is None:
+        return None
+    seconds, fraction, zone = match.groups()
+    moment: datetime = datetime.fromisoformat(seconds.decode() + ("+00:00" if zone == b"Z" else zone.decode()))
+    return int(moment.timestamp()) * 1_000_000_000 + int((fraction or b"0").ljust(9, b"0")[:9])
+
+class Subscription:
+    def __init__(self, container_id: str | None, pattern: bytes, callback: Callable[[str, bytes], None], once: bool) -> None:
+        self.container_id: str | None = container_id
+        self.pattern: bytes = pattern
+        self.callback: Callable[[str, bytes], None] = callback
+        self.once: bool = once
+
+class LogMultiplexer:
+    def __init__(self, api: DockerAPI) -> None:
+        self.__api: DockerAPI = api
+        self.__followers: dict[str, asyncio.Task] = {}
+        self.__subscriptions: dict[str | None, list[Subscription]] = {}
+        self.__since: dict[str, tuple[int, int]] = {}
+        self.__replayed: dict[str, int] = {}
+
+    def follow(self, container_id: str) -> None:
+        if container_id not in self.__followers:
+            self.__followers[container_id] = asyncio.create_task(
+                self.__follow(container_id),
+                name = f"FOLLOW_LOGS {container_id[:12]}",
+                context = contextvars.Context()
+            )
+
+    def subscribe(self, container_id: str | None, pattern: bytes, callback: Callable[[str, bytes], None], *, once: bool = False) -> Subscription:
+        subscription = Subscription(container_id, pattern, callback, once)
+        self.__subscriptions.setdefault(container_id, []).append(subscription)
+        if container_id is not None:
+            self.follow(container_id)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions: list[Subscription] = self.__subscriptions.get(subscription.container_id, [])
+        if subscription in subscriptions:
+            subscriptions.remove(subscription)
+
+    async def wait_for(self, container_id: str, pattern: bytes, timeout: float | None = None) -> bytes:
+        matched: asyncio.Future[bytes] = asyncio.get_running_loop().create_future()
+
+        def resolve(_: str, line: bytes) -> None:
+            if not matched.done():
+                matched.set_result(line)
+
+        subscription: Subscription = self.subscribe(container_id, pattern, resolve, once = True)
+        try:
+            return await asyncio.wait_for(matched, timeout)
+        except TimeoutError:
+            raise TimeoutError(f"{pattern.decode(errors = 'replace')} was not logged by {container_id[:12]} within {timeout} seconds")
+        finally:
+            self.unsubscribe(subscription)
+
+    def __is_watched(self, container_id: str) -> bool:
+        return bool(self.__subscriptions.get(container_id) or self.__subscriptions.get(None))
+
+    def __strip_timestamps(self, container_id: str, data: bytes) -> bytes:
+        since, repeats = self.__since.get(container_id, (0, 0))
+        skip: int = self.__replayed.pop(container_id, 0)
+        lines: list[bytes] = []
+        for line in data.split(b"\n"):
+            stamp, _, message = line.partition(b" ")
+            logged_at: int | None = _timestamp_ns(stamp)
+            if logged_at is None:
+                lines.append(line)
+            elif logged_at > since:
+                since, repeats, skip = logged_at, 1, 0
+                lines.append(message)
+            elif logged_at == since:
+                if skip:
+                    skip -= 1
+                    continue
+                repeats += 1
+                lines.append(message)
+        self.__since[container_id] = (since, repeats)
+        if skip:
+            self.__replayed[container_id] = skip
+        return b"\n".join(lines)
+
+    def __dispatch(self, container_id: str, data: bytes) -> None:
+        for subscription in [*self.__subscriptions.get(container_id, []), *self.__subscriptions.get(None, [])]:
+            if subscription.pattern not in data:
+                continue
+            for line in data.split(b"\n"):
+                if subscription.pattern in line:
+                    subscription.callback(container_id, line)
+                    if subscription.once:
+                        self.unsubscribe(subscription)
+                        break
+
+    async def __follow(self, container_id: str) -> None:
+        since, self.__replayed[container_id] = self.__since.get(container_id, (0, 0))
+        pending: bytes = b""
+        buffer: bytes = b""
+        multiplexed: bool | None = None
+        detached: bool = False
+        try:
+            async with aclosing(self.__api.stream(
+                "GET",
+                f"/containers/{container_id}/logs",
+                params = {"follow": 1, "stdout": 1, "stderr": 1, "timestamps": 1, "since": f"{since // 1_000_000_000}.{since % 1_000_000_000:09d}"},
+                timeout = None
+            )) as chunks:
+                async for chunk in chunks:
+                    buffer += chunk
+                    if multiplexed is None and len(buffer) >= 4:
+                        multiplexed = buffer[0] in (0, 1, 2) and buffer[1:4] == b"\x00\x00\x00"
+
+                    payloads: list[bytes] = []
+                    if multiplexed:
+                        while len(buffer) >= 8:
+                            size: int = int.from_bytes(buffer[4:8], "big")
+                            if len(buffer) < 8 + size:
+                                break
+                            payloads.append(buffer[8:8 + size])
+                            buffer = buffer[8 + size:]
+                    elif multiplexed is False:
+                        payloads.append(buffer)
+                        buffer = b""
+
+                    data: bytes = pending + b"".join(payloads)
+                    last_line_end: int = data.rfind(b"\n")
+                    if last_line_end >= 0:
+                        pending = data[last_line_end + 1:]
+                        lines: bytes = self.__strip_timestamps(container_id, data[:last_line_end])
+                        if lines:
+                            self.__dispatch(container_id, lines)
+                    else:
+                        pending = data
+
+                    if not self.__is_watched(container_id):
+                        detached = True
+                        break
+        except Exception as e:
+            logging.warning(f"FOLLOW_LOGS {container_id[:12]} {e}")
+        finally:
+            self.__followers.pop(container_id, None)
+            if detached and self.__is_watched(container_id):
+                self.follow(container_id)
+
+    async def close(self) -> None:
+        for task in list(self.__followers.values()):
+            task.cancel()
+        await asyncio.gather(*self.__followers.values(), return_exceptions = True)
+        self.__followers.clear()
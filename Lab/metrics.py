@@ -0,0 +1,64 @@
+from __future__ import annotations
+from collections import Counter, deque
+import time
+
+import numpy as np
+
+class TrafficMetrics:
+    def __init__(self, *, window: float = 10.0, latency_samples: int = 4096) -> None:
+        self.window: float = float(window)
+        self.sent: int = 0
+        self.succeeded: int = 0
+        self.failed: int = 0
+        self.in_flight: int = 0
+        self.failures: Counter[str] = Counter()
+        self.__started_at: float = time.monotonic()
+        self.__completions: deque[tuple[float, bool]] = deque()
+        self.__latencies: np.ndarray = np.zeros(latency_samples, dtype = np.float64)
+        self.__latency_count: int = 0
+
+    def start(self) -> float:
+        self.sent += 1
+        self.in_flight += 1
+        return time.monotonic()
+
+    def record_sent(self, count: int) -> None:
+        self.sent += count
+        self.in_flight += count
+
+    def finish(self, started_at: float, succeeded: bool, node_key: str | None = None) -> None:
+        self.record(time.monotonic() - started_at, succeeded, node_key)
+
+    def record(self, latency: float, succeeded: bool, node_key: str | None = None) -> None:
+        self.in_flight -= 1
+        self.__latencies[self.__latency_count % len(self.__latencies)] = latency
+        self.__latency_count += 1
+        self.__completions.append((time.monotonic(), succeeded))
+        if succeeded:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+            if node_key is not None:
+                self.failures[node_key] += 1
+
+    def __recent(self) -> deque[tuple[float, bool]]:
+        horizon: float = time.monotonic() - self.window
+        while self.__completions and self.__completions[0][0] < horizon:
+            self.__completions.popleft()
+        return self.__completions
+
+    @property
+    def rate(self) -> float:
+        span: float = min(self.window, max(1.0, time.monotonic() - self.__started_at))
+        return len(self.__recent()) / span if span > 0 else 0.0
+
+    @property
+    def success_ratio(self) -> float | None:
+        recent: deque[tuple[float, bool]] = self.__recent()
+        return sum(1 for _, succeeded in recent if succeeded) / len(recent) if recent else None
+
+    def latency(self, *percentiles: float) -> list[float] | None:
+        if not self.__latency_count:
+            return None
+        samples: np.ndarray = self.__latencies[:min(self.__latency_count, len(self.__latencies))]
+        return [float(v) for v in np.percentile(samples, percentiles)]
@@ -6,9 +6,9 @@ import httpx
 import logging
 
 class Miner(Server):
-    __mine_lock: Final = Lock()
+    __mine_locks: Final[dict[str, Lock]] = {}
 
-    def __init__(self) -> None:
+    def __init__(self, **options: Any) -> None:
         super().__init__(
             image =  "ruimarinho/bitcoin-core",
             command = [
@@ -22,14 +22,15 @@ class Miner(Server):
                 "-rpcworkqueue=10000"
             ],
             environment = None,
-            control_port = 18443
+            control_port = 18443,
+            **options
         )
 
     async def start(self) -> Self:
         if not self.is_running:
             await super().start()
 
-            await self.wait_for("Generated RPC authentication cookie")
+            await self.wait_for("Generated RPC authentication cookie", timeout = 600)
 
             while True:
                 try:
@@ -47,11 +48,12 @@ class Miner(Server):
             })
             
             await self.execute("createwallet", "default")
+            self.start_stats()
 
         return self
     
-    async def stop(self) -> None:
-        return await super().stop()
+    async def stop(self, grace: float = 10) -> None:
+        return await super().stop(grace)
         
     async def execute(self, *command: str | int, **kwargs) -> Any:
 
@@ -113,7 +115,7 @@ class Miner(Server):
         if not recipient_address:
             recipient_address = await self.new_address()
         
-        async with Miner.__mine_lock:
+        async with Miner.__mine_locks.setdefault(self.network, Lock()):
             block_hashes: list[str] = await self.execute("generatetoaddress", block_count, recipient_address)
             return block_hashes
 
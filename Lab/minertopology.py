@@ -0,0 +1,83 @@
+from __future__ import annotations
+import asyncio
+import math
+import time
+from typing import Any
+
+import networkx as nx
+
+from .miner import Miner
+
+MINER_TOPOLOGIES: tuple[str, ...] = ("star", "ring", "mesh")
+
+LIGHTNINGD_POLL_INTERVAL: float = 30.0
+LIGHTNINGD_POLL_CALLS: dict[str, int] = {"getblockhash": 1, "estimatesmartfee": 4, "getmempoolinfo": 1}
+LIGHTNINGD_BLOCK_CALLS: dict[str, int] = {"getblockhash": 1, "getblock": 1}
+BITCOIND_RPC_THREADS: int = 4
+MIN_NODES_PER_MINER: int = 10
+MAX_NODES_PER_MINER: int = 200
+
+def rpc_calls_per_node(block_interval: float | None = None) -> float:
+    calls: float = sum(LIGHTNINGD_POLL_CALLS.values()) / LIGHTNINGD_POLL_INTERVAL
+    if block_interval:
+        calls += sum(LIGHTNINGD_BLOCK_CALLS.values()) / block_interval
+    return calls
+
+def miner_links(count: int, topology: str = "star") -> list[tuple[int, int]]:
+    match topology:
+        case "star":
+            return [(0, i) for i in range(1, count)]
+        case "ring":
+            return [(i, (i + 1) % count) for i in range(count if count > 2 else count - 1)]
+        case "mesh":
+            return [(i, j) for i in range(count) for j in range(i + 1, count)]
+        case _:
+            raise ValueError(f"Unknown miner topology {topology}, expected one of {', '.join(MINER_TOPOLOGIES)}")
+
+def assign_nodes(graph: nx.Graph, miner_count: int) -> dict[str, int]:
+    undirected: nx.Graph = graph.to_undirected(as_view = True)
+    order: list[str] = []
+    for component in sorted(nx.connected_components(undirected), key = len, reverse = True):
+        root: str = max(component, key = undirected.degree)
+        order.extend(nx.bfs_tree(undirected, root))
+
+    if not order:
+        return {}
+    return {node_key: i * miner_count // len(order) for i, node_key in enumerate(order)}
+
+async def measure_rpc_service_time(miner: Miner, *, rounds: int = 10, concurrency: int = BITCOIND_RPC_THREADS) -> float:
+    genesis_hash: str = await miner.execute("getblockhash", 0)
+    calls: dict[str, tuple[Any, ...]] = {
+        "getblockhash": (0,),
+        "getblock": (genesis_hash, 0),
+        "estimatesmartfee": (6,),
+        "getmempoolinfo": ()
+    }
+    mix: list[str] = [
+        method
+        for weights in (LIGHTNINGD_POLL_CALLS, LIGHTNINGD_BLOCK_CALLS)
+        for method, count in weights.items()
+        for _ in range(count)
+    ] * rounds
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+
+    async def sample(method: str) -> None:
+        async with semaphore:
+            await miner.execute(method, *calls[method])
+
+    started_at: float = time.monotonic()
+    await asyncio.gather(*(sample(method) for method in mix))
+    return (time.monotonic() - started_at) / len(mix)
+
+def size_nodes_per_miner(
+    service_time: float,
+    *,
+    calls_per_node: float | None = None,
+    utilisation: float = 0.5,
+    minimum: int = MIN_NODES_PER_MINER,
+    maximum: int = MAX_NODES_PER_MINER
+) -> int:
+    calls_per_node = calls_per_node or rpc_calls_per_node()
+    if service_time <= 0:
+        return maximum
+    return max(minimum, min(maximum, math.floor(utilisation / (calls_per_node * service_time))))
@@ -5,13 +5,16 @@ from contextvars import Context
 import logging
 from logging.handlers import RotatingFileHandler
 import os
-from typing import Any, Coroutine, TypeVar
+import time
+from typing import Any, Callable, Coroutine, TypeVar
 
 _T = TypeVar("_T")
 
 class ManagedTaskGroup(BaseTaskGroup):
-    def __init__(self, *, retries: int = 3, delay: int = 1, semaphore: int = 200) -> None:
+    def __init__(self, *, retries: int = 3, delay: int = 1, semaphore: int = 200, on_done: Callable[[Task[Any], float], None] | None = None) -> None:
         super().__init__()
+        self.__on_done: Callable[[Task[Any], float], None] | None = on_done
+        self.__started_at: dict[Task[Any], float] = {}
         self.__retries: int = retries
         self.__delay: int = delay
         self.__semaphore = asyncio.Semaphore(value=semaphore)
@@ -20,6 +23,7 @@ class ManagedTaskGroup(BaseTaskGroup):
         async def semaphored_coro() -> _T:
             async with self.__semaphore:
                 logging.info(f"TASK_STARTED {task.get_name()}")
+                self.__started_at[task] = time.monotonic()
                 return await coro
         task: Task[_T] = super().create_task(semaphored_coro(), name = name, context = context)
         task.add_done_callback(self.__log_done)
@@ -33,4 +37,7 @@ class ManagedTaskGroup(BaseTaskGroup):
             logging.error(f"TASK_FAILED {task.get_name()} {task.exception()}", stack_info = False)
         else:
             logging.info(f"TASK_DONE {task.get_name()} {task.result()}")
+        started_at: float | None = self.__started_at.pop(task, None)
+        if self.__on_done:
+            self.__on_done(task, time.monotonic() - started_at if started_at is not None else 0.0)
         return super()._on_task_done(task)
\ No newline at end of file
@@ -12,13 +12,15 @@ import uuid
 import logging
 
 class Node(Server):
-    def __init__(self, *, miner: Miner) -> None:
+    def __init__(self, *, miner: Miner, rpc_endpoint: tuple[str, int] | None = None, **options: Any) -> None:
+        rpc_host, rpc_port = rpc_endpoint or (miner.name, 18443)
         super().__init__(
             image = "elementsproject/lightningd:v25.02.2",
             command = [
                 f"--bitcoin-rpcuser={miner.username}",
                 f"--bitcoin-rpcpassword={miner.password}",
-                f"--bitcoin-rpcconnect={miner.name}",
+                f"--bitcoin-rpcconnect={rpc_host}",
+                f"--bitcoin-rpcport={rpc_port}",
                 "--bitcoin-rpcclienttimeout=60",
                 "--bitcoin-retry-timeout=3600",
                 "--min-capacity-sat=0",
@@ -31,19 +33,22 @@ class Node(Server):
                 "LIGHTNINGD_NETWORK": "regtest",
                 "EXPOSE_TCP": "true"
             },
-            control_port = 3010
+            control_port = 3010,
+            **options
         )
         self.public_key: str
+        self.rune: str
         self.__fund_channel_lock: Lock = Lock()
 
     async def start(self) -> Self:
         if not self.is_running:
             await super().start()
             await self.wait_for(
-                text = "no longer in startup mode"
+                text = "no longer in startup mode",
+                timeout = 600
             )
 
-            exec_code, output = self.container.exec_run([
+            exec_code, output = await self.exec([
                 "lightning-cli","--regtest", "commando-rune", "restrictions=[]"
             ])
 
@@ -52,27 +57,23 @@ class Node(Server):
             if exec_code:
                 raise result.message
 
+            self.rune = result["rune"]
             self._rest_client.headers.update({
-                "Rune": result["rune"],
+                "Rune": self.rune,
                 "Content-Type": "application/json"
             })
 
             self.public_key = (await self.get_info())["id"]
 
 
-            asyncio.create_task(self.__log_stats())
+            self.start_stats()
 
         return self
     
-    async def __log_stats(self):
-        while True:
-            try:
-                stats: str = await asyncio.to_thread(self.container.stats, stream = False)
-            except Exception as e:
-                break
-            logging.info(f"STATS {stats}")
-            await sleep(10)
-    
+    @property
+    def endpoint(self) -> tuple[str, str]:
+        return self.url, self.rune
+
     async def execute(self, *command: str, **kwargs) -> Any:
         response = None
         try:
@@ -136,6 +137,9 @@ class Node(Server):
                     else:
                         raise
     
+    async def close_channel(self, channel_id: str) -> Any:
+        return await self.execute("close", id = channel_id)
+
     async def new_invoice(self, *, amount: int, description: str, expiry: int = 604_800):
         return await self.execute(
             "invoice",
@@ -154,4 +158,18 @@ class Node(Server):
         )
     
     async def pay_invoice(self, invoice, route = None) -> Any:
-        return await self.execute("pay", bolt11 = invoice["bolt11"])
\ No newline at end of file
+        if route is None:
+            return await self.execute("pay", bolt11 = invoice["bolt11"])
+        
+        await self.execute(
+            "sendpay",
+            route = route,
+            payment_hash = invoice["payment_hash"],
+            payment_secret = invoice["payment_secret"],
+            amount_msat = route[-1]["amount_msat"]
+        )
+        return await self.execute(
+            "waitsendpay",
+            payment_hash = invoice["payment_hash"],
+            timeout = 60
+        )
\ No newline at end of file
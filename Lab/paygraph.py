@@ -1,8 +1,11 @@
 from __future__ import annotations
-from typing import cast, overload
+from itertools import islice
+from typing import Any, Iterable, cast, overload
 from networkx import MultiDiGraph, Graph
 import networkx as nx
-import random
+import numpy as np
+
+MINIMUM_CAPACITY: int = int(546 / 0.01 * 1000)
 
 class PayGraph(MultiDiGraph):
     @classmethod
@@ -12,8 +15,8 @@ class PayGraph(MultiDiGraph):
 
     def __init__(
         self,
-        name: str,
-        topology: Graph,
+        name: str = "",
+        topology: Graph | Iterable[tuple[Any, Any]] = (),
         *,
         mean_capacity: int = 50000000,
         capacity_deviation: int = 100,
@@ -22,31 +25,81 @@ class PayGraph(MultiDiGraph):
         mean_base_fee: int = 0,
         base_fee_deviation: float = 100,
         mean_ppm_fee: float = 1000,
-        ppm_fee_deviation: float = 100
+        ppm_fee_deviation: float = 100,
+        seed: int | None = None,
+        chunk_size: int = 65_536
     ) -> None:
         super().__init__()
         self.name = name
 
-        for index, (source, target) in enumerate(topology.edges):
-            source_key: str = f"n{source}"
-            target_key: str = f"n{target}"
-            outbound_key: str = f"e{index * 2}"
-            inbound_key: str = f"e{index * 2 + 1}"
-            
-            self.add_edge(source_key, target_key, outbound_key)
-            self.add_edge(target_key, source_key, inbound_key)
-            capacity = max(int(abs(random.gauss(mean_capacity, capacity_deviation))), 546 / 0.01 * 1000)
-            self.edges[source_key, target_key, outbound_key]["capacity"] = capacity
-            self.edges[target_key, source_key, inbound_key]["capacity"] = capacity
-
-            self.edges[source_key, target_key, outbound_key]["balance"] = int(random.gauss(mean_balance_ratio * capacity, balance_ratio_deviation))
-            self.edges[target_key, source_key, inbound_key]["balance"] =  self.edges[source_key, target_key, outbound_key]["capacity"] - self.edges[source_key, target_key, outbound_key]["balance"]
-
-            self.edges[source_key, target_key, outbound_key]["base_fee"] = int(abs(random.gauss(mean_base_fee, base_fee_deviation))) if mean_base_fee else 0
-            self.edges[source_key, target_key, outbound_key]["ppm_fee"] = int(abs(random.gauss(mean_ppm_fee, ppm_fee_deviation))) if mean_ppm_fee else 0
-            
-            self.edges[target_key, source_key, inbound_key]["base_fee"] = int(abs(random.gauss(mean_base_fee, base_fee_deviation))) if mean_base_fee else 0
-            self.edges[target_key, source_key, inbound_key]["ppm_fee"] = int(abs(random.gauss(mean_ppm_fee, ppm_fee_deviation))) if mean_ppm_fee else 0
+        generator: np.random.Generator = np.random.default_rng(seed)
+        edges: Iterable[tuple[Any, Any]] = topology.edges if isinstance(topology, Graph) else topology
+        iterator = iter(edges)
+
+        while chunk := list(islice(iterator, chunk_size)):
+            size: int = len(chunk)
+            capacity: np.ndarray = np.maximum(np.abs(generator.normal(mean_capacity, capacity_deviation, size)).astype(np.int64), MINIMUM_CAPACITY)
+            balance: np.ndarray = np.clip(generator.normal(mean_balance_ratio * capacity, balance_ratio_deviation).astype(np.int64), 0, capacity)
+
+            def fees(mean: float, deviation: float) -> np.ndarray:
+                return np.abs(generator.normal(mean, deviation, size)).astype(np.int64) if mean else np.zeros(size, dtype = np.int64)
+
+            self.add_channels(
+                [f"n{source}" for source, _ in chunk],
+                [f"n{target}" for _, target in chunk],
+                capacity = capacity,
+                balance = balance,
+                base_fee = fees(mean_base_fee, base_fee_deviation),
+                ppm_fee = fees(mean_ppm_fee, ppm_fee_deviation),
+                inbound_base_fee = fees(mean_base_fee, base_fee_deviation),
+                inbound_ppm_fee = fees(mean_ppm_fee, ppm_fee_deviation)
+            )
+
+    def add_channels(
+        self,
+        sources: list[str],
+        targets: list[str],
+        *,
+        capacity: np.ndarray,
+        balance: np.ndarray,
+        base_fee: np.ndarray,
+        ppm_fee: np.ndarray,
+        inbound_base_fee: np.ndarray,
+        inbound_ppm_fee: np.ndarray,
+        **attributes: np.ndarray
+    ) -> list[str]:
+        start: int = self.channel_count
+        outbound_keys: list[str] = [f"e{(start + i) * 2}" for i in range(len(sources))]
+        capacities: list[int] = capacity.tolist()
+        balances: list[int] = balance.tolist()
+        extra: dict[str, list[Any]] = {k: v.tolist() for k, v in attributes.items()}
+
+        self.add_edges_from(
+            (source, target, key, {
+                "capacity": capacities[i],
+                "balance": balances[i],
+                "base_fee": b,
+                "ppm_fee": p,
+                **{k: v[i] for k, v in extra.items()}
+            })
+            for i, (source, target, key, b, p) in enumerate(zip(sources, targets, outbound_keys, base_fee.tolist(), ppm_fee.tolist()))
+        )
+        self.add_edges_from(
+            (target, source, f"e{int(key[1:]) + 1}", {
+                "capacity": capacities[i],
+                "balance": capacities[i] - balances[i],
+                "base_fee": b,
+                "ppm_fee": p,
+                **{k: v[i] for k, v in extra.items()}
+            })
+            for i, (source, target, key, b, p) in enumerate(zip(sources, targets, outbound_keys, inbound_base_fee.tolist(), inbound_ppm_fee.tolist()))
+        )
+
+        return outbound_keys
+
+    @property
+    def channel_count(self) -> int:
+        return max((int(key[1:]) for _, _, key in self.edges(keys = True)), default = -1) // 2 + 1
     
     @classmethod
     def is_outbound_edge(cls, key: str) -> bool:
@@ -55,4 +108,4 @@ class PayGraph(MultiDiGraph):
     @classmethod
     def get_inbound_edge_key(cls, edge_key: str) -> str:
         outbound_edge_index: int = int(int(edge_key[1:]) // 2) * 2 + 1
-        return f"e{outbound_edge_index}"
\ No newline at end of file
+        return f"e{outbound_edge_index}"
@@ -0,0 +1,34 @@
+from __future__ import annotations
+import socket
+
+class PortAllocator:
+    def __init__(self, start: int = 20_000, end: int = 40_000) -> None:
+        self.start: int = int(start)
+        self.end: int = int(end)
+        self.__next: int = self.start
+        self.__allocated: set[int] = set()
+
+    @property
+    def allocated(self) -> set[int]:
+        return set(self.__allocated)
+
+    @staticmethod
+    def is_free(port: int) -> bool:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+            try:
+                probe.bind(("0.0.0.0", port))
+                return True
+            except OSError:
+                return False
+
+    def allocate(self) -> int:
+        for _ in range(self.end - self.start):
+            port: int = self.__next
+            self.__next = self.start + (self.__next + 1 - self.start) % (self.end - self.start)
+            if port not in self.__allocated and self.is_free(port):
+                self.__allocated.add(port)
+                return port
+        raise RuntimeError(f"No free host port left between {self.start} and {self.end}")
+
+    def release(self, port: int) -> None:
+        self.__allocated.discard(port)
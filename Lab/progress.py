@@ -0,0 +1,58 @@
+from __future__ import annotations
+import asyncio
+from enum import IntEnum
+import time
+from typing import AsyncIterator
+
+class ProgressEvent:
+    def __init__(self, namespace: str, phase: IntEnum) -> None:
+        self.namespace: str = namespace
+        self.phase: IntEnum = phase
+        self.at: float = time.monotonic()
+
+class PhaseChanged(ProgressEvent):
+    def __init__(self, namespace: str, phase: IntEnum, total: int) -> None:
+        super().__init__(namespace, phase)
+        self.total: int = int(total)
+
+class TaskCompleted(ProgressEvent):
+    def __init__(self, namespace: str, phase: IntEnum, name: str, elapsed: float = 0.0) -> None:
+        super().__init__(namespace, phase)
+        self.name: str = name
+        self.elapsed: float = float(elapsed)
+
+class TaskFailed(ProgressEvent):
+    def __init__(self, namespace: str, phase: IntEnum, name: str, error: str, elapsed: float = 0.0) -> None:
+        super().__init__(namespace, phase)
+        self.name: str = name
+        self.error: str = error
+        self.elapsed: float = float(elapsed)
+
+class ProgressBus:
+    def __init__(self) -> None:
+        self.__subscribers: list[asyncio.Queue[ProgressEvent]] = []
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self.__subscribers)
+
+    def publish(self, event: ProgressEvent) -> None:
+        for queue in self.__subscribers:
+            queue.put_nowait(event)
+
+    def subscribe(self) -> asyncio.Queue[ProgressEvent]:
+        queue: asyncio.Queue[ProgressEvent] = asyncio.Queue()
+        self.__subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[ProgressEvent]) -> None:
+        if queue in self.__subscribers:
+            self.__subscribers.remove(queue)
+
+    async def events(self) -> AsyncIterator[ProgressEvent]:
+        queue: asyncio.Queue[ProgressEvent] = self.subscribe()
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.unsubscribe(queue)
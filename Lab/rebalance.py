@@ -0,0 +1,156 @@
+from __future__ import annotations
+import asyncio
+from collections import deque
+import logging
+import time
+from typing import Any
+
+from .lab import Lab
+from .node import Node
+from .paygraph import PayGraph
+from .routing import Router
+
+def peer_key(key: str) -> str:
+    index: int = int(key[1:])
+    return f"e{index + 1 if index % 2 == 0 else index - 1}"
+
+def balance_deviations(lab: Lab) -> dict[str, tuple[int, int]]:
+    deviations: dict[str, tuple[int, int]] = {}
+    for _, _, key, edge in lab.graph.edges(keys = True, data = True):
+        channel = lab.channels.get(key)
+        if channel is not None and channel.updated_at:
+            deviations[key] = (channel.balance - int(edge["balance"]), int(edge["capacity"]))
+    return deviations
+
+def plan_rebalance(
+    graph: PayGraph,
+    deviations: dict[str, tuple[int, int]],
+    *,
+    tolerance: float = 0.05,
+    max_hops: int = 10,
+    minimum_amount: int = 1_000_000
+) -> list[tuple[list[str], int]]:
+    excess: dict[str, int] = {k: d for k, (d, _) in deviations.items()}
+    slack: dict[str, int] = {k: max(minimum_amount, int(c * tolerance)) for k, (_, c) in deviations.items()}
+    ends: dict[str, tuple[str, str]] = {}
+    outgoing: dict[str, list[str]] = {}
+    for source, target, key in graph.edges(keys = True):
+        if key in excess:
+            ends[key] = (source, target)
+            outgoing.setdefault(source, []).append(key)
+
+    surplus: dict[str, int] = {n: sum(excess[k] for k in keys) for n, keys in outgoing.items()}
+
+    payments: list[tuple[list[str], int]] = []
+    for first in sorted(excess, key = excess.__getitem__, reverse = True):
+        if excess[first] <= slack[first]:
+            continue
+        sender, start = ends[first]
+
+        previous: dict[str, str] = {}
+        queue: deque[tuple[str, int]] = deque([(start, 1)])
+        visited: set[str] = {start}
+        recipient: str | None = sender if start == sender else None
+        if surplus[sender] > 0 and surplus.get(start, 0) < 0:
+            recipient = start
+        while queue and recipient is None:
+            node_key, hops = queue.popleft()
+            if hops >= max_hops:
+                continue
+            for key in outgoing.get(node_key, []):
+                target: str = ends[key][1]
+                if key == peer_key(first) or (target in visited and target != sender) or excess[key] + slack[key] < minimum_amount:
+                    continue
+                previous[target] = key
+                if target == sender or (surplus[sender] > 0 and surplus.get(target, 0) < 0):
+                    recipient = target
+                    break
+                visited.add(target)
+                queue.append((target, hops + 1))
+
+        if recipient is None:
+            continue
+
+        path: list[str] = []
+        node_key = recipient
+        while node_key != start:
+            path.append(previous[node_key])
+            node_key = ends[previous[node_key]][0]
+        route: list[str] = [first, *reversed(path)]
+
+        amount: int = min([excess[first], *(excess[k] + slack[k] for k in route[1:])])
+        if recipient != sender:
+            amount = min(amount, surplus[sender], -surplus[recipient])
+        if amount < minimum_amount:
+            continue
+
+        for key in route:
+            excess[key] -= amount
+            excess[peer_key(key)] = excess.get(peer_key(key), 0) + amount
+        surplus[sender] -= amount
+        surplus[recipient] += amount
+        payments.append((route, amount))
+
+    return payments
+
+async def reset_balances(
+    lab: Lab,
+    *,
+    router: Router | None = None,
+    tolerance: float = 0.05,
+    max_hops: int = 10,
+    max_rounds: int = 10,
+    concurrency: int = 100
+) -> dict[str, int]:
+    with lab.log_context():
+        return await _reset_balances(lab, router = router, tolerance = tolerance, max_hops = max_hops, max_rounds = max_rounds, concurrency = concurrency)
+
+async def _reset_balances(
+    lab: Lab,
+    *,
+    router: Router | None,
+    tolerance: float,
+    max_hops: int,
+    max_rounds: int,
+    concurrency: int
+) -> dict[str, int]:
+    stats: dict[str, int] = {"rounds": 0, "sent": 0, "succeeded": 0, "failed": 0, "remaining": 0}
+    owned_router: bool = router is None
+    router = router or Router(lab)
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+    started_at: float = time.monotonic()
+
+    async def pay(route: list[str], amount: int) -> None:
+        async with semaphore:
+            sender: Node = lab.channels[route[0]].source
+            recipient: Node = lab.channels[route[-1]].destination
+            try:
+                invoice: Any = await recipient.new_invoice(amount = amount, description = "Rebalance")
+                await sender.pay_invoice(invoice, router.build_route(route, amount))
+                stats["succeeded"] += 1
+            except Exception as e:
+                logging.error(f"REBALANCE_PAYMENT {' '.join(route)} {amount} {e}")
+                stats["failed"] += 1
+
+    try:
+        for round_index in range(max_rounds + 1):
+            await lab.channel_state.refresh()
+            deviations: dict[str, tuple[int, int]] = balance_deviations(lab)
+            payments: list[tuple[list[str], int]] = [
+                (route, amount) for route, amount in plan_rebalance(lab.graph, deviations, tolerance = tolerance, max_hops = max_hops)
+                if all(lab.channels[k].short_channel_id for k in route)
+            ]
+            stats["remaining"] = sum(1 for d, c in deviations.values() if d > c * tolerance)
+            logging.info(f"REBALANCE_ROUND {round_index} {len(payments)} {stats['remaining']}")
+            if not payments or round_index == max_rounds:
+                break
+
+            stats["rounds"] += 1
+            stats["sent"] += len(payments)
+            await asyncio.gather(*(pay(route, amount) for route, amount in payments))
+    finally:
+        if owned_router:
+            router.close()
+
+    logging.info(f"REBALANCED {lab.name} {stats['rounds']} {stats['sent']} {stats['succeeded']} {stats['failed']} {stats['remaining']} {time.monotonic() - started_at:.1f}")
+    return stats
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import asyncio
+import glob
+import logging
+import os
+import time
+from typing import Any
+
+import numpy as np
+
+from .channel import Channel
+from .lab import Lab
+
+class BalanceRecorder:
+    MISSING: int = np.iinfo(np.uint64).max
+
+    def __init__(self, lab: Lab, *, interval: float = 1.0, chunk_size: int = 600, directory: str = "Experiments", run_id: str | None = None) -> None:
+        self.__lab: Lab = lab
+        self.__fixed_run_id: str | None = run_id
+        self.run_id: str | None = run_id
+        self.interval: float = float(interval)
+        self.chunk_size: int = int(chunk_size)
+        self.directory: str = directory
+        self.__keys: list[str] = []
+        self.__channels: list[Channel] = []
+        self.__buffers: list[np.ndarray] = []
+        self.__timestamps: list[np.ndarray] = []
+        self.__active: int = 0
+        self.__cursor: int = 0
+        self.__chunk_index: int = 0
+        self.__sample_count: int = 0
+        self.__flush: asyncio.Task | None = None
+        self.__task: asyncio.Task | None = None
+
+    @property
+    def name(self) -> str:
+        return self.__lab.name
+
+    @property
+    def prefix(self) -> str:
+        return f"{self.name}.{self.run_id}"
+
+    @staticmethod
+    def new_run_id() -> str:
+        now: float = time.time()
+        return time.strftime("%Y%m%dT%H%M%S", time.localtime(now)) + f"{int(now * 1000) % 1000:03d}"
+
+    @property
+    def sample_count(self) -> int:
+        return self.__sample_count
+
+    @property
+    def is_running(self) -> bool:
+        return self.__task is not None and not self.__task.done()
+
+    def start(self) -> None:
+        if not self.is_running:
+            self.__keys = sorted(self.__lab.channels, key = lambda k: int(k[1:]))
+            self.__channels = [self.__lab.channels[k] for k in self.__keys]
+            self.__buffers = [np.full((len(self.__keys), self.chunk_size), self.MISSING, dtype = np.uint64) for _ in range(2)]
+            self.__timestamps = [np.zeros(self.chunk_size, dtype = np.float64) for _ in range(2)]
+            self.__active = 0
+            self.__cursor = 0
+            self.__chunk_index = 0
+            self.__sample_count = 0
+            self.run_id = self.__fixed_run_id or self.new_run_id()
+            os.makedirs(self.directory, exist_ok = True)
+            if glob.glob(os.path.join(self.directory, f"{self.prefix}.balances.*.npz")):
+                raise FileExistsError(f"Balances for {self.prefix} were already recorded under {self.directory}")
+            self.__task = asyncio.create_task(self.__run(), name = f"RECORD_BALANCES {self.name}")
+
+    async def __run(self) -> None:
+        logging.info(f"RECORDER_START {self.prefix} {len(self.__keys)} {self.interval}")
+        while True:
+            started_at: float = time.monotonic()
+            await self.__lab.channel_state.refresh(max_age = self.interval / 2)
+            await self.sample()
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started_at)))
+
+    async def sample(self) -> None:
+        self.__buffers[self.__active][:, self.__cursor] = np.fromiter(
+            (getattr(c, "balance", self.MISSING * 1_000) // 1_000 for c in self.__channels),
+            dtype = np.uint64,
+            count = len(self.__channels)
+        )
+        self.__timestamps[self.__active][self.__cursor] = time.time()
+        self.__cursor += 1
+        self.__sample_count += 1
+
+        if self.__cursor == self.chunk_size:
+            await self.__swap()
+
+    async def __swap(self) -> None:
+        if self.__flush:
+            await self.__flush
+        self.__flush = asyncio.create_task(asyncio.to_thread(
+            self.__write_chunk,
+            self.__chunk_index,
+            self.__buffers[self.__active][:, :self.__cursor],
+            self.__timestamps[self.__active][:self.__cursor]
+        ))
+        self.__chunk_index += 1
+        self.__active = 1 - self.__active
+        self.__cursor = 0
+        self.__buffers[self.__active].fill(self.MISSING)
+
+    def __write_chunk(self, index: int, balances: np.ndarray, timestamps: np.ndarray) -> None:
+        path: str = os.path.join(self.directory, f"{self.prefix}.balances.{index:05d}.npz")
+        np.savez_compressed(path, keys = np.array(self.__keys), timestamps = timestamps, balances = balances)
+        logging.info(f"RECORDER_FLUSH {path} {balances.shape[1]}")
+
+    async def stop(self) -> None:
+        if self.__task:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                ...
+            self.__task = None
+            if self.__cursor:
+                await self.__swap()
+            if self.__flush:
+                await self.__flush
+                self.__flush = None
+            logging.info(f"RECORDER_STOP {self.prefix} {self.sample_count}")
+
+    @classmethod
+    def runs(cls, name: str, *, directory: str = "Experiments") -> list[str]:
+        paths: list[str] = glob.glob(os.path.join(directory, f"{name}.*.balances.*.npz"))
+        return sorted({os.path.basename(p)[len(name) + 1:].rsplit(".balances.", 1)[0] for p in paths})
+
+    @classmethod
+    def load(cls, name: str, run_id: str | None = None, *, directory: str = "Experiments") -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if run_id is None:
+            run_ids: list[str] = cls.runs(name, directory = directory)
+            if not run_ids:
+                raise FileNotFoundError(f"No balance chunks were found for {name} under {directory}")
+            run_id = run_ids[-1]
+
+        chunk_paths: list[str] = sorted(glob.glob(os.path.join(directory, f"{name}.{run_id}.balances.*.npz")))
+        if not chunk_paths:
+            raise FileNotFoundError(f"No balance chunks were found for {name}.{run_id} under {directory}")
+
+        sample_count: int = 0
+        keys: Any = None
+        for path in chunk_paths:
+            with np.load(path) as chunk:
+                keys = chunk["keys"] if keys is None else keys
+                sample_count += chunk["timestamps"].shape[0]
+
+        balances: np.ndarray = np.lib.format.open_memmap(
+            os.path.join(directory, f"{name}.{run_id}.balances.npy"),
+            mode = "w+",
+            dtype = np.uint64,
+            shape = (len(keys), sample_count)
+        )
+        timestamps: np.ndarray = np.empty(sample_count, dtype = np.float64)
+
+        offset: int = 0
+        for path in chunk_paths:
+            with np.load(path) as chunk:
+                width: int = chunk["timestamps"].shape[0]
+                chunk_balances: np.ndarray = chunk["balances"]
+                if chunk_balances.dtype == np.uint32:
+                    chunk_balances = np.where(chunk_balances == np.iinfo(np.uint32).max, cls.MISSING, chunk_balances.astype(np.uint64))
+                balances[:, offset:offset + width] = chunk_balances
+                timestamps[offset:offset + width] = chunk["timestamps"]
+                offset += width
+
+        balances.flush()
+        return keys, timestamps, balances
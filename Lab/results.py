@@ -0,0 +1,280 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from .lab import Lab
+from .paygraph import PayGraph
+from .progress import PhaseChanged, ProgressEvent, TaskCompleted, TaskFailed
+
+SCHEMA: str = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS graphs (
+    hash TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    node_count INTEGER NOT NULL,
+    channel_count INTEGER NOT NULL,
+    capacity INTEGER NOT NULL,
+    file TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    batch TEXT NOT NULL,
+    lab TEXT NOT NULL,
+    graph_hash TEXT REFERENCES graphs (hash),
+    rate REAL,
+    amount INTEGER,
+    duration REAL,
+    repetition INTEGER,
+    parameters TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    sent INTEGER,
+    succeeded INTEGER,
+    failed INTEGER,
+    error TEXT,
+    log TEXT
+);
+CREATE TABLE IF NOT EXISTS payments (
+    run_id TEXT NOT NULL REFERENCES runs (id),
+    sender TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    amount_bucket INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    latency REAL NOT NULL,
+    succeeded INTEGER NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS task_timings (
+    run_id TEXT REFERENCES runs (id),
+    lab TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    name TEXT NOT NULL,
+    succeeded INTEGER NOT NULL,
+    error TEXT,
+    at REAL NOT NULL,
+    elapsed REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resource_samples (
+    run_id TEXT REFERENCES runs (id),
+    lab TEXT NOT NULL,
+    server TEXT NOT NULL,
+    at REAL NOT NULL,
+    cpu_percent REAL,
+    memory_usage INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_batch ON runs (batch);
+CREATE INDEX IF NOT EXISTS runs_graph ON runs (graph_hash);
+CREATE INDEX IF NOT EXISTS runs_lab ON runs (lab);
+CREATE INDEX IF NOT EXISTS payments_run ON payments (run_id, amount_bucket, succeeded, latency);
+CREATE INDEX IF NOT EXISTS payments_bucket ON payments (amount_bucket, succeeded);
+CREATE INDEX IF NOT EXISTS payments_sender ON payments (sender);
+CREATE INDEX IF NOT EXISTS task_timings_lab ON task_timings (lab, phase);
+CREATE INDEX IF NOT EXISTS resource_samples_lab ON resource_samples (lab, at);
+CREATE VIEW IF NOT EXISTS success_by_amount_bucket AS
+    SELECT run_id, amount_bucket, COUNT(*) AS payments, AVG(succeeded) AS success_ratio, AVG(latency) AS mean_latency
+    FROM payments
+    GROUP BY run_id, amount_bucket;
+"""
+
+RUN_INDICES: str = """
+CREATE INDEX IF NOT EXISTS task_timings_run ON task_timings (run_id, phase);
+CREATE INDEX IF NOT EXISTS resource_samples_run ON resource_samples (run_id, at);
+"""
+
+INSERT_GRAPH: str = "INSERT OR IGNORE INTO graphs VALUES (?, ?, ?, ?, ?, ?, ?)"
+INSERT_RUN: str = "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_PAYMENT: str = "INSERT INTO payments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_TASK_TIMING: str = "INSERT INTO task_timings (run_id, lab, phase, name, succeeded, error, at, elapsed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_RESOURCE_SAMPLE: str = "INSERT INTO resource_samples (run_id, lab, server, at, cpu_percent, memory_usage) VALUES (?, ?, ?, ?, ?, ?)"
+
+def graph_hash(graph: PayGraph) -> str:
+    digest = hashlib.sha256()
+    for source, target, key, edge in sorted(graph.edges(keys = True, data = True), key = lambda e: int(e[2][1:])):
+        digest.update(f"{source} {target} {key} {edge['capacity']} {edge['balance']} {edge['base_fee']} {edge['ppm_fee']}\n".encode())
+    for node_key in sorted(graph.nodes):
+        digest.update(f"{node_key}\n".encode())
+    return digest.hexdigest()
+
+def amount_bucket(amount: int) -> int:
+    return max(0, int(amount)).bit_length()
+
+class RunRecorder:
+    def __init__(self, store: ResultStore, run_id: str) -> None:
+        self.store: ResultStore = store
+        self.run_id: str = run_id
+
+    def payment(self, sender_key: str, recipient_key: str, amount: int, latency: float, succeeded: bool, error: str | None = None) -> None:
+        self.store.put(INSERT_PAYMENT, (self.run_id, sender_key, recipient_key, amount, amount_bucket(amount), time.time() - latency, latency, int(succeeded), error))
+
+class ResultStore:
+    def __init__(self, path: str = "Experiments/results.sqlite", *, batch_size: int = 5_000, flush_interval: float = 1.0, sample_interval: float = 10.0) -> None:
+        self.path: str = path
+        self.batch_size: int = int(batch_size)
+        self.flush_interval: float = float(flush_interval)
+        self.sample_interval: float = float(sample_interval)
+        self.__queue: queue.Queue[tuple[str, tuple[Any, ...]] | None] = queue.Queue()
+        self.__writer: threading.Thread | None = None
+        self.__current_runs: dict[str, str | None] = {}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+        with sqlite3.connect(path) as connection:
+            connection.executescript(SCHEMA)
+            for table in ("task_timings", "resource_samples"):
+                if "run_id" not in {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}:
+                    connection.execute(f"ALTER TABLE {table} ADD COLUMN run_id TEXT REFERENCES runs (id)")
+            connection.executescript(RUN_INDICES)
+        connection.close()
+
+    def __enter__(self) -> ResultStore:
+        return self.open()
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def open(self) -> ResultStore:
+        if self.__writer is None:
+            self.__writer = threading.Thread(target = self.__write_loop, name = "RESULT_STORE", daemon = True)
+            self.__writer.start()
+        return self
+
+    def close(self) -> None:
+        if self.__writer is not None:
+            self.__queue.put(None)
+            self.__writer.join()
+            self.__writer = None
+
+    def put(self, statement: str, row: tuple[Any, ...]) -> None:
+        self.__queue.put((statement, row))
+
+    async def flush(self) -> None:
+        if self.__writer is not None:
+            await asyncio.to_thread(self.__queue.join)
+
+    def __write_loop(self) -> None:
+        connection: sqlite3.Connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        running: bool = True
+        while running:
+            items: list[tuple[str, tuple[Any, ...]] | None] = [self.__queue.get()]
+            deadline: float = time.monotonic() + self.flush_interval
+            while items[-1] is not None and len(items) < self.batch_size:
+                try:
+                    items.append(self.__queue.get(timeout = max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            batches: dict[str, list[tuple[Any, ...]]] = {}
+            for item in items:
+                if item is None:
+                    running = False
+                else:
+                    batches.setdefault(item[0], []).append(item[1])
+            try:
+                with connection:
+                    for statement, rows in batches.items():
+                        connection.executemany(statement, rows)
+            except sqlite3.Error as e:
+                logging.error(f"RESULT_STORE {e}")
+            for _ in items:
+                self.__queue.task_done()
+        connection.close()
+
+    def query(self, statement: str, parameters: tuple[Any, ...] | dict[str, Any] = ()) -> list[sqlite3.Row]:
+        connection: sqlite3.Connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri = True)
+        connection.row_factory = sqlite3.Row
+        try:
+            return connection.execute(statement, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def success_by_amount(self, batch: str | None = None) -> list[sqlite3.Row]:
+        return self.query(
+            """
+            SELECT p.amount_bucket, COUNT(*) AS payments, AVG(p.succeeded) AS success_ratio, AVG(p.latency) AS mean_latency
+            FROM payments p JOIN runs r ON r.id = p.run_id
+            WHERE :batch IS NULL OR r.batch = :batch
+            GROUP BY p.amount_bucket
+            ORDER BY p.amount_bucket
+            """,
+            {"batch": batch}
+        )
+
+    def add_graph(self, graph: PayGraph, file: str | None = None) -> str:
+        key: str = graph_hash(graph)
+        capacity: int = sum(int(edge["capacity"]) for _, _, k, edge in graph.edges(keys = True, data = True) if PayGraph.is_outbound_edge(k))
+        self.put(INSERT_GRAPH, (key, graph.name, graph.number_of_nodes(), graph.channel_count, capacity, file, time.time()))
+        return key
+
+    def add_run(self, run: dict[str, Any], graph_key: str | None = None) -> RunRecorder:
+        parameters: dict[str, Any] = run.get("parameters", {})
+        traffic: dict[str, int] = run.get("traffic") or {}
+        self.put(INSERT_RUN, (
+            run["id"],
+            run["batch"],
+            run["lab"],
+            graph_key,
+            parameters.get("rate"),
+            parameters.get("amount"),
+            parameters.get("duration"),
+            parameters.get("repetition"),
+            json.dumps(parameters, sort_keys = True),
+            run["started_at"],
+            run.get("finished_at"),
+            traffic.get("sent"),
+            traffic.get("succeeded"),
+            traffic.get("failed"),
+            run.get("error"),
+            run.get("log")
+        ))
+        return RunRecorder(self, run["id"])
+
+    def follow(self, lab: Lab, run_id: str | None = None) -> asyncio.Task:
+        self.__current_runs[lab.namespace] = run_id
+        events: asyncio.Queue[ProgressEvent] = lab.progress.subscribe()
+        return asyncio.create_task(self.__follow(lab, events), name = f"RESULT_STORE_FOLLOW {lab.namespace}")
+
+    def switch_run(self, lab: Lab, run_id: str | None) -> None:
+        self.__current_runs[lab.namespace] = run_id
+
+    async def __follow(self, lab: Lab, events: asyncio.Queue[ProgressEvent]) -> None:
+        sampler: asyncio.Task = asyncio.create_task(self.__sample_resources(lab), name = f"RESULT_STORE_SAMPLE {lab.namespace}")
+        try:
+            while True:
+                event: ProgressEvent = await events.get()
+                self.__record_event(lab, event)
+                if isinstance(event, PhaseChanged) and event.phase == Lab.Status.STOPPED:
+                    break
+        finally:
+            lab.progress.unsubscribe(events)
+            sampler.cancel()
+
+    def __record_event(self, lab: Lab, event: ProgressEvent) -> None:
+        if isinstance(event, TaskCompleted | TaskFailed):
+            self.put(INSERT_TASK_TIMING, (
+                self.__current_runs.get(lab.namespace),
+                lab.namespace,
+                event.phase.name,
+                event.name,
+                int(isinstance(event, TaskCompleted)),
+                event.error if isinstance(event, TaskFailed) else None,
+                time.time() - (time.monotonic() - event.at),
+                event.elapsed
+            ))
+
+    async def __sample_resources(self, lab: Lab) -> None:
+        while True:
+            await asyncio.sleep(self.sample_interval)
+            at: float = time.time()
+            for node_key, node in list(lab.nodes.items()):
+                if node.cpu_percent is not None or node.memory_usage is not None:
+                    self.put(INSERT_RESOURCE_SAMPLE, (self.__current_runs.get(lab.namespace), lab.namespace, node_key, at, node.cpu_percent, node.memory_usage))
@@ -0,0 +1,227 @@
+from __future__ import annotations
+import asyncio
+from collections import OrderedDict
+import heapq
+import logging
+import time
+from typing import Any
+
+from .channel import Channel
+from .lab import Lab
+from .node import Node
+
+class Router:
+    def __init__(self, lab: Lab, *, use_channel_state: bool = True, max_routes: int = 100_000, final_cltv: int = 18, unroutable_ttl: float = 5.0) -> None:
+        self.__lab: Lab = lab
+        self.use_channel_state: bool = use_channel_state
+        self.max_routes: int = int(max_routes)
+        self.final_cltv: int = int(final_cltv)
+        self.unroutable_ttl: float = float(unroutable_ttl)
+        self.__incoming: dict[str, list[tuple[str, str]]] = {}
+        self.__ends: dict[str, tuple[str, str]] = {}
+        self.__routes: OrderedDict[tuple[str, str, int], list[str]] = OrderedDict()
+        self.__unroutable: dict[tuple[str, str, int], float] = {}
+        self.__routes_by_edge: dict[str, set[tuple[str, str, int]]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self.__index_graph()
+
+        if use_channel_state:
+            lab.channel_state.add_listener(self.__on_channels_changed)
+
+    def __index_graph(self) -> None:
+        self.__incoming.clear()
+        self.__ends.clear()
+        for source, target, key in self.__lab.graph.edges(keys = True):
+            self.__incoming.setdefault(target, []).append((source, key))
+            self.__ends[key] = (source, target)
+
+    def close(self) -> None:
+        if self.use_channel_state:
+            self.__lab.channel_state.remove_listener(self.__on_channels_changed)
+
+    @staticmethod
+    def bucket(amount: int) -> int:
+        return int(amount).bit_length()
+
+    def __edge(self, key: str) -> tuple[int, int, int, int] | None:
+        source, target = self.__ends[key]
+        edge: Any = self.__lab.graph[source][target][key]
+        channel: Channel | None = self.__lab.channels.get(key)
+
+        if channel is None:
+            return None
+        if self.use_channel_state and channel.updated_at:
+            if channel.state is not None and channel.state != "CHANNELD_NORMAL":
+                return None
+            return channel.balance, channel.base_fee, channel.ppm_fee, channel.cltv_delta
+        return int(edge["balance"]), int(edge["base_fee"]), int(edge["ppm_fee"]), channel.cltv_delta
+
+    def find_path(self, sender_key: str, recipient_key: str, amount: int) -> list[str] | None:
+        required: dict[str, int] = {recipient_key: amount}
+        next_edge: dict[str, str] = {}
+        queue: list[tuple[int, int, str]] = [(amount, 0, recipient_key)]
+        visited: set[str] = set()
+
+        while queue:
+            needed, hops, node_key = heapq.heappop(queue)
+            if node_key in visited:
+                continue
+            visited.add(node_key)
+
+            if node_key == sender_key:
+                path: list[str] = []
+                while node_key != recipient_key:
+                    path.append(next_edge[node_key])
+                    node_key = self.__ends[next_edge[node_key]][1]
+                return path
+
+            for source_key, key in self.__incoming.get(node_key, []):
+                if source_key in visited:
+                    continue
+                edge: tuple[int, int, int, int] | None = self.__edge(key)
+                if edge is None or edge[0] < needed:
+                    continue
+                fee: int = 0 if source_key == sender_key else edge[1] + needed * edge[2] // 1_000_000
+                if needed + fee < required.get(source_key, needed + fee + 1):
+                    required[source_key] = needed + fee
+                    next_edge[source_key] = key
+                    heapq.heappush(queue, (needed + fee, hops + 1, source_key))
+
+        return None
+
+    def build_route(self, path: list[str], amount: int) -> list[dict[str, Any]]:
+        route: list[dict[str, Any]] = []
+        hop_amount: int = amount
+        delay: int = self.final_cltv
+
+        for i in reversed(range(len(path))):
+            channel: Channel = self.__lab.channels[path[i]]
+            route.append({
+                "id": channel.destination.public_key,
+                "channel": channel.short_channel_id,
+                "amount_msat": hop_amount,
+                "delay": delay
+            })
+            if i:
+                base_fee, ppm_fee, cltv_delta = (
+                    (channel.base_fee, channel.ppm_fee, channel.cltv_delta) if self.use_channel_state and channel.updated_at
+                    else self.__graph_policy(path[i])
+                )
+                hop_amount += base_fee + hop_amount * ppm_fee // 1_000_000
+                delay += cltv_delta
+
+        route.reverse()
+        return route
+
+    def __graph_policy(self, key: str) -> tuple[int, int, int]:
+        source, target = self.__ends[key]
+        edge: Any = self.__lab.graph[source][target][key]
+        return int(edge["base_fee"]), int(edge["ppm_fee"]), self.__lab.channels[key].cltv_delta
+
+    def __lookup(self, sender_key: str, recipient_key: str, amount: int) -> list[str] | None:
+        cache_key: tuple[str, str, int] = (sender_key, recipient_key, self.bucket(amount))
+
+        if cache_key in self.__routes:
+            self.__routes.move_to_end(cache_key)
+            self.hits += 1
+            return self.__routes[cache_key]
+        if self.__unroutable.get(cache_key, 0.0) > time.monotonic():
+            self.hits += 1
+            return None
+
+        self.misses += 1
+        path: list[str] | None = self.find_path(sender_key, recipient_key, (1 << cache_key[2]) - 1)
+        if path is None:
+            now: float = time.monotonic()
+            if len(self.__unroutable) >= self.max_routes:
+                self.__unroutable = {k: expires_at for k, expires_at in self.__unroutable.items() if expires_at > now}
+            self.__unroutable[cache_key] = now + self.unroutable_ttl
+        else:
+            self.__unroutable.pop(cache_key, None)
+            self.__store(cache_key, path)
+        return path
+
+    def __unresolved(self, path: list[str]) -> set[Node]:
+        return {self.__lab.channels[k].source for k in path if self.__lab.channels[k].short_channel_id is None}
+
+    def route(self, sender_key: str, recipient_key: str, amount: int) -> list[dict[str, Any]] | None:
+        path: list[str] | None = self.__lookup(sender_key, recipient_key, amount)
+        if not path or self.__unresolved(path):
+            return None
+        return self.build_route(path, amount)
+
+    async def __resolve(self, nodes: set[Node]) -> None:
+        results = await asyncio.gather(*(self.__lab.channel_state.refresh_node(n) for n in nodes), return_exceptions = True)
+        for node, result in zip(nodes, results):
+            if isinstance(result, BaseException):
+                logging.error(f"REFRESH_CHANNELS {node} {result}")
+
+    def __store(self, cache_key: tuple[str, str, int], path: list[str]) -> None:
+        self.__routes[cache_key] = path
+        for key in path:
+            self.__routes_by_edge.setdefault(key, set()).add(cache_key)
+
+        while len(self.__routes) > self.max_routes:
+            evicted_key, evicted_path = self.__routes.popitem(last = False)
+            self.__unindex(evicted_key, evicted_path)
+
+    def __unindex(self, cache_key: tuple[str, str, int], path: list[str]) -> None:
+        for key in path:
+            self.__routes_by_edge.get(key, set()).discard(cache_key)
+
+    def invalidate(self, *, edge_keys: set[str] | None = None, sender_key: str | None = None, recipient_key: str | None = None) -> None:
+        stale: set[tuple[str, str, int]] = set()
+        for key in edge_keys or set():
+            stale |= self.__routes_by_edge.pop(key, set())
+        if sender_key is not None or recipient_key is not None:
+            stale |= {
+                k for k in self.__routes
+                if (sender_key is None or k[0] == sender_key) and (recipient_key is None or k[1] == recipient_key)
+            }
+        for cache_key in stale:
+            if cache_key in self.__routes:
+                self.__unindex(cache_key, self.__routes.pop(cache_key))
+        if sender_key is not None or recipient_key is not None:
+            for cache_key in [k for k in self.__unroutable if (sender_key is None or k[0] == sender_key) and (recipient_key is None or k[1] == recipient_key)]:
+                del self.__unroutable[cache_key]
+
+    def __on_channels_changed(self, edge_keys: set[str]) -> None:
+        self.__unroutable.clear()
+        graph: Any = self.__lab.graph
+        if any(key not in self.__ends or not graph.has_edge(*self.__ends[key], key) for key in edge_keys):
+            self.__index_graph()
+            self.__routes.clear()
+            self.__routes_by_edge.clear()
+        else:
+            self.invalidate(edge_keys = edge_keys)
+
+    def __erring_edges(self, error: Any) -> set[str]:
+        data: Any = error.get("data", {}) if isinstance(error, dict) else {}
+        erring_channel: str | None = data.get("erring_channel") if isinstance(data, dict) else None
+        if not erring_channel:
+            return set()
+        return {k for k, c in self.__lab.channels.items() if c.short_channel_id == erring_channel}
+
+    async def pay(self, sender_key: str, recipient_key: str, invoice: Any, amount: int) -> Any:
+        sender: Node = self.__lab.nodes[sender_key]
+        path: list[str] | None = self.__lookup(sender_key, recipient_key, amount)
+
+        if path and (unresolved := self.__unresolved(path)):
+            await self.__resolve(unresolved)
+            path = self.__lookup(sender_key, recipient_key, amount)
+
+        if not path or self.__unresolved(path):
+            logging.info(f"ROUTE_FALLBACK {sender_key} {recipient_key} {amount} {'unresolved' if path else 'no_path'}")
+            return await sender.pay_invoice(invoice)
+
+        route: list[dict[str, Any]] = self.build_route(path, amount)
+        try:
+            return await sender.pay_invoice(invoice, route)
+        except RuntimeError as e:
+            erring_edges: set[str] = self.__erring_edges(e.args[0])
+            logging.warning(f"ROUTE_FAILED {sender_key} {recipient_key} {amount} {sorted(erring_edges)}")
+            self.invalidate(edge_keys = erring_edges)
+            self.invalidate(sender_key = sender_key, recipient_key = recipient_key)
+            raise
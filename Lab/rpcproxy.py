@@ -0,0 +1,214 @@
+from __future__ import annotations
+import asyncio
+import base64
+from collections import OrderedDict
+import json
+import logging
+import socket
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from .miner import Miner
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+class RPCProxy:
+    HOST_ALIAS: str = "host.docker.internal"
+
+    IMMUTABLE_METHODS: frozenset[str] = frozenset({"getblock", "getblockheader", "getrawtransaction", "getblockstats"})
+    VERBOSE_PARAMS: dict[str, tuple[int, str, Any]] = {
+        "getblock": (1, "verbosity", 1),
+        "getblockheader": (1, "verbose", True),
+        "getrawtransaction": (1, "verbose", False)
+    }
+    TIP_METHODS: frozenset[str] = frozenset({
+        "getblockchaininfo",
+        "getblockcount",
+        "getbestblockhash",
+        "getblockhash",
+        "estimatesmartfee",
+        "getnetworkinfo",
+        "getmininginfo"
+    })
+    COALESCED_METHODS: frozenset[str] = IMMUTABLE_METHODS | TIP_METHODS | frozenset({"gettxout", "getmempoolinfo"})
+
+    def __init__(self, miner: Miner, *, host: str | None = None, max_immutable: int = 20_000, poll_interval: float = 0.5) -> None:
+        self.miner: Miner = miner
+        self.host: str | None = host
+        self.max_immutable: int = int(max_immutable)
+        self.poll_interval: float = float(poll_interval)
+        self.port: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+        self.__immutable: OrderedDict[tuple[str, str, str], tuple[int, Any]] = OrderedDict()
+        self.__tip: dict[tuple[str, str, str], tuple[int, Any]] = {}
+        self.__pending: dict[tuple[str, str, str], tuple[bool, asyncio.Future[tuple[int, Any, Any, httpx.Response | None]]]] = {}
+        self.__best_block_hash: str | None = None
+        self.__authorization: str = ""
+        self.__client: httpx.AsyncClient | None = None
+        self.__runner: web.AppRunner | None = None
+        self.__poll_task: asyncio.Task | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.__runner is not None
+
+    async def start(self) -> RPCProxy:
+        if self.__runner is None:
+            from aiohttp import web
+            if self.host is None:
+                self.host = await asyncio.to_thread(self.miner.backend().host_gateway)
+            self.__authorization = "Basic " + base64.b64encode(f"{self.miner.username}:{self.miner.password}".encode()).decode()
+            self.__client = httpx.AsyncClient(
+                base_url = self.miner.url,
+                auth = (self.miner.username, self.miner.password),
+                timeout = 60,
+                limits = httpx.Limits(max_connections = 64, max_keepalive_connections = 64)
+            )
+
+            application: web.Application = web.Application()
+            application.router.add_post("/{path:.*}", self.__handle)
+            self.__runner = web.AppRunner(application, access_log = None)
+            await self.__runner.setup()
+
+            listener: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((self.host, 0))
+            self.port = listener.getsockname()[1]
+            await web.SockSite(self.__runner, listener).start()
+
+            self.__poll_task = asyncio.create_task(self.__poll_tip(), name = f"RPC_PROXY {self.miner}")
+            logging.info(f"RPC_PROXY_STARTED {self.miner} {self.port}")
+        return self
+
+    async def stop(self) -> None:
+        if self.__poll_task:
+            self.__poll_task.cancel()
+            self.__poll_task = None
+        if self.__runner:
+            await self.__runner.cleanup()
+            self.__runner = None
+        if self.__client:
+            await self.__client.aclose()
+            self.__client = None
+        logging.info(f"RPC_PROXY_STOPPED {self.miner} {self.hits} {self.misses} {self.coalesced}")
+
+    def invalidate(self) -> None:
+        self.__tip = {}
+        self.__pending = {key: pending for key, pending in self.__pending.items() if pending[0]}
+
+    @classmethod
+    def is_immutable(cls, method: str, params: Any) -> bool:
+        if method not in cls.IMMUTABLE_METHODS:
+            return False
+        if method not in cls.VERBOSE_PARAMS:
+            return True
+        position, name, default = cls.VERBOSE_PARAMS[method]
+        verbose: Any = (
+            params.get(name, default) if isinstance(params, dict)
+            else params[position] if isinstance(params, list) and len(params) > position
+            else default
+        )
+        return not verbose
+
+    async def __poll_tip(self) -> None:
+        while True:
+            try:
+                response: httpx.Response = await self.__forward("", b'{"jsonrpc":"1.0","id":"proxy","method":"getbestblockhash","params":[]}')
+                response.raise_for_status()
+                best_block_hash: Any = response.json().get("result")
+                if best_block_hash != self.__best_block_hash:
+                    self.__best_block_hash = best_block_hash
+                    self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"RPC_PROXY_POLL {self.miner} {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def __forward(self, path: str, body: bytes) -> httpx.Response:
+        assert self.__client is not None
+        return await self.__client.post(f"/{path}", content = body, headers = {"Content-Type": "text/plain"})
+
+    @staticmethod
+    def __decode(response: httpx.Response) -> dict[str, Any] | None:
+        try:
+            decoded: Any = response.json()
+        except ValueError:
+            return None
+        return decoded if isinstance(decoded, dict) else None
+
+    @staticmethod
+    def __pass_through(response: httpx.Response) -> web.Response:
+        from aiohttp import web
+        return web.Response(status = response.status_code, body = response.content, content_type = response.headers.get("Content-Type", "text/plain").split(";")[0])
+
+    async def __handle(self, request: web.Request) -> web.Response:
+        from aiohttp import web
+        if request.headers.get("Authorization") != self.__authorization:
+            return web.Response(status = 401)
+
+        path: str = request.match_info["path"]
+        body: bytes = await request.read()
+        try:
+            call: Any = json.loads(body)
+        except ValueError:
+            call = None
+
+        if not isinstance(call, dict) or call.get("method") not in self.COALESCED_METHODS:
+            return self.__pass_through(await self.__forward(path, body))
+
+        method: str = call["method"]
+        params: Any = call.get("params", [])
+        key: tuple[str, str, str] = (path, method, json.dumps(params, separators = (",", ":")))
+        immutable: bool = self.is_immutable(method, params)
+        cache: dict[tuple[str, str, str], tuple[int, Any]] | None = (
+            self.__immutable if immutable
+            else self.__tip if method in self.TIP_METHODS or method in self.IMMUTABLE_METHODS
+            else None
+        )
+
+        if cache is not None and key in cache:
+            self.hits += 1
+            status, result = cache[key]
+            error: Any = None
+        elif key in self.__pending:
+            self.coalesced += 1
+            status, result, error, undecodable = await asyncio.shield(self.__pending[key][1])
+            if undecodable is not None:
+                return self.__pass_through(undecodable)
+        else:
+            self.misses += 1
+            future: asyncio.Future[tuple[int, Any, Any, httpx.Response | None]] = asyncio.get_running_loop().create_future()
+            self.__pending[key] = (immutable, future)
+            try:
+                forwarded: httpx.Response = await self.__forward(path, body)
+                decoded: dict[str, Any] | None = self.__decode(forwarded)
+                if decoded is None:
+                    future.set_result((forwarded.status_code, None, None, forwarded))
+                    return self.__pass_through(forwarded)
+                status, result, error = forwarded.status_code, decoded.get("result"), decoded.get("error")
+                future.set_result((status, result, error, None))
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()
+                raise
+            finally:
+                if self.__pending.get(key, (False, None))[1] is future:
+                    del self.__pending[key]
+
+            if cache is not None and error is None and status == 200 and result is not None:
+                cache[key] = (status, result)
+                while cache is self.__immutable and len(cache) > self.max_immutable:
+                    cache.popitem(last = False)
+
+        if cache is self.__immutable and key in cache:
+            self.__immutable.move_to_end(key)
+
+        return web.json_response({"result": result, "error": error, "id": call.get("id")}, status = status)
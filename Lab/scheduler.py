@@ -0,0 +1,164 @@
+from __future__ import annotations
+import asyncio
+from contextlib import asynccontextmanager
+from itertools import cycle
+import logging
+import math
+import os
+import time
+from typing import AsyncIterator, Iterator
+
+MIB: int = 1024 ** 2
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+class HostResources:
+    def __init__(self, *, memory_total: int, memory_available: int, cpus: list[int], cpu_quota: float, load: float) -> None:
+        self.memory_total: int = memory_total
+        self.memory_available: int = memory_available
+        self.cpus: list[int] = cpus
+        self.cpu_quota: float = cpu_quota
+        self.load: float = load
+
+    @property
+    def cpu_count(self) -> int:
+        return max(1, min(len(self.cpus), math.floor(self.cpu_quota)))
+
+    @classmethod
+    def read(cls) -> HostResources:
+        meminfo: dict[str, int] = {}
+        for line in (_read("/proc/meminfo") or "").splitlines():
+            key, _, value = line.partition(":")
+            meminfo[key] = int(value.split()[0]) * 1024
+
+        memory_total: int = meminfo.get("MemTotal", 0)
+        memory_available: int = meminfo.get("MemAvailable", meminfo.get("MemFree", 0))
+
+        cgroup_limit: str | None = _read("/sys/fs/cgroup/memory.max") or _read("/sys/fs/cgroup/memory/memory.limit_in_bytes")
+        cgroup_usage: str | None = _read("/sys/fs/cgroup/memory.current") or _read("/sys/fs/cgroup/memory/memory.usage_in_bytes")
+        if cgroup_limit and cgroup_limit.isdigit() and int(cgroup_limit) < memory_total:
+            memory_total = int(cgroup_limit)
+            memory_available = min(memory_available, memory_total - int(cgroup_usage or 0))
+
+        cpus: list[int] = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        cpu_quota: float = float(len(cpus))
+        cpu_max: str | None = _read("/sys/fs/cgroup/cpu.max")
+        if cpu_max and not cpu_max.startswith("max"):
+            quota, period = cpu_max.split()
+            cpu_quota = int(quota) / int(period)
+        else:
+            quota_v1: str | None = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+            period_v1: str | None = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+            if quota_v1 and period_v1 and int(quota_v1) > 0:
+                cpu_quota = int(quota_v1) / int(period_v1)
+
+        load: float = float((_read("/proc/loadavg") or "0").split()[0])
+
+        return cls(memory_total = memory_total, memory_available = memory_available, cpus = cpus, cpu_quota = cpu_quota, load = load)
+
+class AdmissionScheduler:
+    ROLE_MEMORY: dict[str, int] = {
+        "miner": 256 * MIB,
+        "node": 256 * MIB
+    }
+
+    def __init__(
+        self,
+        *,
+        role_memory: dict[str, int] | None = None,
+        headroom: float = 0.1,
+        startup_slots: int | None = None,
+        pin_cpus: bool = False,
+        poll_interval: float = 0.5,
+        admission_timeout: float = 300.0,
+        budget: int | None = None,
+        startups: asyncio.Semaphore | None = None
+    ) -> None:
+        self.resources: HostResources = HostResources.read()
+        self.role_memory: dict[str, int] = {**self.ROLE_MEMORY, **(role_memory or {})}
+        self.headroom: float = float(headroom)
+        self.budget: int = int(self.resources.memory_available * (1 - self.headroom)) if budget is None else int(budget)
+        self.pin_cpus: bool = pin_cpus
+        self.poll_interval: float = float(poll_interval)
+        self.admission_timeout: float = float(admission_timeout)
+        self.local: bool = os.environ.get("DOCKER_HOST", "unix://").startswith("unix://")
+        if not self.local and startups is None:
+            logging.warning(f"ADMISSION_REMOTE {os.environ['DOCKER_HOST']}")
+        self.__reserved: int = 0
+        self.__startups: asyncio.Semaphore = startups or asyncio.Semaphore(startup_slots or self.resources.cpu_count * 2)
+        self.__released: asyncio.Event = asyncio.Event()
+        self.__cpus: Iterator[int] = cycle(self.resources.cpus)
+
+    @property
+    def reserved(self) -> int:
+        return self.__reserved
+
+    def partition(self, budget: int) -> AdmissionScheduler:
+        return AdmissionScheduler(
+            role_memory = self.role_memory,
+            headroom = self.headroom,
+            pin_cpus = self.pin_cpus,
+            poll_interval = self.poll_interval,
+            admission_timeout = self.admission_timeout,
+            budget = budget,
+            startups = self.__startups
+        )
+
+    def memory_limit(self, role: str) -> int:
+        return self.role_memory[role]
+
+    def cpuset(self, role: str) -> str | None:
+        return str(next(self.__cpus)) if self.pin_cpus else None
+
+    def max_node_count(self, nodes_per_miner: int) -> int:
+        per_node: float = self.role_memory["node"] + self.role_memory["miner"] / nodes_per_miner
+        return int(self.budget // per_node)
+
+    def required_memory(self, node_count: int, miner_count: int) -> int:
+        return node_count * self.role_memory["node"] + miner_count * self.role_memory["miner"]
+
+    def __overloaded(self, role: str) -> str | None:
+        if not self.local:
+            return None
+        live: HostResources = HostResources.read()
+        if live.memory_available - self.role_memory[role] < self.resources.memory_total * self.headroom:
+            return f"{live.memory_available // MIB} MiB available is below the {self.headroom:.0%} headroom"
+        if live.load > self.resources.cpu_count * 2:
+            return f"load {live.load:.1f} exceeds twice the {self.resources.cpu_count} admitted CPUs"
+        return None
+
+    async def reserve(self, role: str) -> None:
+        memory: int = self.role_memory[role]
+        if memory > self.budget:
+            raise RuntimeError(f"A {role} needs {memory // MIB} MiB but only {self.budget // MIB} MiB can be admitted on this host")
+
+        while self.__reserved + memory > self.budget:
+            self.__released.clear()
+            await self.__released.wait()
+
+        self.__reserved += memory
+
+    def release(self, role: str) -> None:
+        self.__reserved = max(0, self.__reserved - self.role_memory[role])
+        self.__released.set()
+
+    @asynccontextmanager
+    async def admit(self, role: str) -> AsyncIterator[None]:
+        await self.reserve(role)
+        try:
+            async with self.__startups:
+                deadline: float = time.monotonic() + self.admission_timeout
+                while reason := self.__overloaded(role):
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"A {role} was not admitted within {self.admission_timeout:.0f}s: {reason}")
+                    logging.warning(f"ADMISSION_WAIT {role} {self.__reserved // MIB} {reason}")
+                    await asyncio.sleep(self.poll_interval)
+                yield
+        except BaseException:
+            self.release(role)
+            raise
@@ -1,21 +1,20 @@
 from __future__ import annotations
 from abc import abstractmethod
 import asyncio
-import io
 import logging
-import tarfile
-from typing import Any, Self, Generator
-import docker
-from docker.models.containers import Container
-import json
+from typing import Any, Callable, Self, Generator
 import httpx
 
+from .backend import ContainerBackend, create_backend
+from .containers import ContainerStateCache
+from .logmux import LogMultiplexer, Subscription
+from .ports import PortAllocator
+
 class Server():
-    __docker_client: docker.DockerClient = docker.from_env(timeout = 600, max_pool_size = 10_000)
-    try:
-        __docker_client.networks.create("streamslab")
-    except:
-        ...
+    MEMORY_LIMIT: int = 256 * 1024 ** 2
+
+    __backend: ContainerBackend | None = None
+    __ports: PortAllocator = PortAllocator()
 
     def __init__(
         self,
@@ -23,30 +22,105 @@ class Server():
         image: str,
         command: str | list[str],
         environment: dict[str, str] | None = None,
-        control_port: int | None
+        control_port: int | None,
+        mem_limit: int = MEMORY_LIMIT,
+        cpuset_cpus: str | None = None,
+        network: str = "streamslab",
+        name: str | None = None,
+        labels: dict[str, str] | None = None,
+        extra_hosts: dict[str, str] | None = None
     ) -> None:
-        self.__container: Container = self.__docker_client.containers.create(
+        self.network: str = network
+        self.__host_port: int | None = self.__ports.allocate() if control_port else None
+        self.__container_id, self.__name = self.backend().create_container(
             image = image,
             command = command,
-            detach = True,
-            network = "streamslab",
             environment = environment,
-            ports = {f"{control_port}/tcp": None} if control_port else None,
-            mem_limit = "256m",
-            memswap_limit = "256m",
-            auto_remove = True
+            control_port = control_port,
+            host_port = self.__host_port,
+            mem_limit = mem_limit,
+            cpuset_cpus = cpuset_cpus,
+            network = network,
+            name = name,
+            labels = labels,
+            extra_hosts = extra_hosts
         )
         self.__control_port: int | None = control_port
         self._rest_client: httpx.AsyncClient
+        self.cpu_percent: float | None = None
+        self.memory_usage: int | None = None
+        self.__stats_task: asyncio.Task | None = None
+        self.container_states().update(self.__container_id, "created")
 
     def __await__(self) -> Generator[Any, None, Self]:
         return self.start().__await__()
 
+    @staticmethod
+    def backend() -> ContainerBackend:
+        if Server.__backend is None:
+            Server.__backend = create_backend()
+        return Server.__backend
+
+    @staticmethod
+    def active_backend() -> ContainerBackend | None:
+        return Server.__backend
+
+    @staticmethod
+    def use_backend(backend: ContainerBackend | str | None) -> None:
+        Server.__backend = create_backend(backend) if isinstance(backend, str) else backend
+
+    @classmethod
+    def create_network(cls, name: str, labels: dict[str, str] | None = None) -> None:
+        cls.backend().create_network(name, labels)
+
+    @classmethod
+    def remove_network(cls, name: str) -> None:
+        cls.backend().remove_network(name)
+
+    @classmethod
+    async def list_containers(cls, labels: dict[str, str]) -> list[str]:
+        return await cls.backend().list_containers(labels)
+
+    @classmethod
+    async def remove_containers(cls, labels: dict[str, str], *, grace: float = 0, timeout: float = 30, concurrency: int = 100) -> int:
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        backend: ContainerBackend = cls.backend()
+
+        async def stop(container_id: str) -> None:
+            async with semaphore:
+                await backend.stop_container(container_id, grace)
+
+        async def remove(container_id: str) -> None:
+            async with semaphore:
+                await backend.remove_container(container_id)
+
+        container_ids: list[str] = await cls.list_containers(labels)
+        if grace:
+            await asyncio.gather(*(stop(container_id) for container_id in container_ids))
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        deadline: float = loop.time() + timeout
+        while remaining := await cls.list_containers(labels):
+            if loop.time() > deadline:
+                raise RuntimeError(f"{len(remaining)} containers labelled {labels} survived teardown")
+            await asyncio.gather(*(remove(container_id) for container_id in remaining))
+            await asyncio.sleep(0.1)
+
+        for container_id in container_ids:
+            cls.container_states().update(container_id, "removed")
+        return len(container_ids)
+
+    @classmethod
+    def container_states(cls) -> ContainerStateCache:
+        return cls.backend().container_states()
+
     async def start(self) -> Self:
         if not self.is_running:
-            await asyncio.to_thread(self.container.start)
+            self.container_states().follow()
+            await self.backend().start_container(self.container_id)
+            self.container_states().update(self.container_id, "running")
             self._rest_client = httpx.AsyncClient(
-                base_url = await self.__control_url,
+                base_url = self.__control_url,
                 timeout = 60
             )
         return self
@@ -56,38 +130,57 @@ class Server():
 
     @property
     def is_running(self) -> bool:
-        return self.__container.status == "running"
+        return self.container_states().status(self.__container_id) == "running"
     
     @property
     def name(self) -> str:
-        if not self.container.name:
-            raise
-        else:
-            return self.container.name
+        return self.__name
     
     @property
-    def container(self) -> Container:
-        if not self.__container:
-            raise RuntimeError("Server is not running")
-        else:
-            return self.__container
+    def container_id(self) -> str:
+        return self.__container_id
     
     @property
-    async def __control_url(self) -> str:
-        if not self.__control_port:
-            raise ValueError("No control port is exposed to host")
-        
-        self.container.reload()
-        while not self.container.attrs["NetworkSettings"]["Ports"][f"{self.__control_port}/tcp"]:
-            self.container.reload()
-            logging.warning(f"Port was not loaded on {self}. We have {json.dumps(self.container.attrs["NetworkSettings"]["Ports"])}")
-            await asyncio.sleep(1)
+    def url(self) -> str:
+        return self.__control_url
 
-        host_port = int(self.container.attrs["NetworkSettings"]["Ports"][f"{self.__control_port}/tcp"][0]["HostPort"])
+    @property
+    def __control_url(self) -> str:
+        if not self.__control_port or not self.__host_port:
+            raise ValueError("No control port is exposed to host")
 
-        logging.debug(f"{self} exposes {host_port}")
+        logging.debug(f"{self} exposes {self.__host_port}")
             
-        return f"http://127.0.0.1:{host_port}"
+        return self.backend().control_url(self.__container_id, self.__host_port)
+
+    async def read_stats(self) -> dict[str, Any]:
+        stats: dict[str, Any] = await self.backend().read_stats(self.container_id)
+
+        cpu: dict[str, Any] = stats.get("cpu_stats", {})
+        previous_cpu: dict[str, Any] = stats.get("precpu_stats", {})
+        cpu_delta: int = cpu.get("cpu_usage", {}).get("total_usage", 0) - previous_cpu.get("cpu_usage", {}).get("total_usage", 0)
+        system_delta: int = cpu.get("system_cpu_usage", 0) - previous_cpu.get("system_cpu_usage", 0)
+        online_cpus: int = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or [1])
+        self.cpu_percent = cpu_delta / system_delta * online_cpus * 100 if system_delta > 0 else 0.0
+
+        memory: dict[str, Any] = stats.get("memory_stats", {})
+        cache: int = memory.get("stats", {}).get("inactive_file", memory.get("stats", {}).get("cache", 0))
+        self.memory_usage = max(0, memory.get("usage", 0) - cache)
+
+        return stats
+
+    def start_stats(self, interval: float = 10) -> None:
+        if self.__stats_task is None:
+            self.__stats_task = asyncio.create_task(self.__log_stats(interval), name = f"STATS {self}")
+
+    async def __log_stats(self, interval: float) -> None:
+        while True:
+            try:
+                stats: dict[str, Any] = await self.read_stats()
+            except Exception:
+                break
+            logging.info(f"STATS {stats}")
+            await asyncio.sleep(interval)
 
     async def execute(self, *command: str, **kwargs) -> Any:
         ...
@@ -101,32 +194,34 @@ class Server():
         ...
 
     async def read_file(self, file_path: str) -> str:
-        data_stream, stat = await asyncio.to_thread(self.container.get_archive, file_path)
-
-        file_bytes = io.BytesIO()
-        for chunk in data_stream:
-            file_bytes.write(chunk)
-
-        file_bytes.seek(0)
-
-        with tarfile.open(fileobj = file_bytes) as tar:
-            member = tar.getmembers()[0]
-            extracted_file = tar.extractfile(member)
-            if extracted_file:
-                file_contents: str = extracted_file.read().decode("utf-8")
-                return file_contents
-            else:
-                raise FileNotFoundError(f"Unable to read {file_path} from {self.name}")
+        return await self.backend().read_file(self.container_id, file_path)
+
+    async def exec(self, command: list[str]) -> tuple[int, bytes]:
+        return await self.backend().exec(self.container_id, command)
     
-    def __block_until(self, text: str) -> None:
-        for line in self.container.logs(stream = True, follow = True):
-            if text in line.decode():
-                return
+    @classmethod
+    def logs(cls) -> LogMultiplexer:
+        return cls.backend().logs()
+
+    def subscribe_log(self, text: str, callback: Callable[[str, bytes], None]) -> Subscription:
+        return self.logs().subscribe(self.container_id, text.encode(), callback)
     
-    async def wait_for(self, text: str) -> None:
-        await asyncio.to_thread(self.__block_until, text)
+    async def wait_for(self, text: str, timeout: float | None = None) -> bytes:
+        return await self.logs().wait_for(self.container_id, text.encode(), timeout)
     
-    async def stop(self) -> None:
+    async def stop(self, grace: float = 10) -> None:
         if self.is_running:
-            await asyncio.to_thread(self.__container.stop)
-            await self._rest_client.aclose()
\ No newline at end of file
+            await self.backend().stop_container(self.container_id, grace)
+            self.container_states().update(self.container_id, "exited")
+        await self.close()
+
+    async def close(self) -> None:
+        if self.__stats_task:
+            self.__stats_task.cancel()
+            self.__stats_task = None
+        rest_client: httpx.AsyncClient | None = getattr(self, "_rest_client", None)
+        if rest_client:
+            await rest_client.aclose()
+        if self.__host_port:
+            self.__ports.release(self.__host_port)
+            self.__host_port = None
\ No newline at end of file
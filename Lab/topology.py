@@ -0,0 +1,149 @@
+from __future__ import annotations
+from typing import Any, Callable, Iterator
+
+import networkx as nx
+import numpy as np
+
+from .paygraph import PayGraph
+
+Edges = Iterator[tuple[int, int]]
+
+def erdos_renyi(*, nodes: int, edges: int, seed: int | None = None) -> Edges:
+    yield from nx.gnm_random_graph(n = nodes, m = edges, seed = seed, directed = True).edges
+
+def barabasi_albert(*, nodes: int, attachments: int, seed: int | None = None) -> Edges:
+    generator: np.random.Generator = np.random.default_rng(seed)
+    repeated: list[int] = []
+    targets: list[int] = list(range(attachments))
+
+    for source in range(attachments, nodes):
+        for target in targets:
+            yield source, target
+        repeated.extend(targets)
+        repeated.extend([source] * attachments)
+
+        chosen: set[int] = set()
+        while len(chosen) < attachments:
+            chosen.update(repeated[i] for i in generator.integers(0, len(repeated), attachments - len(chosen)))
+        targets = list(chosen)
+
+def watts_strogatz(*, nodes: int, neighbours: int, rewiring: float, seed: int | None = None) -> Edges:
+    generator: np.random.Generator = np.random.default_rng(seed)
+    existing: set[tuple[int, int]] = set()
+
+    for offset in range(1, neighbours // 2 + 1):
+        rewire: np.ndarray = generator.random(nodes) < rewiring
+        replacements: np.ndarray = generator.integers(0, nodes, nodes)
+        for source in range(nodes):
+            target: int = (source + offset) % nodes
+            if rewire[source]:
+                candidate: int = int(replacements[source])
+                if candidate != source and (min(source, candidate), max(source, candidate)) not in existing:
+                    target = candidate
+            pair: tuple[int, int] = (min(source, target), max(source, target))
+            if pair not in existing:
+                existing.add(pair)
+                yield source, target
+
+def configuration_model(*, nodes: int, exponent: float, minimum_degree: int, seed: int | None = None) -> Edges:
+    generator: np.random.Generator = np.random.default_rng(seed)
+    degrees: np.ndarray = np.minimum(
+        (minimum_degree * (1 - generator.random(nodes)) ** (-1 / (exponent - 1))).astype(np.int64),
+        nodes - 1
+    )
+    if degrees.sum() % 2:
+        degrees[int(np.argmin(degrees))] += 1
+
+    stubs: np.ndarray = np.repeat(np.arange(nodes), degrees)
+    generator.shuffle(stubs)
+    pairs: np.ndarray = stubs.reshape(-1, 2)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    pairs = np.unique(np.sort(pairs, axis = 1), axis = 0)
+    generator.shuffle(pairs)
+
+    for source, target in pairs.tolist():
+        yield source, target
+
+def hub_and_spoke(*, nodes: int, hubs: int, links: int, seed: int | None = None) -> Edges:
+    generator: np.random.Generator = np.random.default_rng(seed)
+
+    for source in range(hubs):
+        for target in range(source + 1, hubs):
+            yield source, target
+
+    for spoke in range(hubs, nodes):
+        for hub in generator.choice(hubs, size = min(links, hubs), replace = False).tolist():
+            yield spoke, hub
+
+class Parameter:
+    def __init__(self, prompt: str, type: type, is_valid: Callable[[Any, int], bool], validation_message: str) -> None:
+        self.prompt: str = prompt
+        self.type: type = type
+        self.is_valid: Callable[[Any, int], bool] = is_valid
+        self.validation_message: str = validation_message
+
+class Model:
+    def __init__(self, key: str, title: str, description: list[str], generator: Callable[..., Edges], parameters: dict[str, Parameter]) -> None:
+        self.key: str = key
+        self.title: str = title
+        self.description: list[str] = description
+        self.generator: Callable[..., Edges] = generator
+        self.parameters: dict[str, Parameter] = parameters
+
+MODELS: dict[str, Model] = {
+    "erdos_renyi": Model(
+        "erdos_renyi",
+        "Erdös-Renyi",
+        ["Generates a {{i:G_{n,m}}} random graph with {{i:n}} nodes and {{i:m}} edges chosen uniformly at random"],
+        erdos_renyi,
+        {"edges": Parameter("Number of edges ({{i:m}})", int, lambda m, n: 1 <= m <= n * (n - 1), "{{i:m}} must be a number between one and {{i:n}}({{i:n}} - 1)")}
+    ),
+    "barabasi_albert": Model(
+        "barabasi_albert",
+        "Barabási-Albert",
+        ["Generates a scale-free graph by preferential attachment", "Each new node opens {{i:m}} channels to existing nodes proportionally to their degree"],
+        barabasi_albert,
+        {"attachments": Parameter("Channels per new node ({{i:m}})", int, lambda m, n: 1 <= m < n, "{{i:m}} must be a number between one and {{i:n}} - 1")}
+    ),
+    "watts_strogatz": Model(
+        "watts_strogatz",
+        "Watts-Strogatz",
+        ["Generates a small-world graph from a ring lattice of {{i:k}} neighbours", "with each channel rewired to a random node with probability {{i:p}}"],
+        watts_strogatz,
+        {
+            "neighbours": Parameter("Ring neighbours ({{i:k}})", int, lambda k, n: 2 <= k < n and k % 2 == 0, "{{i:k}} must be an even number between two and {{i:n}} - 1"),
+            "rewiring": Parameter("Rewiring probability ({{i:p}})", float, lambda p, n: 0.0 <= p <= 1.0, "{{i:p}} must be a floating-point number between zero and one")
+        }
+    ),
+    "configuration_model": Model(
+        "configuration_model",
+        "Configuration model",
+        ["Generates a graph from a power-law degree sequence with exponent {{i:γ}}", "Self-loops and parallel channels are dropped"],
+        configuration_model,
+        {
+            "exponent": Parameter("Degree exponent ({{i:γ}})", float, lambda g, n: 2.0 < g <= 4.0, "{{i:γ}} must be a floating-point number greater than two and at most four"),
+            "minimum_degree": Parameter("Minimum degree ({{i:d_min}})", int, lambda d, n: 1 <= d < n, "{{i:d_min}} must be a number between one and {{i:n}} - 1")
+        }
+    ),
+    "hub_and_spoke": Model(
+        "hub_and_spoke",
+        "Hub-and-spoke",
+        ["Generates {{i:h}} fully connected hubs with every other node", "opening channels to {{i:l}} randomly chosen hubs"],
+        hub_and_spoke,
+        {
+            "hubs": Parameter("Number of hubs ({{i:h}})", int, lambda h, n: 1 <= h < n, "{{i:h}} must be a number between one and {{i:n}} - 1"),
+            "links": Parameter("Hubs per spoke ({{i:l}})", int, lambda l, n: 1 <= l, "{{i:l}} must be a number greater than zero")
+        }
+    )
+}
+
+def generate(name: str, model: str, *, nodes: int, seed: int | None = None, attributes: dict[str, Any] | None = None, **parameters: Any) -> PayGraph:
+    if model not in MODELS:
+        raise ValueError(f"Unknown topology model {model}, expected one of {', '.join(MODELS)}")
+
+    return PayGraph(
+        name,
+        MODELS[model].generator(nodes = nodes, seed = seed, **parameters),
+        seed = seed,
+        **(attributes or {})
+    )
@@ -0,0 +1,227 @@
+from __future__ import annotations
+import asyncio
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import multiprocessing
+from multiprocessing.process import BaseProcess
+import queue
+import time
+from typing import Any
+import uuid
+
+import httpx
+import numpy as np
+
+from .lab import Lab
+from .metrics import TrafficMetrics
+from .results import RunRecorder
+from .workload import WorkloadSampler
+
+REPORT_INTERVAL: float = 1.0
+
+class TrafficShard:
+    def __init__(
+        self,
+        *,
+        index: int,
+        endpoints: dict[str, tuple[str, str]],
+        node_keys: list[str],
+        sender_weights: np.ndarray,
+        recipient_weights: np.ndarray,
+        mean_amount: int,
+        amount_deviation: float,
+        amount_distribution: str,
+        rate: float,
+        duration: float | None,
+        seed: str,
+        max_connections: int = 512
+    ) -> None:
+        self.index: int = index
+        self.endpoints: dict[str, tuple[str, str]] = endpoints
+        self.node_keys: list[str] = node_keys
+        self.sender_weights: np.ndarray = sender_weights
+        self.recipient_weights: np.ndarray = recipient_weights
+        self.mean_amount: int = mean_amount
+        self.amount_deviation: float = amount_deviation
+        self.amount_distribution: str = amount_distribution
+        self.rate: float = rate
+        self.duration: float | None = duration
+        self.seed: str = seed
+        self.max_connections: int = max_connections
+
+def partition_senders(weights: np.ndarray, shard_count: int) -> list[np.ndarray]:
+    loads: np.ndarray = np.zeros(shard_count)
+    owners: np.ndarray = np.zeros(len(weights), dtype = np.int64)
+    for i in np.argsort(-weights, kind = "stable").tolist():
+        owner: int = int(np.argmin(loads))
+        owners[i] = owner
+        loads[owner] += weights[i]
+    return [np.where(owners == shard, weights, 0.0) for shard in range(shard_count)]
+
+def run_shard(shard: TrafficShard, reports: Any, stop: Any, records: Any) -> None:
+    handler: QueueHandler = QueueHandler(records)
+    root_logger: logging.Logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(handler)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    try:
+        asyncio.run(_run_shard(shard, reports, stop))
+    finally:
+        root_logger.removeHandler(handler)
+
+async def _run_shard(shard: TrafficShard, reports: Any, stop: Any) -> None:
+    sampler: WorkloadSampler = WorkloadSampler(
+        shard.node_keys,
+        shard.mean_amount,
+        sender_weights = shard.sender_weights,
+        recipient_weights = shard.recipient_weights,
+        amount_deviation = shard.amount_deviation,
+        amount_distribution = shard.amount_distribution,
+        seed = shard.seed
+    )
+    sent: int = 0
+    completions: list[tuple[str, str, int, float, bool, str | None]] = []
+
+    def report(done: bool = False) -> None:
+        nonlocal sent, completions
+        reports.put({"index": shard.index, "sent": sent, "completions": completions, "done": done})
+        sent, completions = 0, []
+
+    async with httpx.AsyncClient(
+        timeout = 60,
+        limits = httpx.Limits(max_connections = shard.max_connections, max_keepalive_connections = shard.max_connections)
+    ) as client:
+
+        async def execute(node_key: str, method: str, **payload: Any) -> Any:
+            url, rune = shard.endpoints[node_key]
+            response: httpx.Response = await client.post(f"{url}/v1/{method}", json = payload, headers = {"Rune": rune})
+            if response.is_error:
+                raise RuntimeError(response.json())
+            return response.json()
+
+        async def generate_pay_invoice(sender_key: str, recipient_key: str, amount: int) -> None:
+            started_at: float = time.monotonic()
+            try:
+                invoice: Any = await execute(recipient_key, "invoice", amount_msat = amount, label = str(uuid.uuid4()), description = "Hello world")
+                logging.info(f"INVOICE {sender_key} {recipient_key} {invoice}")
+                pay: Any = await execute(sender_key, "pay", bolt11 = invoice["bolt11"])
+                logging.info(f"PAYMENT {sender_key} {recipient_key} {pay}")
+                completions.append((sender_key, recipient_key, amount, time.monotonic() - started_at, True, None))
+            except Exception as e:
+                logging.error(f"PAYMENT {sender_key} {recipient_key} {amount} {e}")
+                completions.append((sender_key, recipient_key, amount, time.monotonic() - started_at, False, str(e)))
+
+        async def report_periodically() -> None:
+            while True:
+                await asyncio.sleep(REPORT_INTERVAL)
+                report()
+
+        logging.info(f"TRAFFIC_SHARD_START {shard.index} {shard.rate:.2f}")
+
+        interval: float = 1 / shard.rate
+        deadline: float = time.monotonic() + shard.duration if shard.duration else float("inf")
+        next_at: float = time.monotonic()
+
+        async with asyncio.TaskGroup() as group:
+            reporter: asyncio.Task = group.create_task(report_periodically())
+            while not stop.is_set() and time.monotonic() < deadline:
+                sender_key, recipient_key, amount = sampler.next()
+                group.create_task(generate_pay_invoice(sender_key, recipient_key, amount))
+                sent += 1
+                next_at += interval
+                await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+            reporter.cancel()
+
+    logging.info(f"TRAFFIC_SHARD_STOP {shard.index}")
+    report(done = True)
+
+async def generate_sharded_traffic(
+    lab: Lab,
+    mean_amount: int,
+    *,
+    processes: int,
+    rate: float | None,
+    duration: float | None,
+    seed: str,
+    metrics: TrafficMetrics | None,
+    workload: WorkloadSampler | None,
+    recorder: RunRecorder | None
+) -> dict[str, int]:
+    node_keys: list[str] = list(lab.nodes) if workload is None else workload.node_keys
+    sender_weights: np.ndarray = np.ones(len(node_keys)) if workload is None else workload.sender_weights
+    recipient_weights: np.ndarray = np.ones(len(node_keys)) if workload is None else workload.recipient_weights
+    total_rate: float = rate or max(1, lab.total_node_count // 4) / 10
+    endpoints: dict[str, tuple[str, str]] = {node_key: node.endpoint for node_key, node in lab.nodes.items()}
+
+    shards: list[TrafficShard] = [
+        TrafficShard(
+            index = index,
+            endpoints = endpoints,
+            node_keys = node_keys,
+            sender_weights = weights,
+            recipient_weights = recipient_weights,
+            mean_amount = mean_amount,
+            amount_deviation = 0.25 if workload is None else workload.amount_deviation,
+            amount_distribution = "normal" if workload is None else workload.amount_distribution,
+            rate = total_rate * weights.sum() / sender_weights.sum(),
+            duration = duration,
+            seed = f"{seed}:{index}"
+        )
+        for index, weights in enumerate(w for w in partition_senders(sender_weights, processes) if w.sum() > 0)
+    ]
+
+    stats: dict[str, int] = {"sent": 0, "succeeded": 0, "failed": 0}
+    context = multiprocessing.get_context("spawn")
+    reports: Any = context.Queue()
+    stop: Any = context.Event()
+    records: Any = context.Queue()
+    listener: QueueListener = QueueListener(records, lab.log_handler)
+    workers: list[BaseProcess] = [
+        context.Process(target = run_shard, args = (shard, reports, stop, records), name = f"TRAFFIC_SHARD {shard.index}", daemon = True)
+        for shard in shards
+    ]
+
+    logging.info(f"TRAFFIC_START {lab.name} {len(workers)} {total_rate:.2f}")
+
+    listener.start()
+    for worker in workers:
+        worker.start()
+
+    running: set[int] = set(range(len(workers)))
+    try:
+        while running:
+            if lab.status != Lab.Status.READY:
+                stop.set()
+            try:
+                report: dict[str, Any] = await asyncio.to_thread(reports.get, True, REPORT_INTERVAL)
+            except queue.Empty:
+                for index in list(running):
+                    if not workers[index].is_alive():
+                        logging.error(f"TRAFFIC_SHARD_FAILED {index} {workers[index].exitcode}")
+                        running.discard(index)
+                continue
+
+            stats["sent"] += report["sent"]
+            if metrics:
+                metrics.record_sent(report["sent"])
+            for sender_key, recipient_key, amount, latency, succeeded, error in report["completions"]:
+                stats["succeeded" if succeeded else "failed"] += 1
+                if metrics:
+                    metrics.record(latency, succeeded, None if succeeded else sender_key)
+                if recorder:
+                    recorder.payment(sender_key, recipient_key, amount, latency, succeeded, error)
+            if report["done"]:
+                running.discard(report["index"])
+    finally:
+        stop.set()
+        for worker in workers:
+            await asyncio.to_thread(worker.join, 10)
+            if worker.is_alive():
+                worker.terminate()
+        listener.stop()
+        reports.close()
+        records.close()
+
+    logging.info(f"TRAFFIC_STOP {lab.name} {stats['sent']} {stats['succeeded']} {stats['failed']}")
+    return stats
@@ -0,0 +1,146 @@
+from __future__ import annotations
+import hashlib
+from typing import Any
+
+import numpy as np
+
+from .paygraph import PayGraph
+
+def seed_from(value: int | str | None) -> int | None:
+    if value is None or isinstance(value, int):
+        return value
+    return int.from_bytes(hashlib.sha256(value.encode()).digest()[:8], "big")
+
+class AliasTable:
+    def __init__(self, weights: np.ndarray) -> None:
+        weights = np.asarray(weights, dtype = np.float64)
+        if weights.ndim != 1 or not len(weights) or (weights < 0).any() or not weights.sum() > 0:
+            raise ValueError("Alias table weights must be a non-empty vector of non-negative numbers with a positive sum")
+
+        size: int = len(weights)
+        scaled: np.ndarray = weights * size / weights.sum()
+        self.probability: np.ndarray = np.ones(size, dtype = np.float64)
+        self.alias: np.ndarray = np.arange(size, dtype = np.int64)
+
+        small: list[int] = np.flatnonzero(scaled < 1.0).tolist()
+        large: list[int] = np.flatnonzero(scaled >= 1.0).tolist()
+        while small and large:
+            s, l = small.pop(), large[-1]
+            self.probability[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            if scaled[l] < 1.0:
+                small.append(large.pop())
+
+    def __len__(self) -> int:
+        return len(self.probability)
+
+    def sample(self, generator: np.random.Generator, size: int) -> np.ndarray:
+        columns: np.ndarray = generator.integers(0, len(self.probability), size)
+        return np.where(generator.random(size) < self.probability[columns], columns, self.alias[columns])
+
+def node_weights(graph: PayGraph, node_keys: list[str], weighting: str = "uniform") -> np.ndarray:
+    name, _, parameter = weighting.partition(":")
+    match name:
+        case "uniform":
+            return np.ones(len(node_keys))
+        case "degree":
+            return np.fromiter((graph.out_degree(n) for n in node_keys), dtype = np.float64, count = len(node_keys))
+        case "capacity" | "balance" | "inbound":
+            totals: dict[str, float] = {}
+            for source, _, edge in graph.edges(data = True):
+                capacity, balance = float(edge["capacity"]), float(edge["balance"])
+                value: float = capacity if name == "capacity" else balance if name == "balance" else capacity - balance
+                totals[source] = totals.get(source, 0.0) + value
+            return np.fromiter((totals.get(n, 0.0) for n in node_keys), dtype = np.float64, count = len(node_keys))
+        case "zipf":
+            degrees: np.ndarray = node_weights(graph, node_keys, "degree")
+            ranks: np.ndarray = np.empty(len(node_keys))
+            ranks[np.argsort(-degrees, kind = "stable")] = np.arange(1, len(node_keys) + 1)
+            return ranks ** -float(parameter or 1.0)
+        case _:
+            return np.fromiter((float(graph.nodes[n].get(weighting, 0.0)) for n in node_keys), dtype = np.float64, count = len(node_keys))
+
+class WorkloadSampler:
+    def __init__(
+        self,
+        node_keys: list[str],
+        mean_amount: int,
+        *,
+        sender_weights: np.ndarray | None = None,
+        recipient_weights: np.ndarray | None = None,
+        amount_deviation: float = 0.25,
+        amount_distribution: str = "normal",
+        seed: int | str | None = None,
+        block_size: int = 4096
+    ) -> None:
+        if len(node_keys) < 2:
+            raise ValueError("A workload needs at least two nodes")
+        if amount_distribution not in ("normal", "lognormal"):
+            raise ValueError(f"Unknown amount distribution {amount_distribution}")
+
+        self.node_keys: list[str] = list(node_keys)
+        self.mean_amount: int = int(mean_amount)
+        self.amount_deviation: float = float(amount_deviation)
+        self.amount_distribution: str = amount_distribution
+        self.block_size: int = int(block_size)
+        self.__generator: np.random.Generator = np.random.default_rng(seed_from(seed))
+        self.sender_weights: np.ndarray = np.ones(len(node_keys)) if sender_weights is None else np.asarray(sender_weights, dtype = np.float64)
+        self.recipient_weights: np.ndarray = np.ones(len(node_keys)) if recipient_weights is None else np.asarray(recipient_weights, dtype = np.float64)
+        self.__senders: AliasTable = AliasTable(self.sender_weights)
+        self.__recipients: AliasTable = AliasTable(self.recipient_weights)
+        self.__block: list[tuple[str, str, int]] = []
+        self.__position: int = 0
+
+    @classmethod
+    def from_graph(
+        cls,
+        graph: PayGraph,
+        mean_amount: int,
+        *,
+        node_keys: list[str] | None = None,
+        senders: str = "uniform",
+        recipients: str = "uniform",
+        **options: Any
+    ) -> WorkloadSampler:
+        keys: list[str] = list(graph.nodes) if node_keys is None else node_keys
+        return cls(
+            keys,
+            mean_amount,
+            sender_weights = node_weights(graph, keys, senders),
+            recipient_weights = node_weights(graph, keys, recipients),
+            **options
+        )
+
+    def __amounts(self, size: int) -> np.ndarray:
+        if self.amount_distribution == "lognormal":
+            sigma: float = np.sqrt(np.log1p(self.amount_deviation ** 2))
+            amounts: np.ndarray = self.__generator.lognormal(np.log(self.mean_amount) - sigma ** 2 / 2, sigma, size)
+        else:
+            amounts = self.__generator.normal(self.mean_amount, self.mean_amount * self.amount_deviation, size)
+        return np.maximum(amounts, 1).astype(np.int64)
+
+    def draw(self, size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        senders: np.ndarray = self.__senders.sample(self.__generator, size)
+        recipients: np.ndarray = self.__recipients.sample(self.__generator, size)
+        for _ in range(100):
+            same: np.ndarray = np.flatnonzero(senders == recipients)
+            if not len(same):
+                break
+            recipients[same] = self.__recipients.sample(self.__generator, len(same))
+        else:
+            raise ValueError("Sender and recipient weights leave no distinct pairs to draw")
+        return senders, recipients, self.__amounts(size)
+
+    def __refill(self) -> None:
+        senders, recipients, amounts = self.draw(self.block_size)
+        keys: list[str] = self.node_keys
+        self.__block = [(keys[s], keys[r], a) for s, r, a in zip(senders.tolist(), recipients.tolist(), amounts.tolist())]
+        self.__position = 0
+
+    def next(self) -> tuple[str, str, int]:
+        if self.__position >= len(self.__block):
+            self.__refill()
+        payment: tuple[str, str, int] = self.__block[self.__position]
+        self.__position += 1
+        return payment
@@ -2,4 +2,5 @@ from .ui import UI
 from .progress import ProgressWindow
 from .menu import Menu
 from .input import Input, InputWindow
-from .confirm import YesNoWindow, OkWindow
\ No newline at end of file
+from .confirm import YesNoWindow, OkWindow
+from .panel import Panel
\ No newline at end of file
@@ -0,0 +1,31 @@
+from .ui import UI
+from .window import Window
+
+class Panel(Window[None]):
+
+    def __init__(self, ui: UI, title: str, height: int, width: int, y: int, x: int):
+        self.__lines: list[str] = []
+        super().__init__(ui, title, [], height, width, y, x)
+
+    @property
+    def capacity(self) -> int:
+        return self.height - 4
+
+    def display(self):
+        super().display()
+        self.__lines = []
+        self.refresh()
+
+    def update(self, lines: list[str]) -> bool:
+        lines = [line[:self.width - 4] for line in lines[:self.capacity]]
+        lines += [""] * (len(self.__lines) - len(lines))
+        changed: bool = False
+        for i, line in enumerate(lines):
+            if i >= len(self.__lines) or self.__lines[i] != line:
+                self.clear(i + 3)
+                self.write(line, i + 3, 2)
+                changed = True
+        self.__lines = lines
+        if changed:
+            self.refresh()
+        return changed
@@ -11,28 +11,37 @@ class ProgressWindow(Window[bool]):
         height: int = 11 if key_to_continue else 10
         self.bar_width = width - 4
         self.key_to_continue: bool = key_to_continue
+        self.__drawn: dict[str, object] = {}
         super().__init__(ui, title, [], height, width)
 
     def display(self):
         super().display()
+        self.__drawn.clear()
         self.refresh()
 
-    def update(self, progress: int, info: str):
+    def update(self, progress: int, info: str, detail: str = ""):
         self.progress: int = progress
         bar_y = self.height // 2
-        filled = int((self.progress / self.total) * self.bar_width)
-        filled_part = "▓" * filled
-        empty_part = "░" * (self.bar_width - filled)
-        bar = filled_part + empty_part
-        self.clear(bar_y)
-        self.write(bar, bar_y, 2)
-        percentage = f"{(self.progress / self.total) * 100:6.2f}%"
-        self.clear(bar_y + 2)
-        self.write(percentage, bar_y + 2, (self.width - self.write_len(percentage)) // 2)
-        self.clear(3)
-        self.write(info, 3, (self.width - self.write_len(info)) // 2)
+        ratio: float = min(1.0, self.progress / self.total) if self.total else 0.0
+        filled = int(ratio * self.bar_width)
+        if filled != self.__drawn.get("filled"):
+            self.write("▓" * filled + "░" * (self.bar_width - filled), bar_y, 2)
+            self.__drawn["filled"] = filled
+        percentage = f"{ratio * 100:6.2f}%"
+        if percentage != self.__drawn.get("percentage"):
+            self.write(percentage, bar_y + 2, (self.width - self.write_len(percentage)) // 2)
+            self.__drawn["percentage"] = percentage
+        for y, key, text in ((3, "info", info), (bar_y + 3, "detail", detail)):
+            if text != self.__drawn.get(key):
+                self.clear(y)
+                self.write(text, y, (self.width - self.write_len(text)) // 2)
+                self.__drawn[key] = text
         self.refresh()
-        
+
+    def reset(self, total: int):
+        self.total = int(total)
+        self.progress = 0
+
     def close(self):
         if self.key_to_continue:
             self.write("Press any key to continue...", self.height - 2, 2)
@@ -5,7 +5,6 @@ from curses import window as CursesWindow
 from curses.panel import panel as CursesPanel, new_panel
 import logging
 from typing import Any, Type, overload
-from pyfiglet import Figlet, FigletString
 import signal
 
 signal.signal(signal.SIGINT, signal.SIG_IGN)
@@ -41,8 +40,9 @@ class UI:
         lines: list[str]
 
         if height > 30:
+            from pyfiglet import Figlet
             figlet = Figlet(font = 'banner3', width = 160)
-            ascii_art: FigletString = figlet.renderText(self.banner)
+            ascii_art: str = figlet.renderText(self.banner)
             
             lines = ascii_art.splitlines()
         else:
@@ -1,3 +1,5 @@
 from .mainmenu import *
 from .erdos_renyi_menu import *
-from .lab_progress import *
\ No newline at end of file
+from .topology_menu import *
+from .lab_progress import *
+from .dashboard import *
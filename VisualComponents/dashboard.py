@@ -0,0 +1,72 @@
+import asyncio
+import heapq
+import time
+
+from Lab import *
+from UI import *
+from .lab_progress import format_duration
+
+def format_percentiles(values: list[float] | None) -> str:
+    return " / ".join(f"{v * 1000:8.1f} ms" for v in values) if values else "n/a"
+
+def get_dashboard_panels(ui: UI) -> dict[str, Panel]:
+    height: int = ui.end_y - ui.start_y
+    width: int = ui.end_x - ui.start_x
+    top: int = min(9, height // 2)
+    third: int = width // 3
+    half: int = width // 2
+    return {
+        "traffic": Panel(ui, "Traffic", top, third, ui.start_y, ui.start_x),
+        "latency": Panel(ui, "Latency", top, third, ui.start_y, ui.start_x + third),
+        "time": Panel(ui, "Experiment", top, width - 2 * third, ui.start_y, ui.start_x + 2 * third),
+        "failures": Panel(ui, "Top Failing Nodes", height - top, half, ui.start_y + top, ui.start_x),
+        "resources": Panel(ui, "Containers", height - top, width - half, ui.start_y + top, ui.start_x + half)
+    }
+
+async def show_dashboard(ui: UI, lab: Lab, metrics: TrafficMetrics, duration: float, *, frame_rate: float = 4) -> None:
+    panels: dict[str, Panel] = get_dashboard_panels(ui)
+    for panel in panels.values():
+        panel.display()
+
+    started_at: float = time.monotonic()
+    while (elapsed := time.monotonic() - started_at) < duration:
+        frame_started_at: float = time.monotonic()
+
+        success_ratio: float | None = metrics.success_ratio
+        panels["traffic"].update([
+            f"Payments/s     {metrics.rate:10.1f}",
+            f"Success ratio  {'n/a' if success_ratio is None else f'{success_ratio * 100:9.1f}%':>10}",
+            f"In flight      {metrics.in_flight:10d}",
+            f"Sent / failed  {metrics.sent:10d} / {metrics.failed}"
+        ])
+
+        panels["latency"].update([
+            f"p50 / p99  {format_percentiles(metrics.latency(50, 99))}",
+            f"Window     {metrics.window:8.0f} s"
+        ])
+
+        panels["time"].update([
+            f"Lab        {lab.name}",
+            f"Nodes      {lab.created_node_count}",
+            f"Channels   {lab.created_channel_count}",
+            f"Remaining  {format_duration(duration - elapsed)}",
+            *([f"Height     {lab.block_clock.height or '-'} (max lag {lab.block_clock.max_lag})"] if lab.block_clock else [])
+        ])
+
+        panels["failures"].update([
+            f"{node_key:<16}{count:>10d}"
+            for node_key, count in metrics.failures.most_common(panels["failures"].capacity)
+        ] or ["No failed payments"])
+
+        servers: list[Miner | Node] = [s for s in (*lab.miners, *lab.nodes.values()) if s.cpu_percent is not None]
+        busiest: list[Miner | Node] = heapq.nlargest(max(0, panels["resources"].capacity - 2), servers, key = lambda s: s.cpu_percent or 0.0)
+        panels["resources"].update([
+            f"{'Total':<24}{sum(s.cpu_percent or 0.0 for s in servers):9.1f}% {sum(s.memory_usage or 0 for s in servers) / 1024 ** 2:10.0f} MiB",
+            "",
+            *(f"{s.name:<24}{s.cpu_percent or 0.0:9.1f}% {(s.memory_usage or 0) / 1024 ** 2:10.0f} MiB" for s in busiest)
+        ])
+
+        await asyncio.sleep(max(0.0, 1 / frame_rate - (time.monotonic() - frame_started_at)))
+
+    for panel in panels.values():
+        panel.close()
@@ -1,4 +1,9 @@
+import asyncio
+import time
+from typing import Any, Awaitable
+
 from Lab import *
+from UI import *
 
 def get_lab_progress_label(status: Lab.Status):
     match status:
@@ -18,3 +23,73 @@ def get_lab_progress_label(status: Lab.Status):
             return "Lab ready!"
         case Lab.Status.STOPPING:
             return "Stopping miners and nodes..."
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+async def track_lab_progress(ui: UI, lab: Lab, title: str, until: Lab.Status, *, frame_rate: float = 10, queue: asyncio.Queue[ProgressEvent] | None = None) -> None:
+    progress = ProgressWindow(ui, title, total = 1)
+    progress.display()
+
+    phase: Lab.Status = lab.status
+    started_at: float = time.monotonic()
+    completed: int = 0
+    failed: int = 0
+    last_frame: float = 0.0
+
+    def apply(event: ProgressEvent) -> None:
+        nonlocal phase, started_at, completed, failed
+        if isinstance(event, PhaseChanged):
+            phase, started_at, completed, failed = Lab.Status(event.phase), event.at, 0, 0
+            progress.reset(event.total)
+        elif event.phase == phase:
+            if isinstance(event, TaskFailed):
+                failed += 1
+            else:
+                completed += 1
+
+    def draw() -> None:
+        elapsed: float = time.monotonic() - started_at
+        rate: float = completed / elapsed if elapsed > 0 else 0.0
+        detail: str = f"{completed}/{progress.total} {rate:.1f}/s"
+        if rate and progress.total > completed:
+            detail += f" ETA {format_duration((progress.total - completed) / rate)}"
+        if failed:
+            detail += f" {failed} failed"
+        progress.update(completed, get_lab_progress_label(phase), detail)
+
+    if queue is None:
+        queue = lab.progress.subscribe()
+    try:
+        draw()
+        while phase != until:
+            apply(await queue.get())
+            while not queue.empty():
+                apply(queue.get_nowait())
+
+            while (remaining := last_frame + 1 / frame_rate - time.monotonic()) > 0 and phase != until:
+                try:
+                    apply(await asyncio.wait_for(queue.get(), remaining))
+                except TimeoutError:
+                    break
+
+            draw()
+            last_frame = time.monotonic()
+    finally:
+        lab.progress.unsubscribe(queue)
+        progress.close()
+
+async def with_lab_progress(ui: UI, lab: Lab, title: str, until: Lab.Status, operation: Awaitable[Any]) -> Any:
+    queue: asyncio.Queue[ProgressEvent] = lab.progress.subscribe()
+    tracker: asyncio.Task = asyncio.create_task(track_lab_progress(ui, lab, title, until, queue = queue))
+    try:
+        result: Any = await operation
+    except BaseException:
+        tracker.cancel()
+        await asyncio.gather(tracker, return_exceptions = True)
+        lab.progress.unsubscribe(queue)
+        raise
+    await tracker
+    return result
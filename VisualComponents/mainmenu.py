@@ -13,6 +13,7 @@ def get_main_menu(ui: UI) -> Menu:
         ],
         [
             "Generate a new laboratory graph based on the Erdös-Renyi model...",
+            "Generate a new laboratory graph from another topology model...",
             "Load laboratory graph from a file...",
             "Exit"
         ],
@@ -0,0 +1,91 @@
+from UI import *
+from Lab.topology import MODELS, Model
+
+def get_channel_attribute_inputs() -> dict[str, Input]:
+    return {
+        "MEAN_CHANNEL_CAPACITY": Input(
+            "Mean channel capacity ({{i:μ_capacity}})",
+            int,
+            lambda n: 100_000_000 <= n <= 100_000_000_000,
+            "{{i:μ_capacity}} must be a number between a hundred million and a hundred billion"
+        ),
+        "CHANNEL_CAPACITY_DEVIATION": Input(
+            "Channel capacity deviation ({{i:σ_capacity}})",
+            float,
+            lambda n: 0.0 <= n,
+            "{{i:σ_capacity}} must be a floating-point number greater than zero"
+        ),
+        "MEAN_PROPORTIONAL_FEE": Input(
+            "Mean proportional fee percent ({{i:μ_proportional_fee}})",
+            float,
+            lambda n: 0.0 <= n <= 50.0,
+            "{{i:μ_base_fee}} must be a floating-point number between zero and fifty"
+        ),
+        "PROPORTIONAL_FEE_DEVIATION": Input(
+            "Proportional fee deviation ({{i:σ_base_fee}})",
+            float,
+            lambda n: 0.0 <= n,
+            "{{i:σ_base_fee}} must be a floating-point number greater than zero"
+        )
+    }
+
+def get_channel_attributes(inputs: dict[str, Input]) -> dict:
+    return {
+        "mean_capacity": inputs["MEAN_CHANNEL_CAPACITY"].value,
+        "capacity_deviation": inputs["CHANNEL_CAPACITY_DEVIATION"].value,
+        "mean_ppm_fee": inputs["MEAN_PROPORTIONAL_FEE"].value * 10_000,
+        "ppm_fee_deviation": inputs["PROPORTIONAL_FEE_DEVIATION"].value * 10_000
+    }
+
+def get_topology_model_menu(ui: UI) -> Menu:
+    return Menu(
+        ui,
+        "Topology Model",
+        [
+            "Please, choose the random graph model used to generate the laboratory topology"
+        ],
+        [
+            *(model.title for model in MODELS.values()),
+            "Back to Source Graph menu"
+        ],
+        True
+    )
+
+def get_topology_menu(ui: UI, model: Model, max_nodes: int) -> InputWindow:
+    inputs: dict[str, Input] = {
+        "EXPERIMENT_NAME": Input(
+            "Experiment name",
+            str,
+            lambda s: 3 <= len(s) <= 12 and (s.isalnum() or '_' in s),
+            "Name must be between 3 and 12 alphanumeric characters or underscore"
+        ),
+        "NUMBER_OF_NODES": Input(
+            "Number of nodes ({{i:n}})",
+            int,
+            lambda n: 2 <= n <= max_nodes,
+            f"{{{{i:n}}}} must be a number between two and {max_nodes:,}, the number of nodes this host can run"
+        )
+    }
+
+    for key, parameter in model.parameters.items():
+        inputs[key] = Input(
+            parameter.prompt,
+            parameter.type,
+            lambda v, p = parameter: p.is_valid(v, inputs["NUMBER_OF_NODES"].value),
+            parameter.validation_message
+        )
+
+    inputs.update(get_channel_attribute_inputs())
+
+    return InputWindow(
+        ui,
+        model.title,
+        [
+            *model.description,
+            "",
+            "{{iu:Note: }}{{i:Numeric attributes are generated randomly with μ and σ using vectorized normal draws}}"
+        ],
+        inputs,
+        "Confirm selected inputs",
+        "Cancel"
+    )
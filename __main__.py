@@ -1,8 +1,12 @@
 import asyncio
 import os
+import sys
 from networkx import gnm_random_graph
 import networkx as nx
 from Lab import *
+from Lab.topology import MODELS, generate
+from Lab.gossip import import_snapshot
+from Lab.batch import BatchRunner, ExperimentSpec
 from UI import *
 from VisualComponents import *
 
@@ -20,7 +24,7 @@ async def main():
 
             match main.options.index(main_selected):
                 case 0:
-                    erdos_renyi = get_erdos_renyi_menu(ui).display()
+                    erdos_renyi = get_erdos_renyi_menu(ui, Lab.max_node_count()).display()
 
                     if not erdos_renyi:
                         continue
@@ -34,15 +38,32 @@ async def main():
                     graph = PayGraph(
                         erdos_renyi["EXPERIMENT_NAME"].value,
                         topology,
-                        mean_capacity = erdos_renyi["MEAN_CHANNEL_CAPACITY"].value,
-                        capacity_deviation = erdos_renyi["CHANNEL_CAPACITY_DEVIATION"].value,
-                        mean_ppm_fee = erdos_renyi["MEAN_PROPORTIONAL_FEE"].value * 10_000,
-                        ppm_fee_deviation = erdos_renyi["PROPORTIONAL_FEE_DEVIATION"].value * 10_000
+                        **get_channel_attributes(erdos_renyi)
                     )
 
                 case 1:
+                    models = get_topology_model_menu(ui)
+                    model_selected = models.display()
+                    if model_selected == models.options[-1]:
+                        continue
+
+                    model = list(MODELS.values())[models.options.index(model_selected)]
+                    model_inputs = get_topology_menu(ui, model, Lab.max_node_count()).display()
+
+                    if not model_inputs:
+                        continue
 
-                    graph_files: list[str] = [f for f in os.listdir("Graphs") if f.endswith(".graphml.xml")]
+                    graph = generate(
+                        model_inputs["EXPERIMENT_NAME"].value,
+                        model.key,
+                        nodes = model_inputs["NUMBER_OF_NODES"].value,
+                        attributes = get_channel_attributes(model_inputs),
+                        **{key: model_inputs[key].value for key in model.parameters}
+                    )
+
+                case 2:
+
+                    graph_files: list[str] = [f for f in os.listdir("Graphs") if f.endswith((".graphml.xml", ".json"))]
 
                     if not graph_files:
                         OkWindow(ui, "No Files Found", [
@@ -78,51 +99,29 @@ async def main():
                                 "Are you sure?"
                             ]
                         ).display():
-                            graph = PayGraph.load(f"Graphs/{load_selected}")
+                            if load_selected.endswith(".json"):
+                                graph = import_snapshot(load_selected.removesuffix(".json"), f"Graphs/{load_selected}")
+                            else:
+                                graph = PayGraph.load(f"Graphs/{load_selected}")
                         else:
                             continue
                 
-                case 2:
+                case 3:
                     return
         
         nx.write_graphml_xml(graph, f"Graphs/{graph.name}.graphml.xml")
 
-        async def track_lab_start(lab: Lab):
-            total_progress = lab.total_miner_count + lab.total_node_count * 2 + lab.total_channel_count * 2
-            progress = ProgressWindow(ui, f"Start Lab {lab.name}", total = total_progress)
-            progress.display()
-            while lab.status != Lab.Status.READY:
-                progress.update(lab.created_miner_count + lab.created_node_count + lab.funded_channel_count + lab.synced_node_count, get_lab_progress_label(lab.status))
-                await asyncio.sleep(1)
-            progress.close()
-        
-        async def track_lab_stop(lab: Lab):
-            total_progress = lab.total_node_count
-            progress = ProgressWindow(ui, f"Stop Lab {lab.name}", total = total_progress)
-            progress.display()
-            while lab.status != Lab.Status.STOPPED:
-                progress.update(lab.total_miner_count + lab.total_node_count - lab.created_miner_count - lab.created_node_count, get_lab_progress_label(lab.status))
-                await asyncio.sleep(1)
-            progress.close()
-
         duration = 600
 
         lab: Lab = Lab(graph)
-        await asyncio.gather(track_lab_start(lab), lab.start())
-        wait = ProgressWindow(ui, "Waiting", total = duration)
-        wait.display()
-
-        asyncio.create_task(generate_traffic(lab, 10000000))
-
-        c = 0
-        while c < duration:
-            wait.update(c, f"{duration - c} seconds remaining...")
-            await asyncio.sleep(1)
-            c += 1
+        await with_lab_progress(ui, lab, f"Start Lab {lab.name}", Lab.Status.READY, lab.start())
+        metrics: TrafficMetrics = TrafficMetrics()
+        traffic = asyncio.create_task(generate_traffic(lab, 10000000, metrics = metrics))
 
-        await asyncio.gather(track_lab_stop(lab), lab.stop())
+        await show_dashboard(ui, lab, metrics, duration)
 
-        wait.close()
+        await with_lab_progress(ui, lab, f"Stop Lab {lab.name}", Lab.Status.STOPPED, lab.stop())
+        await traffic
 
         OkWindow(
             ui,
@@ -133,7 +132,11 @@ async def main():
                 "Press any key to continue..."
             ]
         ).display()
-try:
-    asyncio.run(main=main())
-except Exception as e:
-    print("ERROR:", e)
\ No newline at end of file
+if __name__ == "__main__":
+    try:
+        if len(sys.argv) >= 3 and sys.argv[1] == "--batch":
+            asyncio.run(main=BatchRunner(ExperimentSpec.load(sys.argv[2]), concurrent = "--concurrent" in sys.argv[3:]).run())
+        else:
+            asyncio.run(main=main())
+    except Exception as e:
+        print("ERROR:", e)
\ No newline at end of file